@@ -0,0 +1,349 @@
+import json
+import os
+import sys
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data.columnar import load_frame, read_columns, save_frame, write_columns
+from data.player_stats import MIN_GAMES_PLAYED
+
+GAME_LOG_FILE = "data/game_log.ndjson"
+
+# Running per-player totals; Kill Games counts the games whose kills and
+# losses were recorded, which is what the per-game averages divide by
+SUM_COLUMNS = [
+    "Games Won",
+    "Games Lost",
+    "Total Kills",
+    "Total Losses",
+    "Kill Games",
+    "Total Chevrons",
+    "DC's/Forfeits",
+]
+# A season counts once per player: a game starts a new season when its
+# season differs from the last one seen for that player
+SEASON_COLUMNS = {
+    "Seasons Played": "Last Season",
+    "Playoff Appearances": "Last Playoff Season",
+}
+# Season awards are not part of the game log; they are carried over from the
+# seed table
+CARRIED_COLUMNS = [
+    "Third Places",
+    "Runner-ups",
+    "Championships",
+    "Top 3 Best KD Ratios",
+    "Top 3 Most Chevrons/Game",
+]
+# Recomputed from the accumulators for players with new games only
+DERIVED_COLUMNS = [
+    "K/D ratio",
+    "Chevrons/game",
+    "Kills per Game",
+    "Losses per Game",
+    "Games Played",
+    "Win %",
+    "Playoff Rate",
+]
+OUTPUT_COLUMNS = [
+    "Player",
+    "K/D ratio",
+    "Chevrons/game",
+    "Total Chevrons",
+    "Total Kills",
+    "Total Losses",
+    "Kills per Game",
+    "Losses per Game",
+    "Games Played",
+    "Games Won",
+    "Games Lost",
+    "Win %",
+    "DC's/Forfeits",
+    "Seasons Played",
+    "Playoff Appearances",
+    "Playoff Rate",
+] + CARRIED_COLUMNS
+NUMERIC_COLUMNS = SUM_COLUMNS + list(SEASON_COLUMNS) + CARRIED_COLUMNS + DERIVED_COLUMNS
+TEXT_COLUMNS = list(SEASON_COLUMNS.values())
+
+
+def default_state_path(output_file: str) -> str:
+    """Aggregator state lives next to the table it maintains"""
+    return os.path.splitext(output_file)[0] + "_state.cols"
+
+
+def new_aggregator_state() -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """An empty per-player state frame (indexed by Player) and its log position"""
+    players = pd.DataFrame(
+        {
+            **{column: np.zeros(0) for column in NUMERIC_COLUMNS},
+            **{column: np.zeros(0, dtype=str) for column in TEXT_COLUMNS},
+        },
+        index=pd.Index(np.zeros(0, dtype=str), name="Player"),
+    )
+    return players, {"offset": 0, "games_processed": 0}
+
+
+def load_aggregator_state(state_path: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Load persisted aggregator state, or start fresh if none exists"""
+    if not os.path.exists(state_path):
+        return new_aggregator_state()
+    columns, meta = read_columns(state_path, mmap=False)
+    players = pd.DataFrame(
+        {name: values for name, values in columns.items() if name != "Player"},
+        index=pd.Index(columns["Player"], name="Player"),
+    )
+    return players, meta
+
+
+def save_aggregator_state(players: pd.DataFrame, meta: Dict[str, Any], state_path: str):
+    write_columns(
+        state_path,
+        {
+            "Player": players.index.to_numpy(),
+            **{column: players[column].to_numpy() for column in players.columns},
+        },
+        meta,
+    )
+
+
+def seed_aggregator_state(table: pd.DataFrame) -> pd.DataFrame:
+    """Start the accumulators from an existing recalculated table.
+
+    The game log is taken to continue where the table ends, so every logged
+    season is new to the seeded players. Their rows are emitted as they are
+    until their first logged game.
+    """
+    players, _ = new_aggregator_state()
+    table = table.fillna(0).drop_duplicates("Player").set_index("Player")
+
+    seeded = pd.DataFrame(index=table.index)
+    for column in NUMERIC_COLUMNS:
+        if column in table:
+            seeded[column] = table[column].to_numpy(dtype=float)
+        else:
+            seeded[column] = 0.0
+    kills_per_game = seeded["Kills per Game"].to_numpy()
+    seeded["Kill Games"] = np.round(
+        np.divide(
+            seeded["Total Kills"].to_numpy(),
+            kills_per_game,
+            out=np.zeros(len(seeded)),
+            where=kills_per_game > 0,
+        )
+    )
+    for column in TEXT_COLUMNS:
+        seeded[column] = ""
+    return pd.concat([players, seeded[players.columns]])
+
+
+def append_games(log_path: str, games: List[Dict[str, Any]]):
+    """Append game results to the log, one JSON record per player per game.
+
+    A record has Player, Date, Season, Result ("Win" or "Loss"), Chevrons,
+    Forfeit, Playoff and optionally Kills and Losses (units lost), which
+    are left out or null when they were not recorded. Records are expected
+    in the order the games were played.
+    """
+    with open(log_path, "a") as file:
+        file.writelines(json.dumps(game) + "\n" for game in games)
+
+
+def read_new_games(log_path: str, offset: int) -> Tuple[pd.DataFrame, int]:
+    """Read the complete records appended after byte offset; returns them and the new offset.
+
+    A trailing line without its newline is still being written, so it is
+    left for the next run.
+    """
+    if not os.path.exists(log_path):
+        return pd.DataFrame(), offset
+
+    with open(log_path, "rb") as file:
+        file.seek(offset)
+        data = file.read()
+
+    end = data.rfind(b"\n") + 1
+    records = [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+    return pd.DataFrame(records), offset + end
+
+
+def count_new_seasons(
+    players: pd.Series, seasons: pd.Series, last_seen: pd.Series
+) -> Tuple[pd.Series, pd.Series]:
+    """Per player, how many of the games start a season and the last season seen"""
+    seasons = seasons.astype(str)
+    previous = seasons.groupby(players, sort=False).shift()
+    previous = previous.fillna(players.map(last_seen))
+    started = (seasons != previous).groupby(players, sort=False).sum()
+    return started, seasons.groupby(players, sort=False).last()
+
+
+def summarize_games(games: pd.DataFrame, state: pd.DataFrame) -> pd.DataFrame:
+    """Per-player increments of a batch of game records"""
+    games = games.reindex(
+        columns=["Player", "Season", "Result", "Kills", "Losses", "Chevrons", "Forfeit", "Playoff"]
+    )
+    recorded = games["Kills"].notna() & games["Losses"].notna()
+    batch = pd.DataFrame(
+        {
+            "Player": games["Player"],
+            "Games Won": (games["Result"] == "Win").astype(float),
+            "Games Lost": (games["Result"] == "Loss").astype(float),
+            "Total Kills": games["Kills"].where(recorded, 0).astype(float),
+            "Total Losses": games["Losses"].where(recorded, 0).astype(float),
+            "Kill Games": recorded.astype(float),
+            "Total Chevrons": games["Chevrons"].fillna(0).astype(float),
+            "DC's/Forfeits": games["Forfeit"].fillna(False).astype(bool).astype(float),
+        }
+    )
+    totals = batch.groupby("Player", sort=False).sum()
+
+    seasons = games[games["Season"].notna()]
+    playoff = seasons["Playoff"].fillna(False).astype(bool)
+    for count_column, rows in [("Seasons Played", seasons), ("Playoff Appearances", seasons[playoff])]:
+        last_column = SEASON_COLUMNS[count_column]
+        started, last = count_new_seasons(rows["Player"], rows["Season"], state[last_column])
+        totals[count_column] = started.reindex(totals.index, fill_value=0).astype(float)
+        totals[last_column] = last.reindex(totals.index)
+    return totals
+
+
+def apply_games(players: pd.DataFrame, games: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Index]:
+    """Fold a batch of game records into the accumulators; returns them and the players touched"""
+    if games.empty:
+        return players, players.index[:0]
+
+    totals = summarize_games(games, players)
+    new_players = totals.index.difference(players.index, sort=False)
+    if len(new_players):
+        added = pd.DataFrame(0.0, index=new_players, columns=NUMERIC_COLUMNS)
+        for column in TEXT_COLUMNS:
+            added[column] = ""
+        players = pd.concat([players, added[players.columns]])
+        players.index.name = "Player"
+
+    touched = totals.index
+    for column in SUM_COLUMNS + list(SEASON_COLUMNS):
+        players.loc[touched, column] = players.loc[touched, column] + totals[column]
+    for column in TEXT_COLUMNS:
+        last = totals[column].dropna()
+        players.loc[last.index, column] = last
+
+    players.loc[touched, DERIVED_COLUMNS] = derive_stats(players.loc[touched])
+    return players, touched
+
+
+def derive_stats(accumulators: pd.DataFrame) -> pd.DataFrame:
+    """Ratios and rates of the recalculated table from per-player accumulators"""
+
+    def ratio(numerator, denominator, scale=1.0):
+        numerator = np.asarray(numerator, dtype=float)
+        denominator = np.asarray(denominator, dtype=float)
+        return np.divide(
+            numerator * scale,
+            denominator,
+            out=np.zeros(len(numerator)),
+            where=denominator > 0,
+        )
+
+    games_played = accumulators["Games Won"] + accumulators["Games Lost"]
+    return pd.DataFrame(
+        {
+            "K/D ratio": ratio(accumulators["Total Kills"], accumulators["Total Losses"]),
+            "Chevrons/game": ratio(accumulators["Total Chevrons"], games_played),
+            "Kills per Game": ratio(accumulators["Total Kills"], accumulators["Kill Games"]),
+            "Losses per Game": ratio(accumulators["Total Losses"], accumulators["Kill Games"]),
+            "Games Played": games_played.to_numpy(dtype=float),
+            "Win %": ratio(accumulators["Games Won"], games_played, 100),
+            "Playoff Rate": ratio(
+                accumulators["Playoff Appearances"], accumulators["Seasons Played"], 100
+            ),
+        },
+        index=accumulators.index,
+    )
+
+
+def aggregate_games(
+    log_path: str = GAME_LOG_FILE,
+    output_file: str = "data/player_stats_recalculated.json",
+    state_path: Optional[str] = None,
+    seed_file: Optional[str] = None,
+    rebuild: bool = False,
+    min_games_played: float = MIN_GAMES_PLAYED,
+    write_json: bool = True,
+) -> pd.DataFrame:
+    """Apply games appended to the log since the last run and write the recalculated table.
+
+    Only the log past the stored byte offset is read, and ratios are only
+    recomputed for players with new games, so a run costs O(new games) plus
+    reading and writing the columnar state and table. A fresh state (first
+    run, --rebuild, or a log that shrank) is seeded from seed_file when
+    given and replays the whole log. Players below min_games_played are
+    kept in the state but left out of the table.
+    """
+    state_path = state_path or default_state_path(output_file)
+
+    players, meta = new_aggregator_state() if rebuild else load_aggregator_state(state_path)
+    log_size = os.path.getsize(log_path) if os.path.exists(log_path) else 0
+    if meta["offset"] > log_size:
+        print(f"{log_path} is shorter than at the last run, replaying the full log...")
+        players, meta = new_aggregator_state()
+
+    if meta["offset"] == 0 and players.empty and seed_file:
+        players = seed_aggregator_state(load_frame(seed_file))
+        print(f"Seeded {len(players)} players from {seed_file}")
+
+    games, meta["offset"] = read_new_games(log_path, meta["offset"])
+    players, touched = apply_games(players, games)
+    meta["games_processed"] += len(games)
+    print(f"Applied {len(games)} new games for {len(touched)} players")
+
+    table = players.reset_index()[OUTPUT_COLUMNS]
+    table = table[table["Games Played"] >= min_games_played].reset_index(drop=True)
+
+    save_frame(table, output_file, write_json=write_json)
+    save_aggregator_state(players, meta, state_path)
+    return table
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Maintain player_stats_recalculated.json from the game result log"
+    )
+    parser.add_argument("--log", default=GAME_LOG_FILE)
+    parser.add_argument("--output-file", default="data/player_stats_recalculated.json")
+    parser.add_argument("--state", default=None)
+    parser.add_argument(
+        "--seed-file",
+        default=None,
+        help="Table the accumulators start from when there is no saved state",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Ignore saved state and replay the whole log",
+    )
+    parser.add_argument("--min-games", type=float, default=MIN_GAMES_PLAYED)
+    parser.add_argument(
+        "--no-json",
+        action="store_true",
+        help="Only write the columnar store, skip the JSON export",
+    )
+    args = parser.parse_args()
+
+    table = aggregate_games(
+        args.log,
+        args.output_file,
+        args.state,
+        args.seed_file,
+        args.rebuild,
+        args.min_games,
+        write_json=not args.no_json,
+    )
+    print(f"Stats for {len(table)} players saved to {args.output_file}")
@@ -0,0 +1,233 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Any, List, Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STAGES_SCRIPT = os.path.join(ROOT_DIR, "benchmarks", "stages.py")
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+TIME_THRESHOLD = 1.25
+MEMORY_THRESHOLD = 1.25
+MIN_SECONDS = 0.05
+MIN_PEAK_MB = 5.0
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_stage_benchmark(
+    pipeline: str, rows: int, workdir: str, extra_args: List[str]
+) -> List[Dict[str, Any]]:
+    """Benchmark one pipeline at one size in a fresh interpreter.
+
+    A fresh process keeps one run's caches and heap out of the next run's
+    numbers.
+    """
+    output = os.path.join(workdir, f"{pipeline}_{rows}.json")
+    subprocess.run(
+        [
+            sys.executable,
+            STAGES_SCRIPT,
+            pipeline,
+            "--rows",
+            str(rows),
+            "--workdir",
+            os.path.join(workdir, f"{pipeline}_{rows}"),
+            "--output",
+            output,
+            *extra_args,
+        ],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    with open(output, "r") as f:
+        return json.load(f)
+
+
+def run_benchmarks(
+    pipelines: List[str],
+    sizes: List[int],
+    seed: int = 0,
+    max_fits: int = 20,
+    train_max_rows: int = 10000,
+    measure_memory: bool = True,
+) -> Dict[str, Any]:
+    """Benchmark every stage of the given pipelines at every size and build the report"""
+    extra_args = [
+        "--seed",
+        str(seed),
+        "--max-fits",
+        str(max_fits),
+        "--train-max-rows",
+        str(train_max_rows),
+    ]
+    if not measure_memory:
+        extra_args.append("--no-memory")
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="benchmarks-") as workdir:
+        for pipeline in pipelines:
+            for rows in sizes:
+                results.extend(run_stage_benchmark(pipeline, rows, workdir, extra_args))
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "seed": seed,
+            "max_fits": max_fits,
+            "train_max_rows": train_max_rows,
+            "memory_traced": measure_memory,
+        },
+        "results": results,
+    }
+
+
+def compare_reports(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    time_threshold: float = TIME_THRESHOLD,
+    memory_threshold: float = MEMORY_THRESHOLD,
+    min_seconds: float = MIN_SECONDS,
+    min_peak_mb: float = MIN_PEAK_MB,
+) -> List[Dict[str, Any]]:
+    """
+    Flag stages that got slower or hungrier than in the baseline report.
+
+    A stage regresses when its time (or peak memory) exceeds the baseline's by
+    more than the threshold ratio. Measurements below min_seconds / min_peak_mb
+    in both reports are noise-dominated and never flagged.
+    """
+    baseline_results = {
+        (result["pipeline"], result["stage"], result["rows"]): result
+        for result in baseline["results"]
+    }
+
+    regressions = []
+    for result in report["results"]:
+        previous = baseline_results.get((result["pipeline"], result["stage"], result["rows"]))
+        if previous is None:
+            continue
+
+        for metric, threshold, floor in (
+            ("seconds", time_threshold, min_seconds),
+            ("peak_mb", memory_threshold, min_peak_mb),
+        ):
+            current, before = result.get(metric), previous.get(metric)
+            if current is None or before is None or max(current, before) < floor:
+                continue
+            ratio = current / max(before, 1e-9)
+            if ratio > threshold:
+                regressions.append(
+                    {
+                        "pipeline": result["pipeline"],
+                        "stage": result["stage"],
+                        "rows": result["rows"],
+                        "metric": metric,
+                        "baseline": before,
+                        "current": current,
+                        "ratio": round(ratio, 2),
+                    }
+                )
+    return regressions
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"{'pipeline':<8} {'stage':<30} {'rows':>9} {'seconds':>10} {'peak MB':>9}")
+    for result in report["results"]:
+        peak = "-" if result["peak_mb"] is None else f"{result['peak_mb']:.1f}"
+        print(
+            f"{result['pipeline']:<8} {result['stage']:<30} {result['rows']:>9} "
+            f"{result['seconds']:>10.3f} {peak:>9}"
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark player_model and team_model stages on synthetic data"
+    )
+    parser.add_argument(
+        "--pipelines", nargs="+", choices=["player", "team"], default=["player", "team"]
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=float,
+        default=DEFAULT_SIZES,
+        help="Rows (players or teams) per run, e.g. 1e3 1e4 1e5 1e6",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--max-fits", type=int, default=20, help="Fit budget of the halving search"
+    )
+    parser.add_argument(
+        "--train-max-rows",
+        type=int,
+        default=10000,
+        help="Train on a subsample of at most this many players",
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="Skip tracemalloc, which slows allocation-heavy stages down",
+    )
+    parser.add_argument("--output", default="benchmark_report.json")
+    parser.add_argument(
+        "--baseline", help="Earlier report to compare against; exits 1 on regressions"
+    )
+    parser.add_argument("--time-threshold", type=float, default=TIME_THRESHOLD)
+    parser.add_argument("--memory-threshold", type=float, default=MEMORY_THRESHOLD)
+    args = parser.parse_args()
+
+    report = run_benchmarks(
+        args.pipelines,
+        [int(size) for size in args.sizes],
+        args.seed,
+        args.max_fits,
+        args.train_max_rows,
+        not args.no_memory,
+    )
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        report["baseline_commit"] = baseline["meta"].get("commit")
+        report["regressions"] = compare_reports(
+            report, baseline, args.time_threshold, args.memory_threshold
+        )
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print_report(report)
+    print(f"\nReport saved to {args.output}")
+
+    regressions = report.get("regressions", [])
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression['pipeline']}/{regression['stage']} "
+            f"x{regression['rows']} {regression['metric']}: "
+            f"{regression['baseline']} -> {regression['current']} ({regression['ratio']}x)"
+        )
+    if regressions:
+        sys.exit(1)
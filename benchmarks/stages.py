@@ -0,0 +1,185 @@
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.synthetic import generate_player_stats, write_player_stats, write_team_data
+
+
+class StageTimer:
+    """
+    Runs pipeline stages and records wall time and peak traced memory of each.
+
+    Peak memory is what the stage allocates on top of what is already live
+    when it starts, as seen by tracemalloc (which covers NumPy buffers).
+    tracemalloc slows allocation-heavy Python code down, so timings are only
+    comparable between runs with the same setting.
+    """
+
+    def __init__(self, pipeline, rows, measure_memory=True):
+        self.pipeline = pipeline
+        self.rows = rows
+        self.measure_memory = measure_memory
+        self.results = []
+
+    def run(self, stage, func, *args, rows=None, **kwargs):
+        if self.measure_memory:
+            tracemalloc.start()
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        seconds = time.perf_counter() - start
+
+        peak_mb = None
+        if self.measure_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peak_mb = round((peak - baseline) / (1 << 20), 2)
+
+        self.results.append(
+            {
+                "pipeline": self.pipeline,
+                "stage": stage,
+                "rows": self.rows if rows is None else rows,
+                "seconds": round(seconds, 4),
+                "peak_mb": peak_mb,
+            }
+        )
+        print(f"[{self.pipeline} x{self.rows}] {stage}: {seconds:.3f}s", file=sys.stderr)
+        return result
+
+
+def run_player_stages(workdir, rows, seed=0, max_fits=20, train_max_rows=10000, measure_memory=True):
+    from player_model.data_preprocessing import preprocess_data
+    from player_model.model_training import train_and_evaluate_model
+    from player_model.prediction import predict_and_assign_tiers
+    from player_model.flat_forest import save_flat_forest
+
+    input_file = os.path.join(workdir, "player_stats.json")
+    write_player_stats(generate_player_stats(rows, seed), input_file)
+
+    timer = StageTimer("player", rows, measure_memory)
+    df, features = timer.run("preprocess_data", preprocess_data, input_file)
+
+    # Forest search cost grows much faster than the other stages, so large
+    # tables are trained on a subsample and the row count is recorded
+    train = df if len(df) <= train_max_rows else df.sample(n=train_max_rows, random_state=seed)
+    best_model, X_test_index, y_pred_test, _, _ = timer.run(
+        "train_and_evaluate_model",
+        train_and_evaluate_model,
+        train[features],
+        train["Battle_Performance"],
+        search="halving",
+        max_fits=max_fits,
+        rows=len(train),
+    )
+
+    forest = timer.run(
+        "export_flat_forest",
+        save_flat_forest,
+        best_model,
+        features,
+        os.path.join(workdir, "forest.cols"),
+    )
+    timer.run(
+        "predict_and_assign_tiers",
+        predict_and_assign_tiers,
+        df,
+        forest,
+        features,
+        X_test_index,
+        y_pred_test,
+    )
+    return timer.results
+
+
+def run_team_stages(workdir, rows, seed=0, measure_memory=True):
+    from team_model.utils import load_team_data, extract_team_features
+    from team_model.clustering import build_feature_matrix, scale_features, perform_clustering
+    from team_model.tier_assignment import assign_tiers_and_rank_teams
+    from team_model.tier_analyzer import analyze_tier_placement, find_potential_outliers
+    from team_model.save_tier_results import save_tier_results
+
+    team_data_file = os.path.join(workdir, "elo_rating.json")
+    write_team_data(team_data_file, rows, seed=seed)
+
+    timer = StageTimer("team", rows, measure_memory)
+    teams_data = timer.run("load_team_data", load_team_data, team_data_file)
+    team_features = timer.run(
+        "extract_team_features",
+        lambda: [extract_team_features(team) for team in teams_data],
+    )
+    team_names, X, feature_columns = timer.run(
+        "build_feature_matrix",
+        lambda: (
+            np.array([team["Team_Name"] for team in team_features], dtype=object),
+            *build_feature_matrix(team_features),
+        ),
+    )
+    X_scaled, scaler = timer.run("scale_features", scale_features, X)
+    labels, cluster_centers_scaled = timer.run(
+        "perform_clustering", perform_clustering, X_scaled, n_clusters=7
+    )
+    tiered_teams, tier_profiles, model = timer.run(
+        "assign_tiers_and_rank_teams",
+        assign_tiers_and_rank_teams,
+        team_names,
+        X,
+        labels,
+        cluster_centers_scaled,
+        scaler,
+        feature_columns,
+    )
+    tiered_teams = timer.run("analyze_tier_placement", analyze_tier_placement, tiered_teams)
+    timer.run("find_potential_outliers", find_potential_outliers, tiered_teams)
+    timer.run(
+        "save_tier_results",
+        save_tier_results,
+        tiered_teams,
+        tier_profiles,
+        model,
+        os.path.join(workdir, "team_tiers.json"),
+    )
+    return timer.results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark one pipeline at one size (run by run_benchmarks.py)"
+    )
+    parser.add_argument("pipeline", choices=["player", "team"])
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--workdir", required=True)
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-fits", type=int, default=20)
+    parser.add_argument("--train-max-rows", type=int, default=10000)
+    parser.add_argument("--no-memory", action="store_true")
+    args = parser.parse_args()
+
+    os.makedirs(args.workdir, exist_ok=True)
+    # Results go to --output because the pipelines print progress to stdout
+    if args.pipeline == "player":
+        results = run_player_stages(
+            args.workdir,
+            args.rows,
+            args.seed,
+            args.max_fits,
+            args.train_max_rows,
+            not args.no_memory,
+        )
+    else:
+        results = run_team_stages(args.workdir, args.rows, args.seed, not args.no_memory)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f)
@@ -0,0 +1,176 @@
+import json
+import os
+import sys
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.columnar import columnar_path, save_frame
+from team_model.utils import read_team_columns, write_team_arrays
+
+DATE_RANGE = ("2022-01-01", "2025-12-31")
+
+
+def _sigmoid(x):
+    return 1 / (1 + np.exp(-x))
+
+
+def generate_player_stats(n_players: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Player stat table shaped like data/player_stats_recalculated.json.
+
+    Every stat is driven by one latent skill per player plus noise, so the
+    columns correlate the way real ones do (better players win more, kill
+    more per loss and reach more playoffs). Marginals roughly follow the real
+    data: at least 12 games, K/D around 0.9, win and playoff rates in percent.
+    """
+    rng = np.random.default_rng(seed)
+    skill = rng.normal(size=n_players)
+
+    games_played = np.clip(rng.lognormal(3.2, 0.5, n_players), 12, 150).astype(int)
+    games_won = rng.binomial(games_played, _sigmoid(0.9 * skill + rng.normal(0, 0.3, n_players)))
+    games_lost = games_played - games_won
+
+    kd_ratio = np.clip(0.93 + 0.12 * skill + rng.normal(0, 0.08, n_players), 0.5, 1.6)
+    losses_per_game = np.clip(rng.normal(1970, 190, n_players), 1400, 2500).astype(int)
+    kills_per_game = (losses_per_game * kd_ratio).astype(int)
+    chevrons_per_game = np.clip(6 + 1.8 * skill + rng.normal(0, 1, n_players), 0.3, 12)
+
+    seasons_played = np.maximum(2, np.ceil(games_played / 8).astype(int) + rng.poisson(0.5, n_players))
+    playoff_appearances = rng.binomial(seasons_played, _sigmoid(1.2 * skill + 0.5))
+    podium_chance = 0.25 * _sigmoid(2 * skill - 1)
+    championships = rng.binomial(playoff_appearances, podium_chance)
+    runner_ups = rng.binomial(playoff_appearances - championships, podium_chance)
+
+    return pd.DataFrame(
+        {
+            "Player": [f"Player{i:07d}" for i in range(n_players)],
+            "K/D ratio": kd_ratio,
+            "Chevrons/game": chevrons_per_game,
+            "Total Chevrons": np.round(chevrons_per_game * games_played).astype(int),
+            "Total Kills": kills_per_game * games_played,
+            "Total Losses": losses_per_game * games_played,
+            "Kills per Game": kills_per_game,
+            "Losses per Game": losses_per_game,
+            "Games Played": games_played,
+            "Games Won": games_won,
+            "Games Lost": games_lost,
+            "Win %": games_won / games_played * 100,
+            "DC's/Forfeits": rng.poisson(1.5, n_players),
+            "Seasons Played": seasons_played,
+            "Playoff Appearances": playoff_appearances,
+            "Playoff Rate": playoff_appearances / seasons_played * 100,
+            "Third Places": rng.binomial(playoff_appearances - championships - runner_ups, podium_chance),
+            "Runner-ups": runner_ups,
+            "Championships": championships,
+            "Top 3 Best KD Ratios": rng.poisson(np.clip(kd_ratio - 0.9, 0, None) * 2),
+            "Top 3 Most Chevrons/Game": rng.poisson(np.clip(chevrons_per_game - 6, 0, None) / 4),
+        }
+    )
+
+
+def write_player_stats(df: pd.DataFrame, json_path: str, write_json: bool = False):
+    """Write a player table as a columnar store (and optionally JSON) that load_data reads"""
+    save_frame(df, json_path, write_json=write_json)
+
+
+def write_team_data(
+    json_path: str,
+    n_teams: int,
+    mean_matches: float = 12,
+    seed: int = 0,
+    write_json: bool = False,
+):
+    """
+    Write an elo_rating.json-shaped team file with n_teams teams.
+
+    Games are drawn between random pairs of distinct teams, won by the
+    stronger side with Elo-logistic probability, dated uniformly over
+    DATE_RANGE, and listed in both teams' match lists like the real data.
+    The store is assembled column-wise, so generating 10^6 teams never
+    builds per-match dicts; JSON is only produced with write_json=True.
+    """
+    rng = np.random.default_rng(seed)
+    strength = rng.normal(1000, 60, n_teams)
+
+    n_games = int(n_teams * mean_matches / 2)
+    home = rng.integers(0, n_teams, n_games)
+    away = (home + rng.integers(1, max(n_teams, 2), n_games)) % n_teams
+    home_wins = rng.random(n_games) < 1 / (1 + 10 ** ((strength[away] - strength[home]) / 400))
+
+    start, end = (np.datetime64(day) for day in DATE_RANGE)
+    game_dates = start + rng.integers(0, int((end - start).astype(int)) + 1, n_games)
+
+    team_idx = np.concatenate([home, away])
+    opponent_idx = np.concatenate([away, home])
+    won = np.concatenate([home_wins, ~home_wins])
+    dates = np.concatenate([game_dates, game_dates])
+
+    order = np.lexsort((dates, team_idx))
+    names = np.array([f"Team{i:07d}" for i in range(n_teams)])
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(team_idx, minlength=n_teams))])
+
+    cols_path = columnar_path(json_path)
+    write_team_arrays(
+        cols_path,
+        names,
+        strength,
+        offsets,
+        names[opponent_idx[order]],
+        np.where(won[order], "Win", "Loss"),
+        dates[order],
+    )
+
+    if write_json:
+        with open(json_path, "w") as f:
+            json.dump({"teams": read_team_columns(cols_path)}, f, indent=4)
+        # Keep the columnar store the fresher of the two so loaders still prefer it
+        os.utime(os.path.join(cols_path, "manifest.json"))
+
+
+def write_synthetic_data(
+    output_dir: str,
+    n_players: Optional[int] = None,
+    n_teams: Optional[int] = None,
+    seed: int = 0,
+    write_json: bool = False,
+):
+    """Write synthetic player_stats.json and elo_rating.json stores into output_dir"""
+    os.makedirs(output_dir, exist_ok=True)
+    if n_players:
+        write_player_stats(
+            generate_player_stats(n_players, seed),
+            os.path.join(output_dir, "player_stats.json"),
+            write_json=write_json,
+        )
+    if n_teams:
+        write_team_data(
+            os.path.join(output_dir, "elo_rating.json"),
+            n_teams,
+            seed=seed,
+            write_json=write_json,
+        )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate synthetic player and team data")
+    parser.add_argument("--output-dir", required=True)
+    parser.add_argument("--players", type=float, default=0, help="e.g. 1e5")
+    parser.add_argument("--teams", type=float, default=0, help="e.g. 1e4")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Also write JSON files next to the columnar stores",
+    )
+    args = parser.parse_args()
+
+    write_synthetic_data(
+        args.output_dir, int(args.players), int(args.teams), args.seed, args.json
+    )
+    print(f"Synthetic data written to {args.output_dir}")
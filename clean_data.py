@@ -1,35 +1,220 @@
 import json
-with open("player_stats_historical.json", "r") as f:
-    raw_data = json.load(f)
-
-cleaned_data = []
-for record in raw_data:
-    cleaned_record = {}
-
-    for key, value in record.items():
-        if value == "":
-            cleaned_record[key] = None
-            continue
-        if isinstance(value, str) and "," in value:
-            value = value.replace(",", "")
-        if isinstance(value, str) and value.endswith("%"):
-            try:
-                cleaned_record[key] = float(value.strip("%")) / 100
-            except ValueError:
-                cleaned_record[key] = None
-            continue
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data.columnar import write_columns
+from data.json_stream import iter_chunks, iter_json_records
+from data.player_stats import MIN_GAMES_PLAYED
+
+CHUNK_SIZE = 5000
+
+
+def clean_value(value):
+    """Empty strings become None, "1,234" -> 1234.0, "16.7%" -> 0.167, other numbers -> float"""
+    if value == "":
+        return None
+    if isinstance(value, str) and "," in value:
+        value = value.replace(",", "")
+    if isinstance(value, str) and value.endswith("%"):
         try:
-            cleaned_record[key] = float(value)
-        except (ValueError, TypeError):
-            cleaned_record[key] = value
+            return float(value.strip("%")) / 100
+        except ValueError:
+            return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return value
+
+
+def clean_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: clean_value(value) for key, value in record.items()}
+
+
+def clean_chunk(
+    records: List[Dict[str, Any]], min_games_played: float = MIN_GAMES_PLAYED
+) -> List[Dict[str, Any]]:
+    """Clean a chunk of raw records and drop players below the games threshold"""
+    cleaned = (clean_record(record) for record in records)
+    return [
+        player
+        for player in cleaned
+        if (player.get("Games Played", 0) or 0) >= min_games_played
+    ]
+
+
+def clean_chunks(
+    chunks: Iterator[List[Dict[str, Any]]],
+    min_games_played: float = MIN_GAMES_PLAYED,
+    workers: Optional[int] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Clean chunks across a process pool, yielding results in input order.
+
+    At most two chunks per worker are in flight, so memory stays bounded by the
+    chunk size rather than the input size. workers=1 cleans in-process.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in chunks:
+            yield clean_chunk(chunk, min_games_played)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(clean_chunk, chunk, min_games_played))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class JsonArrayWriter:
+    """Writes records as an indented JSON array, the format of the original cleaner"""
+
+    def __init__(self, file_path: str):
+        self.file = open(file_path, "w")
+        self.count = 0
+
+    def write(self, records: List[Dict[str, Any]]):
+        for record in records:
+            prefix = ",\n" if self.count else "[\n"
+            body = json.dumps(record, indent=4).replace("\n", "\n    ")
+            self.file.write(prefix + "    " + body)
+            self.count += 1
+
+    def close(self):
+        self.file.write("\n]" if self.count else "[]")
+        self.file.close()
+
+
+class NdjsonWriter:
+    """Writes one JSON record per line"""
+
+    def __init__(self, file_path: str):
+        self.file = open(file_path, "w")
+        self.count = 0
+
+    def write(self, records: List[Dict[str, Any]]):
+        self.file.writelines(json.dumps(record) + "\n" for record in records)
+        self.count += len(records)
+
+    def close(self):
+        self.file.close()
+
+
+class ColumnarWriter:
+    """Collects cleaned chunks as typed column arrays and writes a columnar store on close.
+
+    Numeric columns are held as float arrays, so memory grows with the number
+    of kept players times the number of columns, not with the size of the
+    raw JSON. Missing values become NaN (numeric) or "" (text).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.columns: Dict[str, List[np.ndarray]] = {}
+        self.count = 0
+
+    def write(self, records: List[Dict[str, Any]]):
+        if not records:
+            return
+        # Keys can first appear in any record; earlier rows are back-filled as missing
+        for record in records:
+            for key in record:
+                if key not in self.columns:
+                    self.columns[key] = [np.full(self.count, np.nan)] if self.count else []
+
+        for key, parts in self.columns.items():
+            values = [record.get(key) for record in records]
+            if any(isinstance(value, str) for value in values):
+                parts.append(
+                    np.array(["" if value is None else str(value) for value in values])
+                )
+            else:
+                parts.append(
+                    np.array(
+                        [np.nan if value is None else value for value in values],
+                        dtype=float,
+                    )
+                )
+        self.count += len(records)
+
+    def close(self):
+        columns = {}
+        for key, parts in self.columns.items():
+            if any(part.dtype.kind == "U" for part in parts):
+                parts = [
+                    part if part.dtype.kind == "U"
+                    else np.where(np.isnan(part), "", part.astype(str))
+                    for part in parts
+                ]
+            columns[key] = np.concatenate(parts)
+        write_columns(self.path, columns, {"rows": self.count})
+
+
+def open_writer(output_file: str):
+    """Pick the output format from the file extension: .ndjson/.jsonl, .cols or .json"""
+    extension = os.path.splitext(output_file)[1]
+    if extension in (".ndjson", ".jsonl"):
+        return NdjsonWriter(output_file)
+    if extension == ".cols":
+        return ColumnarWriter(output_file)
+    return JsonArrayWriter(output_file)
+
+
+def clean_data(
+    input_file: str = "data/player_stats_historical.json",
+    output_file: str = "data/player_stats_cleaned.json",
+    min_games_played: float = MIN_GAMES_PLAYED,
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> int:
+    """Stream raw player stats through the cleaner and write the kept players.
+
+    Returns the number of players written.
+    """
+    chunks = iter_chunks(iter_json_records(input_file), chunk_size)
+    writer = open_writer(output_file)
+    try:
+        for cleaned in clean_chunks(chunks, min_games_played, workers):
+            writer.write(cleaned)
+    finally:
+        writer.close()
+    return writer.count
 
-    cleaned_data.append(cleaned_record)
 
-filtered_data = [
-    player for player in cleaned_data if (player.get("Games Played", 0) or 0) >= 12
-]
+if __name__ == "__main__":
+    import argparse
 
-with open("player_stats_cleaned.json", "w") as f:
-    json.dump(filtered_data, f, indent=4)
+    parser = argparse.ArgumentParser(description="Clean raw historical player stats")
+    parser.add_argument("--input-file", default="data/player_stats_historical.json")
+    parser.add_argument(
+        "--output-file",
+        default="data/player_stats_cleaned.json",
+        help="Output format follows the extension: .json, .ndjson/.jsonl or .cols",
+    )
+    parser.add_argument("--min-games", type=float, default=MIN_GAMES_PLAYED)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Cleaning processes (default: all CPUs, 1 cleans in-process)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
 
-print("Cleaned data saved to player_stats_cleaned.json")
+    count = clean_data(
+        args.input_file,
+        args.output_file,
+        args.min_games,
+        args.workers,
+        args.chunk_size,
+    )
+    print(f"Cleaned data for {count} players saved to {args.output_file}")
@@ -0,0 +1,137 @@
+import json
+import os
+import shutil
+from typing import Dict, Any, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+MANIFEST_FILE = "manifest.json"
+FORMAT_VERSION = 1
+
+
+def columnar_path(json_path: str) -> str:
+    """Columnar store kept next to a JSON artifact: data/x.json -> data/x.cols"""
+    return os.path.splitext(json_path)[0] + ".cols"
+
+
+def has_fresh_columns(json_path: str) -> bool:
+    """True if the columnar store exists and is at least as new as the JSON export"""
+    manifest_file = os.path.join(columnar_path(json_path), MANIFEST_FILE)
+    if not os.path.exists(manifest_file):
+        return False
+    if not os.path.exists(json_path):
+        return True
+    return os.path.getmtime(manifest_file) >= os.path.getmtime(json_path)
+
+
+def to_storable(values, name: str = "") -> np.ndarray:
+    """Convert a column to a fixed-width array that np.load can memory-map.
+
+    Object columns of numbers become float; columns with any strings become
+    text, so a stray "N/A" among numbers is stored as a string column
+    rather than failing the save. Missing values are NaN or "".
+
+    Raises:
+        ValueError: If the column holds values that are neither strings
+                    nor numbers.
+    """
+    array = np.asarray(values)
+    if array.dtype.kind != "O":
+        return array
+
+    non_null = [value for value in array if value is not None and value == value]
+    if all(isinstance(value, (int, float, np.number)) for value in non_null):
+        return array.astype(float)
+    if all(isinstance(value, (str, int, float, np.number)) for value in non_null):
+        return np.array(
+            ["" if value is None or value != value else str(value) for value in array],
+            dtype=str,
+        )
+
+    kinds = sorted({type(value).__name__ for value in non_null})
+    raise ValueError(f"Column {name!r} mixes unsupported value types: {', '.join(kinds)}")
+
+
+def write_columns(
+    path: str, columns: Dict[str, Any], meta: Optional[Dict[str, Any]] = None
+):
+    """Write each column to its own .npy file plus a manifest.
+
+    Columns may have different lengths, which lets one store hold related tables
+    (e.g. teams and their flattened matches). The store is written to a
+    temporary directory and swapped in, so readers never see a partial write.
+    """
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    manifest = {"format": FORMAT_VERSION, "columns": [], "meta": meta or {}}
+    for i, (name, values) in enumerate(columns.items()):
+        array = to_storable(values, name)
+        file_name = f"c{i:03d}.npy"
+        np.save(os.path.join(tmp_path, file_name), array, allow_pickle=False)
+        manifest["columns"].append(
+            {
+                "name": name,
+                "file": file_name,
+                "dtype": array.dtype.str,
+                "length": len(array),
+            }
+        )
+
+    with open(os.path.join(tmp_path, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+
+
+def read_columns(
+    path: str, mmap: bool = True
+) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Read a columnar store; numeric columns are memory-mapped read-only"""
+    with open(os.path.join(path, MANIFEST_FILE), "r") as f:
+        manifest = json.load(f)
+
+    columns = {
+        column["name"]: np.load(
+            os.path.join(path, column["file"]),
+            mmap_mode="r" if mmap else None,
+            allow_pickle=False,
+        )
+        for column in manifest["columns"]
+    }
+    return columns, manifest["meta"]
+
+
+def write_frame(df: pd.DataFrame, path: str, meta: Optional[Dict[str, Any]] = None):
+    write_columns(path, {name: df[name].to_numpy() for name in df.columns}, meta)
+
+
+def read_frame(path: str) -> pd.DataFrame:
+    """Read a columnar store as a DataFrame without copying its numeric columns"""
+    columns, _ = read_columns(path)
+    return pd.DataFrame(columns, copy=False)
+
+
+def save_frame(df: pd.DataFrame, json_path: str, write_json: bool = True):
+    """Save a table as a columnar store, optionally also exporting records JSON"""
+    if write_json:
+        df.to_json(json_path, orient="records", indent=4)
+    write_frame(df.reset_index(drop=True), columnar_path(json_path))
+
+
+def load_frame(json_path: str, normalize: bool = False) -> pd.DataFrame:
+    """Load a tabular artifact, preferring its columnar store over the JSON.
+
+    With normalize=True the JSON is treated as nested records and flattened
+    with pd.json_normalize, matching how nested artifacts are stored in
+    columnar form.
+    """
+    if has_fresh_columns(json_path):
+        return read_frame(columnar_path(json_path))
+
+    if normalize:
+        with open(json_path, "r") as f:
+            return pd.json_normalize(json.load(f))
+    return pd.read_json(json_path)
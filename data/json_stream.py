@@ -0,0 +1,75 @@
+import json
+import re
+from typing import Any, Iterator, List
+
+READ_SIZE = 1 << 16
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+SEPARATOR = re.compile(r"[ \t\n\r]*,?[ \t\n\r]*")
+
+
+def iter_json_records(file_path: str, read_size: int = READ_SIZE) -> Iterator[Any]:
+    """Yield records one at a time from a JSON array or newline-delimited JSON file.
+
+    Only a window of the file is held in memory, so inputs larger than RAM can
+    be streamed.
+    """
+    decoder = json.JSONDecoder()
+
+    with open(file_path, "r") as file:
+        buffer = file.read(read_size).lstrip()
+        if not buffer.startswith("["):
+            for line in _iter_lines(buffer, file, read_size):
+                if line.strip():
+                    yield json.loads(line)
+            return
+
+        # Decode in place from pos; the buffer is only rebuilt when more of
+        # the file is read, not after every record
+        pos = WHITESPACE.match(buffer, 1).end()
+        eof = False
+        while True:
+            if buffer.startswith("]", pos):
+                return
+
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+                next_pos = SEPARATOR.match(buffer, end).end()
+                # A value is only complete once the separator after it has been read
+                complete = eof or next_pos < len(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+
+            if complete:
+                yield record
+                pos = next_pos
+                continue
+
+            chunk = file.read(read_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = WHITESPACE.match(buffer).end()
+
+
+def _iter_lines(buffer: str, file, read_size: int) -> Iterator[str]:
+    while True:
+        *lines, buffer = buffer.split("\n")
+        yield from lines
+        chunk = file.read(read_size)
+        if not chunk:
+            yield buffer
+            return
+        buffer += chunk
+
+
+def iter_chunks(records: Iterator[Any], chunk_size: int) -> Iterator[List[Any]]:
+    """Group a record stream into lists of up to chunk_size records"""
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,67 @@
+import os
+from typing import List, Tuple
+import joblib
+import numpy as np
+from sklearn.neighbors import KDTree
+
+DEFAULT_LEAF_SIZE = 40
+
+
+def neighbors_path(json_path: str) -> str:
+    """Neighbour index kept next to a JSON artifact: data/x.json -> data/x.neighbors.joblib"""
+    return os.path.splitext(json_path)[0] + ".neighbors.joblib"
+
+
+class NeighborIndex:
+    """
+    KD-tree over scaled feature vectors, answering "which entities are most
+    similar to this one" in O(log n) instead of scanning the table.
+
+    Features should be standardized first so each one weighs the same in the
+    Euclidean distance. The tree holds its own copy of the vectors, so a
+    query only needs the entity's name.
+    """
+
+    def __init__(self, names, X: np.ndarray, leaf_size: int = DEFAULT_LEAF_SIZE):
+        self.names = np.asarray(names, dtype=object)
+        self.tree = KDTree(np.asarray(X, dtype=float), leaf_size=leaf_size)
+        self._build_positions()
+
+    def _build_positions(self):
+        self.positions = {name: i for i, name in enumerate(self.names.tolist())}
+
+    def __getstate__(self):
+        # The name -> row dict is rebuilt on load rather than pickled
+        return {"names": self.names, "tree": self.tree}
+
+    def __setstate__(self, state):
+        self.names = state["names"]
+        self.tree = state["tree"]
+        self._build_positions()
+
+    def __contains__(self, name):
+        return name in self.positions
+
+    def __len__(self):
+        return len(self.names)
+
+    def similar(self, name, k: int = 5) -> List[Tuple[str, float]]:
+        """The k entities closest to name, nearest first, as (name, distance) pairs"""
+        i = self.positions[name]
+        point = np.asarray(self.tree.data)[i : i + 1]
+        distances, indices = self.tree.query(point, k=min(k + 1, len(self.names)))
+        return [
+            (self.names[j], distance)
+            for distance, j in zip(distances[0].tolist(), indices[0].tolist())
+            if j != i
+        ][:k]
+
+
+def save_neighbor_index(index: NeighborIndex, path: str):
+    joblib.dump(index, path)
+
+
+def load_neighbor_index(path: str) -> NeighborIndex:
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    return joblib.load(path)
@@ -0,0 +1,3 @@
+# Players with fewer games than this are dropped from the player stats tables,
+# by clean_data.py and aggregate_games.py alike
+MIN_GAMES_PLAYED = 12
@@ -0,0 +1,164 @@
+import os
+import streamlit as st
+import pandas as pd
+from data.columnar import columnar_path, load_frame, MANIFEST_FILE
+from data.neighbors import load_neighbor_index, neighbors_path
+from team_model.head_to_head import load_head_to_head as _read_head_to_head
+from team_model.save_tier_results import read_tier_tables
+
+PLAYER_DATA_FILE = "data/player_data.json"
+TEAM_TIERS_FILE = "data/team_tiers.json"
+PLAYER_SHAP_FILE = "data/player_shap.json"
+HEAD_TO_HEAD_FILE = "data/team_head_to_head.cols"
+
+TIER_LABELS = [
+    "Legendary",
+    "Exceptional",
+    "Advanced",
+    "Skilled",
+    "Intermediate",
+    "Below Average",
+    "Beginner",
+]
+
+TEAM_COLUMNS = {
+    "Team_Name": "team_name",
+    "Tier": "tier",
+    "Distance_From_Best": "distance_from_best",
+    "Features.Elo_Rating": "elo_rating",
+    "Features.Win_Rate": "win_rate",
+    "Features.Total_Matches": "total_matches",
+    "Rank_Within_Tier": "rank_within_tier",
+    "Placement_Explanation": "placement_explanation",
+    "Placement_Analysis": "placement_analysis",
+    "Cluster_Distance": "cluster_distance",
+    "Placement_Contributions.Elo_Rating": "diff_elo_rating",
+    "Placement_Contributions.Win_Rate": "diff_win_rate",
+    "Placement_Contributions.Total_Matches": "diff_total_matches",
+}
+
+TIER_PROFILE_COLUMNS = {
+    "Elo_Rating": "tier_elo_avg",
+    "Win_Rate": "tier_win_avg",
+    "Total_Matches": "tier_matches_avg",
+}
+
+
+class IndexedTable:
+    """
+    A loaded artifact shared by every session, plus an O(1) name -> row index.
+
+    The frame is shared across reruns and sessions, so pages must treat it as
+    read-only and work on filtered copies.
+    """
+
+    def __init__(self, frame, key_column):
+        self.frame = frame
+        self.key_column = key_column
+        self.index = {name: i for i, name in enumerate(frame[key_column].tolist())}
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def row(self, name):
+        return self.frame.iloc[self.index[name]]
+
+
+def file_version(json_path):
+    """Modification time of whichever of the JSON export and columnar store is newer"""
+    paths = [json_path, os.path.join(columnar_path(json_path), MANIFEST_FILE)]
+    mtimes = [os.path.getmtime(path) for path in paths if os.path.exists(path)]
+    if not mtimes:
+        raise FileNotFoundError(json_path)
+    return max(mtimes)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_players(filename, version):
+    return IndexedTable(load_frame(filename), "Player")
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_player_attributions(filename, version):
+    return IndexedTable(load_frame(filename), "Player")
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _load_neighbor_index(filename, version):
+    return load_neighbor_index(filename)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_head_to_head(filename, version):
+    return _read_head_to_head(filename)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_teams(filename, version):
+    frame, tier_profiles, model = read_tier_tables(filename)
+    df = frame.rename(columns=TEAM_COLUMNS)
+
+    # Placement explanations are rendered from the unrounded numbers
+    for column in ["elo_rating", "win_rate"]:
+        df[f"{column}_exact"] = df[column]
+
+    df["elo_rating"] = df["elo_rating"].round(1)
+    df["win_rate"] = df["win_rate"].round(1)
+    df["total_matches"] = df["total_matches"].astype(int)
+
+    df["tier"] = pd.Categorical(df["tier"], categories=TIER_LABELS, ordered=True)
+    df = df.sort_values(by="tier", kind="stable").reset_index(drop=True)
+
+    profiles = tier_profiles.rename(columns=TIER_PROFILE_COLUMNS)
+    for column in TIER_PROFILE_COLUMNS.values():
+        profiles[f"{column}_exact"] = profiles[column]
+    profiles["tier_elo_avg"] = profiles["tier_elo_avg"].round(1)
+    profiles["tier_win_avg"] = profiles["tier_win_avg"].round(1)
+    profiles["tier_matches_avg"] = profiles["tier_matches_avg"].round(0)
+    profiles.index = profiles.index.astype(str)
+
+    teams = IndexedTable(df, "team_name")
+    teams.tier_profiles = profiles
+    teams.feature_importance = dict(model["Feature_Importance"])
+    return teams
+
+
+def load_players(filename=PLAYER_DATA_FILE):
+    """Scored players, loaded once per file version and shared across sessions"""
+    return _load_players(filename, file_version(filename))
+
+
+def load_player_attributions(filename=PLAYER_SHAP_FILE):
+    """
+    Per-player SHAP attributions precomputed by the player pipeline: one
+    column per feature plus Base_Value, loaded once per file version.
+    """
+    return _load_player_attributions(filename, file_version(filename))
+
+
+def load_teams(filename=TEAM_TIERS_FILE):
+    """
+    Tiered teams with columns renamed and rounded for display, loaded once per
+    file version and shared across sessions. tier_profiles holds the average
+    Elo, win rate and matches of each tier and feature_importance the
+    clustering model's feature weights.
+    """
+    return _load_teams(filename, file_version(filename))
+
+
+def load_player_neighbors(filename=neighbors_path(PLAYER_DATA_FILE)):
+    """Similar-players index built by the player pipeline, loaded once per file version"""
+    return _load_neighbor_index(filename, file_version(filename))
+
+
+def load_team_neighbors(filename=neighbors_path(TEAM_TIERS_FILE)):
+    """Similar-teams index built by the team pipeline, loaded once per file version"""
+    return _load_neighbor_index(filename, file_version(filename))
+
+
+def load_head_to_head(filename=HEAD_TO_HEAD_FILE):
+    """
+    Head-to-head records and Elo expectancies of every team pair, built by
+    the team pipeline and loaded once per store version.
+    """
+    return _load_head_to_head(filename, file_version(filename))
@@ -1,9 +1,11 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from data_store import load_players, load_player_attributions
+
+INTERVAL_COLUMNS = ["Predicted_Score_Lower", "Predicted_Score_Upper", "Tier_Probability"]
 
 def display_player_prediction():
-    df = pd.read_json("data/player_data.json")
+    df = load_players().frame
 
     st.title("Player Scores and Tiers Dashboard")
 
@@ -19,6 +21,15 @@ def display_player_prediction():
         "F": "#B0B0B0",
     }
 
+    # Outputs of older pipeline runs have no per-tree intervals
+    has_intervals = set(INTERVAL_COLUMNS) <= set(df.columns)
+    error_bars = {}
+    if has_intervals:
+        error_bars = {
+            "error_x": df["Predicted_Score_Upper"] - df[score_type],
+            "error_x_minus": df[score_type] - df["Predicted_Score_Lower"],
+        }
+
     fig = px.scatter(
         df,
         x=score_type,
@@ -27,6 +38,7 @@ def display_player_prediction():
         color_discrete_map=color_map,
         hover_data=["Player", "Win %", "Chevrons/game", "Playoff Rate"],
         title=f"{score_type} vs K/D Ratio by Player Tier",
+        **error_bars,
     )
 
     st.plotly_chart(fig)
@@ -40,6 +52,8 @@ def display_player_prediction():
         "Playoff Rate",
         score_type,
     ]
+    if has_intervals:
+        columns_to_show += INTERVAL_COLUMNS
 
     df_display = (
         df[columns_to_show]
@@ -50,14 +64,69 @@ def display_player_prediction():
     df_display.index += 1
     df_display.index.name = "Rank"
 
+    formats = {
+        "Win %": "{:.2f}",
+        "K/D ratio": "{:.2f}",
+        "Chevrons/game": "{:.2f}",
+        "Playoff Rate": "{:.2f}",
+        score_type: "{:.2f}",
+        "Predicted_Score_Lower": "{:.2f}",
+        "Predicted_Score_Upper": "{:.2f}",
+        "Tier_Probability": "{:.0%}",
+    }
     df_display = df_display.style.format(
-        {
-            "Win %": "{:.2f}",
-            "K/D ratio": "{:.2f}",
-            "Chevrons/game": "{:.2f}",
-            "Playoff Rate": "{:.2f}",
-            score_type: "{:.2f}",
-        }
+        {column: fmt for column, fmt in formats.items() if column in columns_to_show}
     )
 
     st.dataframe(df_display)
+    if has_intervals:
+        st.caption(
+            "Error bars and Lower/Upper span the middle 80% of the forest's per-tree "
+            "predictions; Tier_Probability is the share of trees that place the player "
+            "in their tier. Players near a tier boundary have low tier probabilities."
+        )
+
+    show_player_attributions(df)
+
+
+def show_player_attributions(df):
+    st.subheader("What Drives a Player's Score")
+
+    try:
+        attributions = load_player_attributions()
+    except FileNotFoundError:
+        st.info("No SHAP attributions found. Run player_model/run_model.py to compute them.")
+        return
+
+    players = [name for name in df["Player"] if name in attributions]
+    if not players:
+        return
+
+    player = st.selectbox("Select a player", players, key="shap_player")
+    row = attributions.row(player)
+
+    contributions = (
+        row.drop(["Player", "Base_Value"])
+        .astype(float)
+        .sort_values(key=abs)
+        .rename("Contribution")
+        .rename_axis("Feature")
+        .reset_index()
+    )
+
+    fig = px.bar(
+        contributions,
+        x="Contribution",
+        y="Feature",
+        orientation="h",
+        color=contributions["Contribution"] > 0,
+        color_discrete_map={True: "#4CA64C", False: "#FF6347"},
+        title=f"Feature contributions to {player}'s predicted score",
+    )
+    fig.update_layout(showlegend=False)
+    st.plotly_chart(fig)
+
+    st.caption(
+        f"Average predicted score: {row['Base_Value']:.2f}; "
+        f"this player's features move it by {contributions['Contribution'].sum():+.2f}."
+    )
@@ -1,74 +1,104 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import json
-
-
-@st.cache_data
-def load_teams(filename="data/team_tiers.json"):
-    try:
-        with open(filename, "r") as f:
-            data = json.load(f)
-        return data
-    except FileNotFoundError:
-        st.error(
-            f"Error: Data file '{filename}' not found. Please ensure it's in the correct location."
+from data_store import load_teams, TIER_LABELS
+
+# (display name, feature, team value column, tier average column, difference column, unit)
+PLACEMENT_FEATURES = [
+    ("Elo Rating", "Elo_Rating", "elo_rating_exact", "tier_elo_avg_exact", "diff_elo_rating", ""),
+    ("Win Rate", "Win_Rate", "win_rate_exact", "tier_win_avg_exact", "diff_win_rate", "%"),
+    ("Total Matches", "Total_Matches", "total_matches", "tier_matches_avg_exact", "diff_total_matches", ""),
+]
+
+
+def render_placement_explanation(team, tier_profile, feature_importance):
+    """
+    Explain why a team is in its tier from the numbers the pipeline stored:
+    each feature's difference from the tier average (listed by descending
+    importance, skipping negligible ones) and the team's distance to its
+    cluster center. Files written before these numbers were stored carry the
+    rendered text instead, which is returned as is.
+    """
+    if "cluster_distance" not in team or pd.isna(team["cluster_distance"]):
+        return team.get("placement_explanation", "No explanation available")
+
+    tier = team["tier"]
+    parts = [f"Placed in {tier} tier based on:"]
+
+    features = sorted(
+        PLACEMENT_FEATURES,
+        key=lambda feature: feature_importance.get(feature[1], 0),
+        reverse=True,
+    )
+    for name, feature, value, tier_avg, difference, unit in features:
+        diff = team[difference]
+        if abs(diff) <= 0.1:
+            continue
+        strength = "significantly" if abs(diff) > tier_profile[tier_avg] * 0.2 else "slightly"
+        direction = "above" if diff > 0 else "below"
+        importance = feature_importance.get(feature, 0)
+        parts.append(
+            f"• {name}: {team[value]:.1f} (vs tier avg {tier_profile[tier_avg]:.1f}{unit}) - "
+            f"{strength} {direction} tier average [{importance * 100:.1f}% importance]"
         )
-        return []
+
+    distance = team["cluster_distance"]
+    if distance < 0.5:
+        fit = "Strong fit"
+    elif distance > 1.5:
+        fit = "Borderline case"
+    else:
+        fit = "Good fit"
+    parts.append(f"• {fit} for {tier} tier (distance: {distance:.2f})")
+
+    return " ".join(parts)
+
+
+def render_placement_analysis(team):
+    """Text for the Placement_Analysis code of a team; older files store the text itself"""
+    code = team.get("placement_analysis")
+    tier = team["tier"]
+    tier_idx = TIER_LABELS.index(tier) if tier in TIER_LABELS else None
+
+    if code == "above_range":
+        if tier_idx:
+            return (
+                f"Performs significantly better than typical {tier}-tier teams. "
+                f"Could potentially be {TIER_LABELS[tier_idx - 1]}-tier."
+            )
+        return f"Elite performer within {tier}-tier."
+    if code == "below_range":
+        if tier_idx is not None and tier_idx < len(TIER_LABELS) - 1:
+            return (
+                f"Performs significantly worse than typical {tier}-tier teams. "
+                f"Might be closer to {TIER_LABELS[tier_idx + 1]}-tier level."
+            )
+        return f"Below average for {tier}-tier."
+    if code == "above_average":
+        return f"Solid {tier}-tier performance, above tier average."
+    if code == "below_average":
+        return f"Typical {tier}-tier performance, below tier average."
+    if code == "standard":
+        return f"Standard {tier}-tier performance."
+    if isinstance(code, str) and code:
+        return code
+    return "No analysis available"
 
 
 def show_team_analysis():
     st.title("Team Tier & Placement Analysis")
 
-    data = load_teams()
-
-    if not data:
+    try:
+        teams = load_teams()
+    except FileNotFoundError as e:
+        st.error(
+            f"Error: Data file '{e}' not found. Please ensure it's in the correct location."
+        )
         return
 
-    df = pd.json_normalize(data)
-
-    df.rename(
-        columns={
-            "Team_Name": "team_name",
-            "Tier": "tier",
-            "Distance_From_Best": "distance_from_best",
-            "Features.Elo_Rating": "elo_rating",
-            "Features.Win_Rate": "win_rate",
-            "Features.Total_Matches": "total_matches",
-            "Rank_Within_Tier": "rank_within_tier",
-            "Placement_Explanation": "placement_explanation",
-            "Tier_Profile.Elo_Rating": "tier_elo_avg",
-            "Tier_Profile.Win_Rate": "tier_win_avg",
-            "Tier_Profile.Total_Matches": "tier_matches_avg",
-            "Feature_Importance.Elo_Rating": "fi_elo_rating",
-            "Feature_Importance.Win_Rate": "fi_win_rate",
-            "Feature_Importance.Total_Matches": "fi_total_matches",
-        },
-        inplace=True,
-    )
-
-    df["elo_rating"] = df["elo_rating"].round(1)
-    df["win_rate"] = df["win_rate"].round(1)
-    df["total_matches"] = df["total_matches"].round(0)
-
-    df["tier_elo_avg"] = df["tier_elo_avg"].round(1)
-    df["tier_win_avg"] = df["tier_win_avg"].round(1)
-    df["tier_matches_avg"] = df["tier_matches_avg"].round(0)
-
-    ordered_tier_labels = [
-        "Legendary",
-        "Exceptional",
-        "Advanced",
-        "Skilled",
-        "Intermediate",
-        "Below Average",
-        "Beginner",
-    ]
-
-    df["tier"] = pd.Categorical(
-        df["tier"], categories=ordered_tier_labels, ordered=True
-    )
-    df.sort_values(by="tier", inplace=True)
+    df = teams.frame
+    if df.empty:
+        return
 
     tier_colors = {
         "Legendary": "#FFD700",
@@ -86,7 +116,7 @@ def show_team_analysis():
         int(df["total_matches"].max()),
         1,
     )
-    df_filtered = df[df["total_matches"] >= min_matches].copy()
+    df_filtered = df[df["total_matches"] >= min_matches]
 
     st.subheader("Summary Table")
 
@@ -122,9 +152,7 @@ def show_team_analysis():
     )
 
     if selected_team_name:
-        selected_team_row = df_filtered[
-            df_filtered["team_name"] == selected_team_name
-        ].iloc[0]
+        selected_team_row = teams.row(selected_team_name)
 
         with st.expander(
             f"Detailed Analysis for {selected_team_row['team_name']} ({selected_team_row['tier']}-Tier)",
@@ -137,20 +165,15 @@ def show_team_analysis():
             )
 
             st.markdown("### Placement Explanation")
-            st.markdown(selected_team_row["placement_explanation"])
-
-            tier_avg_data = df[
-                ["tier", "tier_elo_avg", "tier_win_avg", "tier_matches_avg"]
-            ].drop_duplicates()
-            tier_avg_data["tier"] = pd.Categorical(
-                tier_avg_data["tier"], categories=ordered_tier_labels, ordered=True
+            selected_tier_avg = teams.tier_profiles.loc[selected_team_row["tier"]]
+            st.markdown(
+                render_placement_explanation(
+                    selected_team_row, selected_tier_avg, teams.feature_importance
+                )
             )
-            tier_avg_data = tier_avg_data.sort_values("tier")
+            st.markdown(f"*{render_placement_analysis(selected_team_row)}*")
 
             st.markdown("#### Comparison vs Tier Average")
-            selected_tier_avg = tier_avg_data[
-                tier_avg_data["tier"] == selected_team_row["tier"]
-            ].iloc[0]
 
             col1, col2, col3 = st.columns(3)
 
@@ -1,4 +1,9 @@
+import os
+import sys
 import streamlit as st
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from display_player_prediction import display_player_prediction
 from player_comparison import show_player_comparison
 from display_team_prediction import show_team_analysis
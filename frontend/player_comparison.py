@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+from data_store import load_players, load_player_neighbors
 
 
 def percent_str_to_float(s):
@@ -12,10 +13,54 @@ def percent_str_to_float(s):
         return float(s)
 
 
+def show_similar_players(players, default_player):
+    st.markdown("---")
+    st.subheader("Similar Players")
+
+    try:
+        neighbors = load_player_neighbors()
+    except FileNotFoundError:
+        st.info("No similar-players index found. Run player_model/run_model.py to build it.")
+        return
+
+    options = [name for name in players.frame["Player"] if name in neighbors]
+    if not options:
+        return
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        player = st.selectbox(
+            "Find players similar to",
+            options,
+            index=options.index(default_player) if default_player in options else 0,
+            key="similar_player",
+        )
+    with col2:
+        k = st.number_input("Players", min_value=1, max_value=50, value=5, key="similar_player_k")
+
+    similar = [(name, distance) for name, distance in neighbors.similar(player, int(k)) if name in players]
+    table = pd.DataFrame(
+        [
+            {
+                "Player": name,
+                "Distance": round(distance, 3),
+                "Tier": players.row(name)["Tier"],
+                "Predicted_Score": players.row(name)["Predicted_Score"],
+                "K/D ratio": players.row(name)["K/D ratio"],
+                "Win %": players.row(name)["Win %"],
+            }
+            for name, distance in similar
+        ]
+    )
+    st.dataframe(table, hide_index=True)
+    st.caption("Distance between standardized model features; smaller is more similar.")
+
+
 def show_player_comparison():
     st.title("Player vs Player Comparison")
 
-    df = pd.read_json("data/player_data.json")
+    players = load_players()
+    df = players.frame
 
     features = [
         "K/D ratio",
@@ -41,10 +86,11 @@ def show_player_comparison():
 
     if player1 == player2:
         st.warning("Please select two different players.")
+        show_similar_players(players, player1)
         return
 
-    p1 = df[df["Player"] == player1].iloc[0]
-    p2 = df[df["Player"] == player2].iloc[0]
+    p1 = players.row(player1)
+    p2 = players.row(player2)
 
     p1_wins = 0
     p2_wins = 0
@@ -93,3 +139,5 @@ def show_player_comparison():
         st.success(f"🏆 **{winner} wins the comparison!**")
     else:
         st.info("⚖️ It's a tie!")
+
+    show_similar_players(players, player1)
@@ -1,40 +1,127 @@
 import streamlit as st
 import pandas as pd
-import json
+from data_store import load_teams, load_team_neighbors, load_head_to_head, TIER_LABELS
 
 
-@st.cache_data
-def load_teams(filename="data/team_tiers.json"):
+def show_head_to_head(team1, team2):
+    st.markdown("---")
+    st.subheader("Head-to-Head")
+
     try:
-        with open(filename, "r") as f:
-            data = json.load(f)
-        return pd.json_normalize(data)
+        head_to_head = load_head_to_head()
     except FileNotFoundError:
-        st.error(f"Error: Data file '{filename}' not found.")
-        return pd.DataFrame()
+        st.info("No head-to-head index found. Run team_model/run_model.py to build it.")
+        return
 
+    if team1 not in head_to_head or team2 not in head_to_head:
+        st.info("No head-to-head data for these teams.")
+        return
 
-def show_team_comparison():
-    st.title("Team vs Team Comparison")
+    record = head_to_head.record(team1, team2)
+    expected = head_to_head.expected(team1, team2)
 
-    df = load_teams()
-    if df.empty:
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric(label=f"Wins ({team1})", value=record["Wins"])
+        st.metric(label=f"Elo Win Probability ({team1})", value=f"{expected:.0%}")
+    with col2:
+        st.metric(label=f"Wins ({team2})", value=record["Losses"])
+        st.metric(label=f"Elo Win Probability ({team2})", value=f"{1 - expected:.0%}")
+
+    if record["Games"]:
+        draws = f", {record['Draws']} drawn" if record["Draws"] else ""
+        st.caption(f"{record['Games']} games played{draws}, last met on {record['Last Met']}.")
+    else:
+        st.caption("These teams have not played each other.")
+
+
+def show_league_cross_table(teams):
+    try:
+        head_to_head = load_head_to_head()
+    except FileNotFoundError:
         return
 
-    df.rename(
-        columns={
-            "Team_Name": "team_name",
-            "Features.Elo_Rating": "elo_rating",
-            "Features.Win_Rate": "win_rate",
-            "Features.Total_Matches": "total_matches",
-            "Tier": "tier",
-        },
-        inplace=True,
+    with st.expander("League Cross-Table"):
+        df = teams.frame
+        tiers = [tier for tier in TIER_LABELS if (df["tier"] == tier).any()]
+        col1, col2 = st.columns(2)
+        with col1:
+            tier = st.selectbox("Tier", ["All"] + tiers, key="cross_table_tier")
+        with col2:
+            view = st.radio(
+                "Show", ["Record", "Elo Win Probability"], horizontal=True, key="cross_table_view"
+            )
+
+        names = df["team_name"] if tier == "All" else df.loc[df["tier"] == tier, "team_name"]
+        names = [name for name in names if name in head_to_head]
+        tables = head_to_head.cross_table(names)
+
+        if view == "Record":
+            table = (
+                tables["Wins"].astype(str) + "-" + tables["Losses"].astype(str)
+            ).where(tables["Games"] > 0, "")
+            st.dataframe(table)
+            st.caption("Row team's wins-losses against the column team.")
+        else:
+            st.dataframe(tables["Expected"].style.format("{:.0%}"))
+            st.caption("Row team's Elo expected score against the column team.")
+
+
+def show_similar_teams(teams, default_team):
+    st.markdown("---")
+    st.subheader("Similar Teams")
+
+    try:
+        neighbors = load_team_neighbors()
+    except FileNotFoundError:
+        st.info("No similar-teams index found. Run team_model/run_model.py to build it.")
+        return
+
+    options = [name for name in teams.frame["team_name"] if name in neighbors]
+    if not options:
+        return
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        team = st.selectbox(
+            "Find teams similar to",
+            options,
+            index=options.index(default_team) if default_team in options else 0,
+            key="similar_team",
+        )
+    with col2:
+        k = st.number_input("Teams", min_value=1, max_value=50, value=5, key="similar_team_k")
+
+    similar = [(name, distance) for name, distance in neighbors.similar(team, int(k)) if name in teams]
+    table = pd.DataFrame(
+        [
+            {
+                "Team Name": name,
+                "Distance": round(distance, 3),
+                "Tier": teams.row(name)["tier"],
+                "ELO Rating": teams.row(name)["elo_rating"],
+                "Win Rate (%)": teams.row(name)["win_rate"],
+                "Total Matches": teams.row(name)["total_matches"],
+            }
+            for name, distance in similar
+        ]
     )
+    st.dataframe(table, hide_index=True)
+    st.caption("Distance between standardized clustering features; smaller is more similar.")
 
-    df["elo_rating"] = df["elo_rating"].round(1)
-    df["win_rate"] = df["win_rate"].round(1)
-    df["total_matches"] = df["total_matches"].astype(int)
+
+def show_team_comparison():
+    st.title("Team vs Team Comparison")
+
+    try:
+        teams = load_teams()
+    except FileNotFoundError as e:
+        st.error(f"Error: Data file '{e}' not found.")
+        return
+
+    df = teams.frame
+    if df.empty:
+        return
 
     team_options = df["team_name"].unique()
 
@@ -48,10 +135,12 @@ def show_team_comparison():
 
     if team1 == team2:
         st.warning("Please select two different teams.")
+        show_league_cross_table(teams)
+        show_similar_teams(teams, team1)
         return
 
-    team1_data = df[df["team_name"] == team1].iloc[0]
-    team2_data = df[df["team_name"] == team2].iloc[0]
+    team1_data = teams.row(team1)
+    team2_data = teams.row(team2)
 
     stat_names = ["ELO Rating", "Win Rate (%)", "Total Matches"]
     stat_keys = ["elo_rating", "win_rate", "total_matches"]
@@ -74,3 +163,7 @@ def show_team_comparison():
             st.metric(label=f"{label} ({team1})", value=val1, delta=f"{delta:+}")
         with col2:
             st.metric(label=f"{label} ({team2})", value=val2, delta=f"{-delta:+}")
+
+    show_head_to_head(team1, team2)
+    show_league_cross_table(teams)
+    show_similar_teams(teams, team1)
@@ -0,0 +1,75 @@
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from pipeline.dag import run_pipeline
+from pipeline.instrumentation import (
+    add_instrumentation_arguments,
+    instrumentation_from_args,
+    finish_from_args,
+)
+from pipeline.stages import DATA_DIR, pipeline_stages
+
+STATE_FILE = "pipeline_state.json"
+LOG_DIR = "pipeline_logs"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m pipeline",
+        description="Bring the player and team pipeline outputs up to date",
+    )
+    parser.add_argument(
+        "stages",
+        nargs="*",
+        help="Stages to run together with their upstream stages (default: all)",
+    )
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument(
+        "--state-file",
+        default=None,
+        help=f"Keys of the last successful runs (default: DATA_DIR/{STATE_FILE})",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Run the selected stages even if their inputs and code are unchanged",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Stages run concurrently (default: every independent stage)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only list which stages are out of date",
+    )
+    add_instrumentation_arguments(parser)
+    args = parser.parse_args()
+
+    data_dir = os.path.abspath(args.data_dir)
+    instrumentation = instrumentation_from_args("pipeline", args)
+    try:
+        status = run_pipeline(
+            pipeline_stages(data_dir),
+            state_file=args.state_file or os.path.join(data_dir, STATE_FILE),
+            log_dir=os.path.join(data_dir, LOG_DIR),
+            root_dir=ROOT_DIR,
+            targets=args.stages,
+            force=args.force,
+            jobs=args.jobs,
+            dry_run=args.dry_run,
+            instrumentation=instrumentation,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    finish_from_args(instrumentation, args)
+
+    if any(result in ("failed", "blocked") for result in status.values()):
+        sys.exit(1)
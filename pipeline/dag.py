@@ -0,0 +1,374 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import redirect_stderr, redirect_stdout
+from importlib import import_module
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Set
+
+from pipeline.instrumentation import Instrumentation
+
+STATE_VERSION = 1
+HASH_BLOCK_SIZE = 1 << 20
+
+
+class Stage:
+    """
+    One step of a pipeline: a function and the files it reads and writes.
+
+    func is a "module:function" reference called with params as keyword
+    arguments in a worker process. inputs and outputs are file or directory
+    paths; a stage depends on the stages that produce its inputs. code lists
+    the source files and packages whose .py files the stage runs, so editing
+    them invalidates its cached outputs. With instrumented set, func also
+    receives an Instrumentation to record its own spans in.
+    """
+
+    __slots__ = ("name", "func", "inputs", "outputs", "code", "params", "instrumented")
+
+    def __init__(
+        self,
+        name: str,
+        func: str,
+        inputs: Sequence[str] = (),
+        outputs: Sequence[str] = (),
+        code: Sequence[str] = (),
+        params: Optional[Dict[str, Any]] = None,
+        instrumented: bool = False,
+    ):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.code = list(code)
+        self.params = dict(params or {})
+        self.instrumented = instrumented
+
+
+class FileHasher:
+    """
+    SHA-256 digests of files and directories. A file whose size and mtime
+    match the last time it was hashed (known maps path -> [size, mtime_ns,
+    digest]) is not read again, so checking unchanged multi-GB inputs costs
+    a stat call.
+    """
+
+    def __init__(self, known: Optional[Dict[str, List[Any]]] = None):
+        self.known = dict(known or {})
+
+    def file_digest(self, path: str) -> str:
+        stat = os.stat(path)
+        cached = self.known.get(path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+        self.known[path] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def digest(self, path: str, suffix: str = "") -> Optional[str]:
+        """
+        Digest of a file, or of the relative paths and digests of the files
+        under a directory (only those ending in suffix); None if path does
+        not exist.
+        """
+        if os.path.isfile(path):
+            return self.file_digest(path)
+        if not os.path.isdir(path):
+            return None
+
+        digest = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+            for name in sorted(files):
+                if name.endswith(suffix):
+                    file_path = os.path.join(root, name)
+                    relative = os.path.relpath(file_path, path)
+                    digest.update(f"{relative}\0{self.file_digest(file_path)}\n".encode())
+        return digest.hexdigest()
+
+
+def stage_key(stage: Stage, hasher: FileHasher, root_dir: str) -> str:
+    """Content address of a stage run: its function, parameters, input bytes and code"""
+    description = {
+        "func": stage.func,
+        "params": stage.params,
+        "inputs": {path: hasher.digest(path) for path in stage.inputs},
+        "code": {path: hasher.digest(os.path.join(root_dir, path), ".py") for path in stage.code},
+    }
+    return hashlib.sha256(
+        json.dumps(description, sort_keys=True, default=str).encode()
+    ).hexdigest()[:32]
+
+
+def _is_within(path: str, directory: str) -> bool:
+    return path == directory or path.startswith(directory.rstrip(os.sep) + os.sep)
+
+
+def stage_dependencies(stages: Sequence[Stage]) -> Dict[str, Set[str]]:
+    """Names of the stages each stage depends on, i.e. that produce one of its inputs"""
+    producers = {}
+    for stage in stages:
+        for output in stage.outputs:
+            if output in producers:
+                raise ValueError(
+                    f"{output} is an output of both {producers[output]} and {stage.name}"
+                )
+            producers[output] = stage.name
+
+    return {
+        stage.name: {
+            producer
+            for path in stage.inputs
+            for output, producer in producers.items()
+            if producer != stage.name and _is_within(path, output)
+        }
+        for stage in stages
+    }
+
+
+def topological_order(dependencies: Dict[str, Set[str]]) -> List[str]:
+    """Stage names with every stage after its dependencies, in declaration order otherwise"""
+    order: List[str] = []
+    done: Set[str] = set()
+    remaining = list(dependencies)
+    while remaining:
+        ready = [name for name in remaining if dependencies[name] <= done]
+        if not ready:
+            raise ValueError(f"Pipeline stages form a cycle: {', '.join(remaining)}")
+        order += ready
+        done.update(ready)
+        remaining = [name for name in remaining if name not in done]
+    return order
+
+
+def with_upstream(names: Iterable[str], dependencies: Dict[str, Set[str]]) -> Set[str]:
+    """names and every stage they transitively depend on"""
+    selected: Set[str] = set()
+    stack = list(names)
+    while stack:
+        name = stack.pop()
+        if name not in dependencies:
+            raise ValueError(f"Unknown stage {name!r}; stages: {', '.join(dependencies)}")
+        if name not in selected:
+            selected.add(name)
+            stack.extend(dependencies[name])
+    return selected
+
+
+def load_state(path: str) -> Dict[str, Any]:
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            state = json.load(f)
+        if state.get("version") == STATE_VERSION:
+            return state
+    return {"version": STATE_VERSION, "stages": {}, "files": {}}
+
+
+def save_state(state: Dict[str, Any], path: str):
+    """Write the run state, replacing the previous file atomically"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def is_up_to_date(stage: Stage, key: str, state: Dict[str, Any], hasher: FileHasher) -> bool:
+    """True if the last run of stage had this key and its outputs are still what it wrote"""
+    record = state["stages"].get(stage.name)
+    if record is None or record["key"] != key:
+        return False
+    return all(
+        digest is not None and hasher.digest(path) == digest
+        for path, digest in record["outputs"].items()
+    )
+
+
+def run_stage(
+    name: str,
+    func: str,
+    params: Dict[str, Any],
+    log_file: str,
+    instrumented: bool,
+    profile: bool,
+    trace_memory: bool,
+) -> List[Dict[str, Any]]:
+    """
+    Calls a stage's function with its output going to log_file; runs in a
+    worker process. Returns the stage's instrumentation records.
+    """
+    module_name, function_name = func.split(":")
+    function = getattr(import_module(module_name), function_name)
+    instrumentation = Instrumentation(name, enabled=profile, trace_memory=trace_memory)
+    if instrumented:
+        params = {**params, "instrumentation": instrumentation}
+
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    with open(log_file, "w") as log, redirect_stdout(log), redirect_stderr(log):
+        with instrumentation.span(name):
+            try:
+                function(**params)
+            except BaseException:
+                traceback.print_exc()
+                raise
+    return instrumentation.records
+
+
+def _tail(path: str, lines: int = 20) -> str:
+    try:
+        with open(path, "r") as f:
+            return "".join(f.readlines()[-lines:])
+    except OSError:
+        return ""
+
+
+def run_pipeline(
+    stages: Sequence[Stage],
+    state_file: str,
+    log_dir: str,
+    root_dir: str,
+    targets: Optional[Iterable[str]] = None,
+    force: bool = False,
+    jobs: Optional[int] = None,
+    dry_run: bool = False,
+    instrumentation: Optional[Instrumentation] = None,
+) -> Dict[str, str]:
+    """
+    Runs the stages that are out of date, each as soon as the stages it
+    depends on are done, so independent branches run concurrently in up to
+    jobs worker processes.
+
+    A stage is skipped when its key (stage_key: function, parameters,
+    input contents and code) matches its last successful run and its
+    outputs still hash to what that run wrote. Keys are computed when a
+    stage becomes ready, after its upstream stages have run, so a rerun
+    upstream stage whose outputs come out byte-identical does not rerun
+    the stages below it. Each stage runs in a fresh process (no module
+    state leaks between stages) with its output written to
+    log_dir/<stage>.log.
+
+    Args:
+        stages (list): The pipeline's Stages.
+        state_file (str): JSON file recording the keys and output digests
+                          of the last successful run of each stage.
+        log_dir (str): Directory of the per-stage logs.
+        root_dir (str): Directory Stage.code paths are relative to.
+        targets (list | None): Names of the stages to bring up to date,
+                               together with their upstream stages;
+                               None for all.
+        force (bool): Run the selected stages even if they are up to date.
+        jobs (int | None): Stages run at once (default: as many as can).
+        dry_run (bool): Only report which stages are out of date.
+        instrumentation (Instrumentation | None): Collects the records of
+                                                  every stage that ran.
+
+    Returns:
+        dict: Stage name -> "skipped", "ran", "failed", "blocked" (an
+              upstream stage failed) or, for dry runs, "stale".
+    """
+    by_name = {stage.name: stage for stage in stages}
+    dependencies = stage_dependencies(stages)
+    selected = with_upstream(targets, dependencies) if targets else set(by_name)
+    pending = [name for name in topological_order(dependencies) if name in selected]
+
+    state = load_state(state_file)
+    hasher = FileHasher(state["files"])
+    profile = instrumentation is not None and instrumentation.enabled
+    trace_memory = profile and instrumentation.trace_memory
+
+    status: Dict[str, str] = {}
+    if dry_run:
+        for name in pending:
+            stage = by_name[name]
+            stale_upstream = any(status[dep] == "stale" for dep in dependencies[name])
+            up_to_date = not stale_upstream and is_up_to_date(
+                stage, stage_key(stage, hasher, root_dir), state, hasher
+            )
+            status[name] = "skipped" if up_to_date and not force else "stale"
+            reason = " (upstream is stale)" if stale_upstream else ""
+            print(f"{name}: {'up to date' if status[name] == 'skipped' else 'out of date'}{reason}")
+        return status
+
+    keys: Dict[str, str] = {}
+    started: Dict[str, float] = {}
+    running = {}
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=jobs or max(1, len(pending)), mp_context=context, max_tasks_per_child=1
+    ) as pool:
+        while pending or running:
+            for name in list(pending):
+                upstream = [status.get(dep) for dep in dependencies[name]]
+                if any(done in ("failed", "blocked") for done in upstream):
+                    status[name] = "blocked"
+                    pending.remove(name)
+                    print(f"{name}: not run, an upstream stage failed")
+                    continue
+                if not all(done in ("skipped", "ran") for done in upstream):
+                    continue
+
+                stage = by_name[name]
+                pending.remove(name)
+                keys[name] = stage_key(stage, hasher, root_dir)
+                if not force and is_up_to_date(stage, keys[name], state, hasher):
+                    status[name] = "skipped"
+                    print(f"{name}: up to date, skipped")
+                    continue
+
+                print(f"{name}: running...")
+                started[name] = time.perf_counter()
+                future = pool.submit(
+                    run_stage,
+                    name,
+                    stage.func,
+                    stage.params,
+                    os.path.join(log_dir, f"{name}.log"),
+                    stage.instrumented,
+                    profile,
+                    trace_memory,
+                )
+                running[future] = name
+
+            # pending is in topological order, so stages unblocked by a skip
+            # were scheduled in the same pass
+            if not running:
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                seconds = time.perf_counter() - started[name]
+                log_file = os.path.join(log_dir, f"{name}.log")
+                try:
+                    records = future.result()
+                except Exception as e:
+                    status[name] = "failed"
+                    state["stages"].pop(name, None)
+                    print(f"{name}: failed after {seconds:.1f}s ({e}); log: {log_file}")
+                    print(_tail(log_file), end="")
+                    continue
+
+                status[name] = "ran"
+                state["stages"][name] = {
+                    "key": keys[name],
+                    "outputs": {path: hasher.digest(path) for path in by_name[name].outputs},
+                    "finished_at": round(time.time(), 3),
+                    "seconds": round(seconds, 3),
+                }
+                if instrumentation is not None:
+                    instrumentation.records.extend(records)
+                print(f"{name}: done in {seconds:.1f}s; log: {log_file}")
+
+            state["files"] = hasher.known
+            save_state(state, state_file)
+
+    state["files"] = hasher.known
+    save_state(state, state_file)
+    return status
@@ -0,0 +1,226 @@
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Any, List, Optional
+
+METRIC_PREFIX = "pipeline_stage"
+
+
+class Span:
+    """Measurements of one stage; set rows inside the with-block once known"""
+
+    __slots__ = ("name", "rows")
+
+    def __init__(self, name: str, rows: Optional[int] = None):
+        self.name = name
+        self.rows = rows
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    rows = None
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_CONTEXT = nullcontext(_NullSpan())
+
+
+def peak_rss_bytes() -> int:
+    """High-water mark of this process's resident memory"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Instrumentation:
+    """
+    Records wall time, CPU time, memory and row counts of pipeline stages.
+
+        instrumentation = Instrumentation("team", enabled=True)
+        with instrumentation.span("perform_clustering", rows=len(X)) as span:
+            ...
+
+    When disabled, span() hands back a shared no-op context, so leaving the
+    calls in place costs one method call per stage. Peak RSS is the process
+    high-water mark at the end of the stage; with trace_memory=True the peak
+    Python/NumPy allocation inside each top-level stage is also traced, which
+    slows allocation-heavy stages down.
+    """
+
+    def __init__(self, pipeline: str, enabled: bool = False, trace_memory: bool = False):
+        self.pipeline = pipeline
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.records: List[Dict[str, Any]] = []
+        self._stack: List[str] = []
+
+    def span(self, name: str, rows: Optional[int] = None):
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._span(name, rows)
+
+    @contextmanager
+    def _span(self, name: str, rows: Optional[int]):
+        span = Span(name, rows)
+        parent = self._stack[-1] if self._stack else None
+        self._stack.append(name)
+
+        # Nested spans would reset their parent's traced peak, so only
+        # top-level stages are traced
+        trace_memory = self.trace_memory and parent is None
+        tracing = trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        if trace_memory:
+            tracemalloc.reset_peak()
+            traced_start, _ = tracemalloc.get_traced_memory()
+
+        started_at = time.time()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield span
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+
+            peak_traced = None
+            if trace_memory:
+                _, traced_peak = tracemalloc.get_traced_memory()
+                peak_traced = traced_peak - traced_start
+                if tracing:
+                    tracemalloc.stop()
+
+            self._stack.pop()
+            self.records.append(
+                {
+                    "pipeline": self.pipeline,
+                    "stage": name,
+                    "parent": parent,
+                    "started_at": round(started_at, 3),
+                    "wall_seconds": round(wall, 6),
+                    "cpu_seconds": round(cpu, 6),
+                    "peak_rss_bytes": peak_rss_bytes(),
+                    "peak_traced_bytes": peak_traced,
+                    "rows": span.rows,
+                }
+            )
+
+    def write_json_log(self, path: str):
+        """Append one JSON line per stage record"""
+        if not self.records:
+            return
+        with open(path, "a") as f:
+            for record in self.records:
+                f.write(json.dumps(record) + "\n")
+
+    def write_prometheus_textfile(self, path: str):
+        """
+        Write the last run's stage metrics in the Prometheus text format, for
+        node_exporter's textfile collector. The file is replaced atomically.
+
+        Each sample is labelled with the pipeline that recorded it, so the
+        records pipeline.dag merges from several stages stay distinct series.
+        """
+        if not self.records:
+            return
+
+        metrics = [
+            ("wall_seconds", "Wall time of the stage in seconds"),
+            ("cpu_seconds", "CPU time of the stage in seconds"),
+            ("peak_rss_bytes", "Process peak resident memory at the end of the stage"),
+            ("peak_traced_bytes", "Peak memory traced by tracemalloc during the stage"),
+            ("rows", "Rows processed by the stage"),
+        ]
+        lines = []
+        for metric, help_text in metrics:
+            samples = [record for record in self.records if record[metric] is not None]
+            if not samples:
+                continue
+            lines.append(f"# HELP {METRIC_PREFIX}_{metric} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{metric} gauge")
+            for record in samples:
+                lines.append(
+                    f'{METRIC_PREFIX}_{metric}{{pipeline="{record["pipeline"]}",'
+                    f'stage="{record["stage"]}"}} {record[metric]}'
+                )
+        lines.append(f"# HELP {METRIC_PREFIX}_last_run_timestamp_seconds End of the last instrumented run")
+        lines.append(f"# TYPE {METRIC_PREFIX}_last_run_timestamp_seconds gauge")
+        lines.append(
+            f'{METRIC_PREFIX}_last_run_timestamp_seconds{{pipeline="{self.pipeline}"}} {time.time():.3f}'
+        )
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+
+    def print_summary(self):
+        """Print a per-stage breakdown of the run"""
+        if not self.records:
+            return
+
+        top_level = [record for record in self.records if record["parent"] is None]
+        total = sum(record["wall_seconds"] for record in top_level) or 1e-9
+
+        print(f"\nStage breakdown ({self.pipeline}):")
+        print(f"{'stage':<32} {'wall s':>9} {'cpu s':>9} {'share':>7} {'rows':>9} {'peak RSS MB':>12}")
+        for record in self.records:
+            name = record["stage"] if record["parent"] is None else f"  {record['stage']}"
+            share = f"{record['wall_seconds'] / total:.0%}" if record["parent"] is None else ""
+            rows = "" if record["rows"] is None else record["rows"]
+            print(
+                f"{name:<32} {record['wall_seconds']:>9.3f} {record['cpu_seconds']:>9.3f} "
+                f"{share:>7} {rows:>9} {record['peak_rss_bytes'] / (1 << 20):>12.1f}"
+            )
+
+    def finish(
+        self,
+        json_log: Optional[str] = None,
+        textfile: Optional[str] = None,
+        print_summary: bool = False,
+    ):
+        """Export the recorded stages at the end of a run"""
+        if json_log:
+            self.write_json_log(json_log)
+        if textfile:
+            self.write_prometheus_textfile(textfile)
+        if print_summary:
+            self.print_summary()
+
+
+def add_instrumentation_arguments(parser):
+    """Add the --profile / --metrics-log / --metrics-textfile / --trace-memory flags"""
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print a per-stage time and memory breakdown at the end of the run",
+    )
+    parser.add_argument(
+        "--metrics-log", help="Append per-stage records to this JSON lines file"
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        help="Write per-stage metrics to this Prometheus textfile",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Also trace per-stage peak allocations with tracemalloc (slower)",
+    )
+
+
+def instrumentation_from_args(pipeline: str, args) -> Instrumentation:
+    enabled = bool(args.profile or args.metrics_log or args.metrics_textfile)
+    return Instrumentation(pipeline, enabled=enabled, trace_memory=args.trace_memory)
+
+
+def finish_from_args(instrumentation: Instrumentation, args):
+    instrumentation.finish(args.metrics_log, args.metrics_textfile, args.profile)
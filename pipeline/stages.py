@@ -0,0 +1,96 @@
+import os
+from typing import List
+
+from data.columnar import columnar_path
+from data.neighbors import neighbors_path
+from pipeline.dag import Stage
+from team_model.head_to_head import HEAD_TO_HEAD_FILE
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT_DIR, "data")
+
+# Shared data-layer modules every stage runs through
+DATA_CODE = [
+    "data/columnar.py",
+    "data/json_stream.py",
+    "data/neighbors.py",
+    "data/player_stats.py",
+    "pipeline/instrumentation.py",
+]
+
+
+def cluster_teams(**kwargs):
+    """team_model.run_model.run_model, raising when the clustering pipeline fails"""
+    from team_model.run_model import run_model
+
+    if run_model(**kwargs) is None:
+        raise RuntimeError("Team clustering pipeline failed to generate results")
+
+
+def with_columns(json_path: str) -> List[str]:
+    """A JSON artifact and the columnar store written (and preferred by loaders) next to it"""
+    return [json_path, columnar_path(json_path)]
+
+
+def pipeline_stages(data_dir: str = DATA_DIR) -> List[Stage]:
+    """
+    The stages of the player and team pipelines over the files in data_dir.
+
+    clean_data, player_model and team_model read disjoint inputs, so they
+    are independent branches that run concurrently. Elo ratings are updated
+    in place in elo_rating.json and the game log is appended to, so
+    team_model/elo.py and aggregate_games.py stay manual steps before a run.
+    """
+    def path(name):
+        return os.path.join(data_dir, name)
+
+    player_data = path("player_data.json")
+    team_tiers = path("team_tiers.json")
+    return [
+        Stage(
+            "clean_data",
+            "clean_data:clean_data",
+            inputs=[path("player_stats_historical.json")],
+            outputs=[path("player_stats_cleaned.json")],
+            code=["clean_data.py", *DATA_CODE],
+            params={
+                "input_file": path("player_stats_historical.json"),
+                "output_file": path("player_stats_cleaned.json"),
+            },
+        ),
+        Stage(
+            "player_model",
+            "player_model.run_model:run_model",
+            inputs=with_columns(path("player_stats_recalculated.json")),
+            outputs=[
+                *with_columns(player_data),
+                neighbors_path(player_data),
+                *with_columns(path("player_shap.json")),
+                path("shap_summary.png"),
+                path("model_summary.json"),
+            ],
+            code=["player_model", *DATA_CODE],
+            params={
+                "input_file": path("player_stats_recalculated.json"),
+                "output_file": player_data,
+                "cache_dir": path("model_cache"),
+                "shap_file": path("player_shap.json"),
+                "shap_plot_file": path("shap_summary.png"),
+                "summary_file": path("model_summary.json"),
+            },
+            instrumented=True,
+        ),
+        Stage(
+            "team_model",
+            "pipeline.stages:cluster_teams",
+            inputs=with_columns(path("elo_rating.json")),
+            outputs=[
+                *with_columns(team_tiers),
+                neighbors_path(team_tiers),
+                path(HEAD_TO_HEAD_FILE),
+            ],
+            code=["team_model", *DATA_CODE],
+            params={"team_data_file": path("elo_rating.json"), "output_dir": data_dir},
+            instrumented=True,
+        ),
+    ]
@@ -1,37 +1,211 @@
+import numpy as np
 import pandas as pd
 import os
+from itertools import chain
+from operator import itemgetter
+from data.json_stream import iter_chunks, iter_json_records
+from data.columnar import columnar_path, has_fresh_columns, read_columns
+
+INPUT_COLUMNS = [
+    "Chevrons/game",
+    "Win %",
+    "Playoff Rate",
+    "K/D ratio",
+    "Championships",
+    "Playoff Appearances",
+]
+
+FEATURES = INPUT_COLUMNS + [
+    "Win_Playoff_Interaction",
+    "Playoff_Championship_Interaction",
+]
+
+# Declared dtypes of the player stat columns. Rates and ratios are float32,
+# counts the smallest integer type that holds them; Player is categorical.
+PLAYER_STATS_SCHEMA = {
+    "Player": "category",
+    "K/D ratio": np.float32,
+    "Chevrons/game": np.float32,
+    "Total Chevrons": np.int32,
+    "Total Kills": np.int32,
+    "Total Losses": np.int32,
+    "Kills per Game": np.float32,
+    "Losses per Game": np.float32,
+    "Games Played": np.int16,
+    "Games Won": np.int16,
+    "Games Lost": np.int16,
+    "Win %": np.float32,
+    "DC's/Forfeits": np.int16,
+    "Seasons Played": np.int16,
+    "Playoff Appearances": np.int16,
+    "Playoff Rate": np.float32,
+    "Third Places": np.int16,
+    "Runner-ups": np.int16,
+    "Championships": np.int16,
+    "Top 3 Best KD Ratios": np.int16,
+    "Top 3 Most Chevrons/Game": np.int16,
+}
+REQUIRED_COLUMNS = ["Player"] + INPUT_COLUMNS
+
+# Records parsed from JSON before they are converted to typed arrays
+LOAD_CHUNK_SIZE = 16384
+
+
+def convert_column(name, values):
+    """
+    Validates one player stat column and converts it to its dtype in
+    PLAYER_STATS_SCHEMA. Missing values become 0 ("" for Player).
+
+    Args:
+        name (str): Column name.
+        values (list | np.ndarray): Raw column values.
 
+    Returns:
+        np.ndarray: The converted column; Player stays a string array and is
+                    made categorical once all chunks are joined.
 
-def load_data(input_file):
+    Raises:
+        ValueError: If a value is not numeric, or a count is fractional or
+                    out of range for its integer type.
     """
-    Loads player data from a JSON file.
+    dtype = PLAYER_STATS_SCHEMA.get(name)
+    if dtype is None:
+        return np.asarray(values)
+
+    if dtype == "category":
+        if isinstance(values, np.ndarray) and values.dtype.kind == "U":
+            return values
+        return np.array(["" if value is None else str(value) for value in values], dtype=str)
+
+    if isinstance(values, np.ndarray) and values.dtype.kind in "biuf":
+        array = values
+    else:
+        # None becomes NaN here and is filled below
+        try:
+            array = np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            raise ValueError(f"Column {name!r} has non-numeric values") from None
+
+    if array.dtype.kind == "f":
+        missing = np.isnan(array)
+        if missing.any():
+            array = np.where(missing, 0, array)
+
+    if np.dtype(dtype).kind == "i" and len(array):
+        info = np.iinfo(dtype)
+        if array.min() < info.min or array.max() > info.max:
+            raise ValueError(
+                f"Column {name!r} has values outside the {np.dtype(dtype).name} range"
+            )
+        if array.dtype.kind == "f" and not np.array_equal(array, np.trunc(array)):
+            raise ValueError(f"Column {name!r} has fractional counts")
+
+    return array.astype(dtype, copy=False)
+
+
+def transpose_records(records, names):
+    """One tuple of values per name across records; absent keys give None"""
+    names = list(names)
+    if len(names) > 1:
+        try:
+            return list(zip(*map(itemgetter(*names), records)))
+        except KeyError:
+            pass
+    return [tuple(record.get(name) for record in records) for name in names]
+
+
+def read_json_columns(input_file, chunk_size=LOAD_CHUNK_SIZE):
+    """
+    Streams player records from a JSON array (or NDJSON) file and converts
+    them chunk by chunk, so only one chunk of parsed records is alive at a
+    time. A column missing from some records is filled in as missing.
+
+    Returns:
+        dict: Column name -> typed array, in order of first appearance.
+    """
+    chunks = {}
+    n_rows = 0
+    for records in iter_chunks(iter_json_records(input_file), chunk_size):
+        for name in dict.fromkeys(chain.from_iterable(records)):
+            if name not in chunks:
+                chunks[name] = [convert_column(name, [None] * n_rows)] if n_rows else []
+        columns = transpose_records(records, chunks)
+        for (name, column_chunks), values in zip(chunks.items(), columns):
+            column_chunks.append(convert_column(name, values))
+        n_rows += len(records)
+
+    return {
+        name: np.concatenate(column_chunks) if column_chunks else np.array([])
+        for name, column_chunks in chunks.items()
+    }
+
+
+def player_stats_source(input_file):
+    """
+    Path load_data reads input_file's players from: its columnar store when
+    that is fresh, otherwise the JSON file itself. Anything keyed on the
+    loaded data (such as the model cache) should hash this path.
+    """
+    return columnar_path(input_file) if has_fresh_columns(input_file) else input_file
+
+
+def load_data(input_file, source=None):
+    """
+    Loads player data from a JSON file, or from its columnar store when one
+    exists and is up to date, as a frame typed by PLAYER_STATS_SCHEMA.
+    Columns are validated and converted one at a time, with missing values
+    filled in as they are converted. Columns outside the schema are kept
+    as loaded, with missing values filled with 0.
 
     Args:
         input_file (str): Absolute path to the JSON file.
+        source (str | None): Path to read, from player_stats_source;
+                             decided here when omitted.
 
     Returns:
         pd.DataFrame: Loaded DataFrame.
-    """
-    df = pd.read_json(input_file)
-    return df
 
-
-def preprocess_data(input_file):
+    Raises:
+        ValueError: If Player or an INPUT_COLUMNS stat is missing, or a
+                    column does not match its declared type.
+    """
+    source = source or player_stats_source(input_file)
+    if source != input_file:
+        stored, _ = read_columns(source)
+        columns = {name: convert_column(name, values) for name, values in stored.items()}
+    else:
+        columns = read_json_columns(input_file)
+
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise ValueError(f"Player stats are missing columns: {', '.join(missing)}")
+
+    for name, values in columns.items():
+        if name == "Player":
+            columns[name] = pd.Categorical(values)
+        elif name not in PLAYER_STATS_SCHEMA:
+            columns[name] = pd.Series(values).infer_objects().fillna(0)
+    return pd.DataFrame(columns, copy=False)
+
+
+def preprocess_data(input_file, source=None):
     """
     Loads player data, handles missing values, and calculates initial
     battle performance metrics and interaction features.
 
     Args:
         input_file (str): Path to the input JSON file.
+        source (str | None): Path load_data reads, from player_stats_source.
 
     Returns:
         pd.DataFrame: Processed DataFrame with Battle_Performance and
                       interaction features.
         list: Feature column names.
     """
-    df = load_data(input_file)
-    df.fillna(0, inplace=True)
+    df = load_data(input_file, source)
 
+    # Series arithmetic on the float32 columns; only the new columns are
+    # allocated, never a copy of the whole frame
     skill = df["K/D ratio"] * df["Chevrons/game"]
     skill_norm = skill / skill.max()
 
@@ -40,31 +214,34 @@ def preprocess_data(input_file):
 
     penalty = ((skill_norm - win_norm - playoff_rate).clip(lower=0) ** 2) * 1.5
 
-    df["Battle_Performance"] = (
-        5 * skill_norm + 10 * win_norm + 5 * playoff_rate - 10 * penalty
-    )
+    performance = 5 * skill_norm + 10 * win_norm + 5 * playoff_rate - 10 * penalty
 
-    min_score = df["Battle_Performance"].min()
-    max_score = df["Battle_Performance"].max()
+    min_score = performance.min()
+    max_score = performance.max()
     df["Battle_Performance"] = (
-        (df["Battle_Performance"] - min_score) / (max_score - min_score)
-    ) * 100
-    df["Battle_Performance"] = df["Battle_Performance"].clip(lower=0, upper=100)
+        ((performance - min_score) / (max_score - min_score)) * 100
+    ).clip(lower=0, upper=100)
 
+    df = add_interaction_features(df)
+
+    return df, list(FEATURES)
+
+
+def add_interaction_features(df):
+    """
+    Adds the interaction features the model is trained on.
+
+    Args:
+        df (pd.DataFrame): Player stats with the INPUT_COLUMNS filled in.
+
+    Returns:
+        pd.DataFrame: The same DataFrame with Win_Playoff_Interaction and
+                      Playoff_Championship_Interaction added.
+    """
     df["Win_Playoff_Interaction"] = (df["Win %"] * 100) * (df["Playoff Rate"] * 100)
-    df["Playoff_Championship_Interaction"] = (
-        df["Playoff Appearances"] * df["Championships"]
+    # Widened to at least int32 so int16 counts cannot overflow
+    championships = df["Championships"]
+    df["Playoff_Championship_Interaction"] = df["Playoff Appearances"] * championships.astype(
+        np.result_type(championships.dtype, np.int32)
     )
-
-    features = [
-        "Chevrons/game",
-        "Win %",
-        "Playoff Rate",
-        "K/D ratio",
-        "Championships",
-        "Playoff Appearances",
-        "Win_Playoff_Interaction",
-        "Playoff_Championship_Interaction",
-    ]
-
-    return df, features
+    return df
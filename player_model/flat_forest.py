@@ -0,0 +1,177 @@
+import numpy as np
+from data.columnar import read_columns, write_columns
+
+FOREST_FORMAT = 1
+# (tree, row) pairs advanced per vectorized step: small batches walk all
+# trees at once, large batches a few trees (or rows) at a time so the
+# working arrays stay in cache
+STEP_NODES = 1 << 15
+
+
+def flatten_forest(model, features):
+    """
+    Flattens a fitted RandomForestRegressor into contiguous node arrays.
+
+    The nodes of all trees are concatenated; tree t's nodes are
+    Tree Offsets[t]:Tree Offsets[t + 1] and its root is the first of them.
+    Children are global node ids, stored interleaved in Children (left of
+    node i at 2 * i, right at 2 * i + 1). Leaves point to themselves, so a
+    row that reaches a leaf stays there for the remaining steps.
+
+    Thresholds are stored as float32, rounded down from scikit-learn's
+    float64 ones: for float32 inputs (scikit-learn casts X to float32 too)
+    x <= threshold then holds exactly when it does in scikit-learn.
+
+    Args:
+        model (RandomForestRegressor): The fitted forest.
+        features (list): Feature column names, in training order.
+
+    Returns:
+        tuple: (dict of column name -> np.ndarray, meta dict)
+    """
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    node_counts = np.array([tree.node_count for tree in trees], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(node_counts)])
+    n_nodes = int(offsets[-1])
+
+    feature = np.concatenate([tree.feature for tree in trees]).astype(np.int32)
+    threshold64 = np.concatenate([tree.threshold for tree in trees])
+    left = np.concatenate([tree.children_left + offset for tree, offset in zip(trees, offsets)])
+    right = np.concatenate([tree.children_right + offset for tree, offset in zip(trees, offsets)])
+
+    threshold = threshold64.astype(np.float32)
+    rounded_up = threshold.astype(np.float64) > threshold64
+    threshold[rounded_up] = np.nextafter(threshold[rounded_up], np.float32(-np.inf))
+
+    leaves = feature < 0
+    node_ids = np.arange(n_nodes)
+    left[leaves] = node_ids[leaves]
+    right[leaves] = node_ids[leaves]
+    feature[leaves] = 0
+
+    if all(hasattr(tree, "missing_go_to_left") for tree in trees):
+        missing_left = np.concatenate([tree.missing_go_to_left for tree in trees]).astype(bool)
+    else:
+        missing_left = np.zeros(n_nodes, dtype=bool)
+
+    columns = {
+        "Tree Offsets": offsets,
+        "Tree Depth": np.array([tree.max_depth for tree in trees], dtype=np.int32),
+        "Feature": feature,
+        "Threshold": threshold,
+        "Children": np.stack([left, right], axis=1).ravel().astype(np.int32),
+        "Missing Left": missing_left,
+        "Value": np.concatenate([tree.value[:, 0, 0] for tree in trees]),
+    }
+    meta = {"format": FOREST_FORMAT, "features": list(features)}
+    return columns, meta
+
+
+class FlatForest:
+    """
+    Batch evaluator over the node arrays of flatten_forest.
+
+    predict() gives the same values as the forest's own predict (for n_jobs
+    of 1 or None): the step that sends each row down one level is a handful
+    of whole-array gathers instead of a Python call per tree, and leaf values
+    are summed in tree order before dividing by the number of trees, as
+    scikit-learn does.
+    """
+
+    def __init__(self, columns, meta):
+        self.offsets = columns["Tree Offsets"]
+        self.depths = columns["Tree Depth"]
+        self.feature = columns["Feature"]
+        self.threshold = columns["Threshold"]
+        self.children = columns["Children"]
+        self.missing_left = columns["Missing Left"]
+        self.value = columns["Value"]
+        self.features = meta["features"]
+        self.n_trees = len(self.depths)
+
+    def predict(self, X, return_trees=False):
+        """
+        Predicts a batch of rows.
+
+        Args:
+            X (pd.DataFrame | np.ndarray): Rows with the training features,
+                                           in training order.
+            return_trees (bool): Also return every tree's prediction, filled in
+                                 by the same pass over the trees.
+
+        Returns:
+            np.ndarray | tuple: float64 predictions, or (predictions,
+                (n_trees, n_rows) float32 matrix of per-tree predictions).
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        if n_features != len(self.features):
+            raise ValueError(f"Expected {len(self.features)} features, got {n_features}")
+
+        total = np.zeros(n_rows)
+        tree_values = np.empty((self.n_trees, n_rows), dtype=np.float32) if return_trees else None
+        has_missing = bool(np.isnan(X).any())
+        for start in range(0, n_rows, STEP_NODES):
+            rows = slice(start, start + STEP_NODES)
+            total[rows] = self._sum_leaf_values(
+                X[rows], has_missing, None if tree_values is None else tree_values[:, rows]
+            )
+
+        predictions = total / self.n_trees
+        return (predictions, tree_values) if return_trees else predictions
+
+    def _sum_leaf_values(self, X, has_missing, tree_values=None):
+        """
+        Sum over trees, in tree order, of the leaf value each row of X
+        reaches; each tree's leaf values are also copied into its row of
+        tree_values when given.
+        """
+        n_rows, n_features = X.shape
+        X_flat = X.ravel()
+        row_starts = (np.arange(n_rows, dtype=np.int32) * n_features)[None, :]
+        trees_per_step = max(1, STEP_NODES // n_rows)
+
+        total = np.zeros(n_rows)
+        for first in range(0, self.n_trees, trees_per_step):
+            trees = slice(first, min(first + trees_per_step, self.n_trees))
+            node = np.repeat(self.offsets[trees].astype(np.int32)[:, None], n_rows, axis=1)
+            # Working buffers are reused across steps to avoid reallocating them
+            index = np.empty(node.shape, dtype=np.int32)
+            x = np.empty(node.shape, dtype=np.float32)
+            threshold = np.empty(node.shape, dtype=np.float32)
+            go_right = np.empty(node.shape, dtype=bool)
+
+            for _ in range(int(self.depths[trees].max())):
+                np.take(self.feature, node, out=index)
+                index += row_starts
+                np.take(X_flat, index, out=x)
+                np.take(self.threshold, node, out=threshold)
+                np.greater(x, threshold, out=go_right)
+                if has_missing:
+                    go_right |= np.isnan(x) & ~self.missing_left[node]
+                node *= 2
+                node += go_right
+                np.take(self.children, node, out=node)
+
+            step_values = self.value[node]
+            if tree_values is not None:
+                tree_values[trees] = step_values
+            for leaf_values in step_values:
+                total += leaf_values
+
+        return total
+
+
+def save_flat_forest(model, features, path):
+    """Writes flatten_forest's arrays as a columnar store and returns the FlatForest over them"""
+    columns, meta = flatten_forest(model, features)
+    write_columns(path, columns, meta)
+    return FlatForest(columns, meta)
+
+
+def load_flat_forest(path):
+    """Memory-maps a forest written by save_flat_forest"""
+    columns, meta = read_columns(path)
+    if meta.get("format") != FOREST_FORMAT:
+        raise ValueError(f"Unsupported flat forest format in {path}: {meta.get('format')}")
+    return FlatForest(columns, meta)
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from player_model.data_preprocessing import INPUT_COLUMNS
+
+
+def load_sample_players(input_file):
+    with open(input_file, "r") as f:
+        players = json.load(f)
+    return [
+        {"Player": player["Player"], **{column: player.get(column) for column in INPUT_COLUMNS}}
+        for player in players
+    ]
+
+
+async def post_json(reader, writer, host, path, payload):
+    """Sends one POST over a keep-alive connection and returns the status code"""
+    body = json.dumps(payload).encode()
+    writer.write(
+        (
+            f"POST {path} HTTP/1.1\r\n"
+            f"Host: {host}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "\r\n"
+        ).encode()
+        + body
+    )
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed by server")
+    status = int(status_line.split()[1])
+
+    content_length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            content_length = int(value)
+
+    await reader.readexactly(content_length)
+    return status
+
+
+async def run_load_test(
+    host="127.0.0.1",
+    port=8000,
+    rps=300,
+    duration=20.0,
+    players_per_request=1,
+    connections=64,
+    input_file="data/player_stats_recalculated.json",
+):
+    """
+    Drives the scoring service at a fixed request rate (open loop) and reports
+    latency percentiles.
+
+    Requests are scheduled on a fixed clock regardless of how fast earlier ones
+    complete, and latency is measured from the scheduled send time, so queueing
+    inside the client counts against the service instead of hiding it.
+
+    Args:
+        host (str): Scoring service host.
+        port (int): Scoring service port.
+        rps (float): Target requests per second.
+        duration (float): Length of the test in seconds.
+        players_per_request (int): Players in each request body; 1 sends a
+                                   single player object, more sends a list.
+        connections (int): Size of the keep-alive connection pool.
+        input_file (str): Player stats file the request payloads are drawn from.
+
+    Returns:
+        dict: Request counts, achieved throughput and latency percentiles in ms.
+    """
+    players = load_sample_players(input_file)
+    pool = asyncio.Queue()
+    for _ in range(connections):
+        pool.put_nowait(await asyncio.open_connection(host, port))
+
+    latencies = []
+    errors = 0
+
+    async def send_one(scheduled):
+        nonlocal errors
+        reader, writer = await pool.get()
+        try:
+            if players_per_request == 1:
+                payload = random.choice(players)
+            else:
+                payload = random.sample(players, min(players_per_request, len(players)))
+            status = await post_json(reader, writer, host, "/score", payload)
+            if status != 200:
+                errors += 1
+            latencies.append(time.perf_counter() - scheduled)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            errors += 1
+            writer.close()
+            reader, writer = await asyncio.open_connection(host, port)
+        finally:
+            pool.put_nowait((reader, writer))
+
+    interval = 1.0 / rps
+    n_requests = int(rps * duration)
+    start = time.perf_counter()
+    tasks = []
+    for i in range(n_requests):
+        scheduled = start + i * interval
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send_one(scheduled)))
+
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    while not pool.empty():
+        _, writer = pool.get_nowait()
+        writer.close()
+
+    latencies_ms = np.array(latencies) * 1000
+    report = {
+        "requests": n_requests,
+        "errors": errors,
+        "target_rps": rps,
+        "achieved_rps": round(len(latencies) / elapsed, 1),
+        "players_per_request": players_per_request,
+    }
+    if len(latencies_ms):
+        report.update(
+            {
+                f"p{p}_ms": round(float(np.percentile(latencies_ms, p)), 2)
+                for p in (50, 90, 99)
+            }
+        )
+        report["max_ms"] = round(float(latencies_ms.max()), 2)
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load test the player scoring service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--rps", type=float, default=300)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--players-per-request", type=int, default=1)
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--input-file", default="data/player_stats_recalculated.json")
+    args = parser.parse_args()
+
+    report = asyncio.run(
+        run_load_test(
+            host=args.host,
+            port=args.port,
+            rps=args.rps,
+            duration=args.duration,
+            players_per_request=args.players_per_request,
+            connections=args.connections,
+            input_file=args.input_file,
+        )
+    )
+    print(json.dumps(report, indent=4))
@@ -0,0 +1,304 @@
+import hashlib
+import json
+import os
+import shutil
+import joblib
+import numpy as np
+import sklearn
+from player_model.flat_forest import FlatForest, flatten_forest, load_flat_forest, save_flat_forest
+
+ARTIFACT_FILE = "artifact.joblib"
+META_FILE = "meta.json"
+FOREST_DIR = "forest.cols"
+
+
+def hash_file(digest, path):
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+
+
+def compute_cache_key(input_file, features, config):
+    """
+    Builds a content address for a trained model from the bytes of the input
+    data, the feature list and the training configuration.
+
+    Args:
+        input_file (str): Path the player stats were loaded from: the JSON
+                          file, or a columnar store directory, whose
+                          manifest and column files are all hashed
+                          (see data_preprocessing.player_stats_source).
+        features (list): Feature column names.
+        config (dict): JSON-serialisable training configuration (search mode,
+                       budget, parameter grid, ...).
+
+    Returns:
+        str: Hex digest identifying the artifact.
+    """
+    digest = hashlib.sha256()
+    if os.path.isdir(input_file):
+        for name in sorted(os.listdir(input_file)):
+            digest.update(name.encode() + b"\0")
+            hash_file(digest, os.path.join(input_file, name))
+    else:
+        hash_file(digest, input_file)
+
+    digest.update(
+        json.dumps(
+            {
+                "features": list(features),
+                "config": config,
+                "sklearn": sklearn.__version__,
+            },
+            sort_keys=True,
+            default=str,
+        ).encode()
+    )
+    return digest.hexdigest()[:32]
+
+
+def artifact_dir(cache_dir, key):
+    return os.path.join(cache_dir, key)
+
+
+def load_model_artifact(cache_dir, key):
+    """
+    Loads a cached model artifact and marks it as recently used.
+
+    Args:
+        cache_dir (str): Root directory of the artifact cache.
+        key (str): Cache key from compute_cache_key.
+
+    Returns:
+        dict | None: The artifact, or None on a cache miss.
+    """
+    path = artifact_dir(cache_dir, key)
+    artifact_file = os.path.join(path, ARTIFACT_FILE)
+    if not os.path.exists(artifact_file):
+        return None
+
+    try:
+        artifact = joblib.load(artifact_file)
+    except Exception as e:
+        print(f"Warning: Could not load cached model {key} ({e}), retraining.")
+        shutil.rmtree(path, ignore_errors=True)
+        return None
+
+    os.utime(os.path.join(path, META_FILE))
+    return artifact
+
+
+def save_model_artifact(cache_dir, key, artifact, max_entries=5, max_bytes=500 << 20):
+    """
+    Persists a trained model artifact and evicts stale ones.
+
+    The artifact holds the fitted model together with everything run_model
+    needs to skip training: "model", "features", "best_params", "mse", "r2",
+    "X_test_index" and "y_pred_test". A human-readable meta.json is written
+    alongside it.
+
+    Args:
+        cache_dir (str): Root directory of the artifact cache.
+        key (str): Cache key from compute_cache_key.
+        artifact (dict): The artifact to store.
+        max_entries (int): Maximum number of artifacts kept.
+        max_bytes (int): Maximum total size of the cache in bytes.
+
+    Returns:
+        str: Directory the artifact was written to.
+    """
+    path = artifact_dir(cache_dir, key)
+    os.makedirs(path, exist_ok=True)
+
+    joblib.dump(artifact, os.path.join(path, ARTIFACT_FILE))
+
+    meta = {
+        "key": key,
+        "features": list(artifact["features"]),
+        "best_params": artifact["best_params"],
+        "test_mse": round(artifact["mse"], 4),
+        "test_r2": round(artifact["r2"], 4),
+    }
+    with open(os.path.join(path, META_FILE), "w") as f:
+        json.dump(meta, f, indent=4, default=str)
+
+    evict_stale_artifacts(cache_dir, max_entries=max_entries, max_bytes=max_bytes)
+    return path
+
+
+def forest_path(cache_dir, key):
+    return os.path.join(artifact_dir(cache_dir, key), FOREST_DIR)
+
+
+def load_forest(cache_dir, key):
+    """
+    Memory-maps the flat-array export of a cached model, which loads much
+    faster than unpickling the artifact.
+
+    Args:
+        cache_dir (str): Root directory of the artifact cache.
+        key (str): Cache key of the model.
+
+    Returns:
+        FlatForest | None: The forest, or None if it was never exported.
+    """
+    path = forest_path(cache_dir, key)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        forest = load_flat_forest(path)
+    except Exception as e:
+        print(f"Warning: Could not load flat forest {key} ({e}), re-exporting.")
+        return None
+
+    os.utime(os.path.join(artifact_dir(cache_dir, key), META_FILE))
+    return forest
+
+
+def export_forest(cache_dir, key, model, features, save=True):
+    """
+    Flattens a trained model for FlatForest inference, persisting it next to
+    the model artifact (and evicted together with it) when save is set.
+
+    Returns:
+        FlatForest: The flattened model.
+    """
+    if save:
+        return save_flat_forest(model, features, forest_path(cache_dir, key))
+    return FlatForest(*flatten_forest(model, features))
+
+
+def shap_values_file(cache_dir, key, data_key):
+    return os.path.join(artifact_dir(cache_dir, key), f"shap_{data_key}.npz")
+
+
+def load_shap_values(cache_dir, key, data_key):
+    """
+    Loads SHAP values persisted next to a model artifact.
+
+    Args:
+        cache_dir (str): Root directory of the artifact cache.
+        key (str): Cache key of the explained model.
+        data_key (str): Hash of the explained rows and explainer settings.
+
+    Returns:
+        shap.Explanation | None: The values, or None if they were never saved.
+    """
+    import shap
+
+    path = shap_values_file(cache_dir, key, data_key)
+    if not os.path.exists(path):
+        return None
+
+    with np.load(path, allow_pickle=False) as f:
+        return shap.Explanation(
+            values=f["values"],
+            base_values=f["base_values"],
+            data=f["data"],
+            feature_names=f["feature_names"].tolist(),
+        )
+
+
+def save_shap_values(cache_dir, key, data_key, shap_values):
+    """
+    Persists SHAP values next to the model artifact they explain, so they are
+    evicted together with it.
+    """
+    path = shap_values_file(cache_dir, key, data_key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez(
+        path,
+        values=shap_values.values,
+        base_values=shap_values.base_values,
+        data=np.asarray(shap_values.data, dtype=float),
+        feature_names=np.array(shap_values.feature_names, dtype=str),
+    )
+    return path
+
+
+def directory_size(path):
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path)
+        for name in files
+    )
+
+
+def evict_stale_artifacts(cache_dir, max_entries=5, max_bytes=500 << 20):
+    """
+    Removes the least recently used artifacts until the cache holds at most
+    max_entries artifacts and max_bytes bytes. The most recently used artifact
+    is always kept.
+
+    Args:
+        cache_dir (str): Root directory of the artifact cache.
+        max_entries (int): Maximum number of artifacts kept.
+        max_bytes (int): Maximum total size of the cache in bytes.
+
+    Returns:
+        list: Keys of the evicted artifacts.
+    """
+    if not os.path.isdir(cache_dir):
+        return []
+
+    entries = []
+    for key in os.listdir(cache_dir):
+        meta_file = os.path.join(cache_dir, key, META_FILE)
+        if os.path.exists(meta_file):
+            entries.append(
+                (
+                    os.path.getmtime(meta_file),
+                    key,
+                    directory_size(os.path.join(cache_dir, key)),
+                )
+            )
+
+    entries.sort(reverse=True)
+    total_bytes = sum(size for _, _, size in entries)
+
+    evicted = []
+    while len(entries) > 1 and (len(entries) > max_entries or total_bytes > max_bytes):
+        _, key, size = entries.pop()
+        shutil.rmtree(os.path.join(cache_dir, key), ignore_errors=True)
+        total_bytes -= size
+        evicted.append(key)
+
+    if evicted:
+        print(f"Evicted {len(evicted)} stale model artifact(s) from {cache_dir}")
+    return evicted
+
+
+def latest_model_key(cache_dir):
+    """
+    Key of the most recently used artifact in the cache, or None if the
+    cache is empty.
+    """
+    if not os.path.isdir(cache_dir):
+        return None
+
+    keys = [
+        key
+        for key in os.listdir(cache_dir)
+        if os.path.exists(os.path.join(cache_dir, key, META_FILE))
+    ]
+    if not keys:
+        return None
+
+    return max(keys, key=lambda k: os.path.getmtime(os.path.join(cache_dir, k, META_FILE)))
+
+
+def latest_model_artifact(cache_dir):
+    """
+    Loads the most recently used artifact in the cache.
+
+    Args:
+        cache_dir (str): Root directory of the artifact cache.
+
+    Returns:
+        tuple: (key, artifact), or (None, None) if the cache is empty.
+    """
+    key = latest_model_key(cache_dir)
+    if key is None:
+        return None, None
+    return key, load_model_artifact(cache_dir, key)
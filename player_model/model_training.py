@@ -1,14 +1,177 @@
-from sklearn.model_selection import train_test_split, GridSearchCV
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import (
+    train_test_split,
+    GridSearchCV,
+    HalvingRandomSearchCV,
+)
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, r2_score
 
-def train_and_evaluate_model(X, y):
+PARAM_GRID = {
+    "n_estimators": [50, 100, 200],
+    "max_depth": [None, 10, 20, 30],
+    "min_samples_split": [2, 5, 10],
+    "min_samples_leaf": [1, 2, 4],
+    "max_features": ["sqrt", "log2", None],
+}
+
+HALVING_FACTOR = 2
+HALVING_MIN_ESTIMATORS = 25
+
+
+def halving_fits(n_candidates, n_rounds, cv=5):
+    """Forest fits of a successive-halving search, which rounds the candidates it keeps up"""
+    fits = 0
+    for _ in range(n_rounds):
+        fits += n_candidates * cv
+        n_candidates = -(-n_candidates // HALVING_FACTOR)
+    return fits
+
+
+def halving_schedule_for_budget(max_fits, cv=5):
+    """
+    Works out how many random candidates successive halving can start with,
+    and with how many trees, so that the whole search stays within max_fits
+    forest fits.
+
+    Each round keeps 1/HALVING_FACTOR of the candidates and multiplies
+    n_estimators by HALVING_FACTOR, ending at max(n_estimators). The
+    schedule starts from HALVING_MIN_ESTIMATORS trees when the budget allows
+    every candidate count to halve down to one; smaller budgets drop the
+    first rounds (starting from more trees) until the schedule fits.
+
+    Args:
+        max_fits (int): Upper bound on forest fits across all rounds and folds.
+        cv (int): Number of cross-validation folds.
+
+    Returns:
+        tuple: (n_candidates, min_resources), the number of candidates to
+               sample in the first round and their n_estimators.
+
+    Raises:
+        ValueError: If max_fits is below cv, the cost of a single candidate
+                    evaluated once.
+    """
+    resources = [max(PARAM_GRID["n_estimators"])]
+    while resources[0] // HALVING_FACTOR >= HALVING_MIN_ESTIMATORS:
+        resources.insert(0, resources[0] // HALVING_FACTOR)
+
+    # As many rounds as the budget allows for the fewest candidates lasting through all of them
+    for n_rounds in range(len(resources), 0, -1):
+        min_candidates = HALVING_FACTOR ** (n_rounds - 1)
+        if halving_fits(min_candidates, n_rounds, cv) <= max_fits:
+            break
+    else:
+        raise ValueError(
+            f"max_fits={max_fits} cannot cover one candidate in {cv}-fold cross-validation"
+        )
+
+    fits_per_candidate = cv * sum(HALVING_FACTOR**-i for i in range(n_rounds))
+    # Rounding candidate counts up only adds fits, so this is an upper bound
+    n_candidates = max(min_candidates, int(max_fits / fits_per_candidate))
+    while halving_fits(n_candidates, n_rounds, cv) > max_fits:
+        n_candidates -= 1
+    return n_candidates, resources[-n_rounds]
+
+
+def build_search(search="grid", max_fits=150, cv=5):
+    """
+    Builds the hyperparameter search for the RandomForestRegressor.
+
+    Args:
+        search (str): "grid" for the exhaustive GridSearchCV over PARAM_GRID, or
+                      "halving" for a budgeted successive-halving random search
+                      that uses n_estimators as the halving resource.
+        max_fits (int): Fit budget for the "halving" search.
+        cv (int): Number of cross-validation folds.
+
+    Returns:
+        GridSearchCV | HalvingRandomSearchCV: The unfitted search.
+    """
+    rf = RandomForestRegressor(random_state=42)
+
+    if search == "grid":
+        return GridSearchCV(
+            estimator=rf,
+            param_grid=PARAM_GRID,
+            cv=cv,
+            scoring="neg_mean_squared_error",
+            n_jobs=-1,
+            verbose=1,
+        )
+
+    if search == "halving":
+        param_distributions = {
+            key: values for key, values in PARAM_GRID.items() if key != "n_estimators"
+        }
+        n_candidates, min_resources = halving_schedule_for_budget(max_fits, cv)
+        return HalvingRandomSearchCV(
+            estimator=rf,
+            param_distributions=param_distributions,
+            n_candidates=n_candidates,
+            factor=HALVING_FACTOR,
+            resource="n_estimators",
+            min_resources=min_resources,
+            max_resources=max(PARAM_GRID["n_estimators"]),
+            cv=cv,
+            scoring="neg_mean_squared_error",
+            random_state=42,
+            n_jobs=-1,
+            verbose=1,
+        )
+
+    raise ValueError(f"Unknown search mode: {search}")
+
+
+def compare_with_exhaustive_search(search_cv, X_train, y_train):
+    """
+    Runs the exhaustive grid search on the same training data and reports how
+    close a budgeted search came to its optimum.
+
+    Args:
+        search_cv (HalvingRandomSearchCV): The fitted budgeted search.
+        X_train (pd.DataFrame): Training features.
+        y_train (pd.Series): Training target.
+
+    Returns:
+        dict: Cross-validated MSE of both searches, the relative gap and the
+              number of fits each one used.
+    """
+    grid_search = build_search("grid")
+    grid_search.fit(X_train, y_train)
+
+    budgeted_mse = -search_cv.best_score_
+    exhaustive_mse = -grid_search.best_score_
+    report = {
+        "budgeted_cv_mse": round(budgeted_mse, 3),
+        "exhaustive_cv_mse": round(exhaustive_mse, 3),
+        "relative_gap": round((budgeted_mse - exhaustive_mse) / exhaustive_mse, 4),
+        "budgeted_fits": int(sum(search_cv.n_candidates_)) * search_cv.n_splits_,
+        "exhaustive_fits": len(grid_search.cv_results_["params"])
+        * grid_search.n_splits_,
+    }
+
+    print("Budgeted search vs exhaustive grid search:")
+    print(
+        f"CV MSE {report['budgeted_cv_mse']:.3f} vs {report['exhaustive_cv_mse']:.3f} "
+        f"({report['relative_gap'] * 100:+.2f}%) using "
+        f"{report['budgeted_fits']} of {report['exhaustive_fits']} fits"
+    )
+    return report
+
+
+def train_and_evaluate_model(X, y, search="grid", max_fits=150, compare=False):
     """
-    Trains a RandomForestRegressor model using GridSearchCV and evaluates its performance.
+    Trains a RandomForestRegressor model using a hyperparameter search and evaluates its performance.
 
     Args:
         X (pd.DataFrame): Features for training and testing.
         y (pd.Series): Target variable for training and testing.
+        search (str): "grid" (exhaustive GridSearchCV) or "halving" (budgeted
+                      successive halving on n_estimators).
+        max_fits (int): Fit budget for the "halving" search.
+        compare (bool): When using "halving", also run the exhaustive search and
+                        report how close the budgeted search got to its optimum.
 
     Returns:
         tuple: A tuple containing:
@@ -26,29 +189,16 @@ def train_and_evaluate_model(X, y):
         X, y, random_state=42, test_size=0.2
     )
 
-    param_grid = {
-        "n_estimators": [50, 100, 200],
-        "max_depth": [None, 10, 20, 30],
-        "min_samples_split": [2, 5, 10],
-        "min_samples_leaf": [1, 2, 4],
-        "max_features": ["sqrt", "log2", None],
-    }
-
-    rf = RandomForestRegressor(random_state=42)
-    grid_search = GridSearchCV(
-        estimator=rf,
-        param_grid=param_grid,
-        cv=5,
-        scoring="neg_mean_squared_error",
-        n_jobs=-1,
-        verbose=1,
-    )
-    grid_search.fit(X_train, y_train)
+    search_cv = build_search(search, max_fits=max_fits)
+    search_cv.fit(X_train, y_train)
 
     print("Best hyperparameters found:")
-    print(grid_search.best_params_)
+    print(search_cv.best_params_)
+
+    if compare and search != "grid":
+        compare_with_exhaustive_search(search_cv, X_train, y_train)
 
-    best_model = grid_search.best_estimator_
+    best_model = search_cv.best_estimator_
     y_pred_test = best_model.predict(X_test)
 
     mse = mean_squared_error(y_test, y_pred_test)
@@ -57,4 +207,4 @@ def train_and_evaluate_model(X, y):
     print(f"Mean Squared Error on test set: {mse:.2f}")
     print(f"R² on test set: {r2:.3f}")
 
-    return best_model, X_test.index, y_pred_test, mse, r2
\ No newline at end of file
+    return best_model, X_test.index, y_pred_test, mse, r2
@@ -1,54 +1,194 @@
-import shap
+import os
+import sys
 import json
-from data_preprocessing import preprocess_data
-from model_training import train_and_evaluate_model
-from prediction import predict_and_assign_tiers
-from utils import format_decimal_columns, explain_model_with_shap
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sklearn.preprocessing import StandardScaler
+from data.columnar import save_frame
+from data.neighbors import NeighborIndex, neighbors_path, save_neighbor_index
+from pipeline.instrumentation import (
+    Instrumentation,
+    add_instrumentation_arguments,
+    instrumentation_from_args,
+    finish_from_args,
+)
+from player_model.data_preprocessing import player_stats_source, preprocess_data
+from player_model.model_training import PARAM_GRID, train_and_evaluate_model
+from player_model.model_cache import (
+    compute_cache_key,
+    load_model_artifact,
+    save_model_artifact,
+    load_forest,
+    export_forest,
+    load_shap_values,
+    save_shap_values,
+)
+from player_model.prediction import predict_and_assign_tiers
+from player_model.utils import (
+    format_decimal_columns,
+    explain_model_with_shap,
+    shap_data_key,
+    save_shap_summary_plot,
+    shap_attribution_frame,
+)
 
 
 def run_model(
     input_file="data/player_stats_recalculated.json",
     output_file="data/player_data.json",
+    search="grid",
+    max_fits=150,
+    compare_search=False,
+    cache_dir="data/model_cache",
+    use_cache=True,
+    write_json=True,
+    shap_background=100,
+    shap_jobs=-1,
+    shap_file="data/player_shap.json",
+    shap_plot_file="data/shap_summary.png",
+    summary_file="data/model_summary.json",
+    show_plot=False,
+    instrumentation=None,
 ):
     """
     Orchestrates the entire process of predicting battle performance,
     training a model, assigning tiers, and saving results.
+
+    Args:
+        input_file (str): Path to the recalculated player stats JSON file.
+        output_file (str): Path the scored player data is written to; the
+                           similar-players index is saved next to it.
+        search (str): Hyperparameter search mode, "grid" or "halving".
+        max_fits (int): Fit budget for the "halving" search.
+        compare_search (bool): Report how close the "halving" search got to
+                               the exhaustive grid search optimum.
+        cache_dir (str): Directory of the content-addressed model cache.
+        use_cache (bool): Reuse a cached model when the input data and the
+                          training configuration are unchanged.
+        write_json (bool): Also export the scored players as JSON next to the
+                           columnar store.
+        shap_background (int | None): Background subsample size of the SHAP
+                                      explainer, None for path-dependent SHAP.
+        shap_jobs (int): Parallel workers for SHAP, -1 for all CPUs.
+        shap_file (str): Path the per-player SHAP attributions are written to.
+        shap_plot_file (str): Path the SHAP summary plot is saved to.
+        summary_file (str): Path the model summary (search, hyperparameters
+                            and test metrics) is written to.
+        show_plot (bool): Also display the SHAP summary plot interactively.
+        instrumentation (Instrumentation): Records the time and memory of each
+                                           stage; disabled when omitted.
     """
+    instrumentation = instrumentation or Instrumentation("player")
     print("Starting battle performance prediction process...")
 
-    df, features = preprocess_data(input_file)
+    with instrumentation.span("preprocess_data") as span:
+        # The cache key below hashes the same source the frame is loaded from
+        source = player_stats_source(input_file)
+        df, features = preprocess_data(input_file, source)
+        span.rows = len(df)
 
     X = df[features]
     y = df["Battle_Performance"]
 
-    best_model, X_test_index, y_pred_test, mse, r2 = train_and_evaluate_model(X, y)
+    with instrumentation.span("build_neighbor_index", rows=len(df)):
+        save_neighbor_index(
+            NeighborIndex(df["Player"], StandardScaler().fit_transform(X)),
+            neighbors_path(output_file),
+        )
+
+    with instrumentation.span("load_model_artifact"):
+        # The fit budget only shapes the halving search; a grid search fits everything
+        config = {"search": search, "param_grid": PARAM_GRID}
+        if search == "halving":
+            config["max_fits"] = max_fits
+        cache_key = compute_cache_key(source, features, config)
+        artifact = load_model_artifact(cache_dir, cache_key) if use_cache else None
+
+    cache_hit = artifact is not None
+    if cache_hit:
+        print(f"Loaded cached model {cache_key}, skipping training.")
+    else:
+        with instrumentation.span("train_and_evaluate_model", rows=len(X)):
+            best_model, X_test_index, y_pred_test, mse, r2 = train_and_evaluate_model(
+                X, y, search=search, max_fits=max_fits, compare=compare_search
+            )
+        artifact = {
+            "model": best_model,
+            "features": features,
+            "best_params": best_model.get_params(),
+            "mse": mse,
+            "r2": r2,
+            "X_test_index": X_test_index,
+            "y_pred_test": y_pred_test,
+        }
+
+    best_model = artifact["model"]
+    X_test_index = artifact["X_test_index"]
+    y_pred_test = artifact["y_pred_test"]
+    mse = artifact["mse"]
+    r2 = artifact["r2"]
 
     model_summary = {
         "model_type": "RandomForestRegressor",
-        "best_hyperparameters": best_model.get_params(),
+        "search": search,
+        "best_hyperparameters": artifact["best_params"],
         "test_mse": round(mse, 2),
         "test_r2": round(r2, 3),
         "training_data_size": len(X),
         "test_data_size": len(X_test_index),
     }
 
-    with open(output_file, "w") as f:
+    with open(summary_file, "w") as f:
         json.dump(model_summary, f, indent=4)
-    print(f"\nModel summary saved to {output_file}")
+    print(f"\nModel summary saved to {summary_file}")
 
     if r2 < 0.70:
         print("WARNING: Model performance (R² < 0.70) is below acceptable levels.")
         print("Consider improving the model or investigating the data.")
 
-    shap_values = explain_model_with_shap(best_model, X)
+    if not cache_hit and use_cache:
+        with instrumentation.span("save_model_artifact"):
+            save_model_artifact(cache_dir, cache_key, artifact)
 
-    shap.summary_plot(shap_values, X)
+    with instrumentation.span("explain_model_with_shap", rows=len(X)):
+        data_key = shap_data_key(X, shap_background)
+        shap_values = (
+            load_shap_values(cache_dir, cache_key, data_key) if use_cache else None
+        )
+        shap_cache_hit = shap_values is not None
+        if shap_cache_hit:
+            print(f"Loaded cached SHAP values for model {cache_key}.")
+        else:
+            shap_values = explain_model_with_shap(
+                best_model, X, background_size=shap_background, n_jobs=shap_jobs
+            )
+            if use_cache:
+                save_shap_values(cache_dir, cache_key, data_key, shap_values)
 
-    df = predict_and_assign_tiers(df, best_model, features, X_test_index, y_pred_test)
+        if not shap_cache_hit or show_plot or not os.path.exists(shap_plot_file):
+            save_shap_summary_plot(shap_values, X, shap_plot_file, show=show_plot)
 
-    df = format_decimal_columns(df)
-    df_sorted = df.sort_values(by="Predicted_Score", ascending=False)
-    df_sorted.to_json(output_file, orient="records", indent=4)
+        save_frame(
+            shap_attribution_frame(shap_values, df["Player"]),
+            shap_file,
+            write_json=write_json,
+        )
+
+    with instrumentation.span("export_flat_forest"):
+        forest = load_forest(cache_dir, cache_key) if use_cache else None
+        if forest is None:
+            forest = export_forest(cache_dir, cache_key, best_model, features, save=use_cache)
+
+    with instrumentation.span("predict_and_assign_tiers", rows=len(df)):
+        df = predict_and_assign_tiers(
+            df, forest, features, X_test_index, y_pred_test
+        )
+
+    with instrumentation.span("save_player_data", rows=len(df)):
+        df = format_decimal_columns(df)
+        df_sorted = df.sort_values(by="Predicted_Score", ascending=False)
+        save_frame(df_sorted, output_file, write_json=write_json)
     print("\nTier distribution in final output:")
     print(df["Tier"].value_counts())
 
@@ -57,4 +197,66 @@ def run_model(
 
 
 if __name__ == "__main__":
-    df_final_results = run_model()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train the player model and assign tiers")
+    parser.add_argument(
+        "--search",
+        choices=["grid", "halving"],
+        default="grid",
+        help="Exhaustive grid search or budgeted successive halving",
+    )
+    parser.add_argument(
+        "--max-fits",
+        type=int,
+        default=150,
+        help="Fit budget for the halving search",
+    )
+    parser.add_argument(
+        "--compare-search",
+        action="store_true",
+        help="Also run the exhaustive grid search and report the gap",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Retrain even if a cached model exists for this data",
+    )
+    parser.add_argument(
+        "--no-json",
+        action="store_true",
+        help="Only write the columnar store, skip the JSON export",
+    )
+    parser.add_argument(
+        "--shap-background",
+        type=int,
+        default=100,
+        help="Background subsample size for SHAP (0 for path-dependent SHAP)",
+    )
+    parser.add_argument(
+        "--shap-jobs",
+        type=int,
+        default=-1,
+        help="Parallel workers for SHAP, -1 for all CPUs",
+    )
+    parser.add_argument(
+        "--show-plot",
+        action="store_true",
+        help="Also open the SHAP summary plot in a window",
+    )
+    add_instrumentation_arguments(parser)
+    args = parser.parse_args()
+
+    instrumentation = instrumentation_from_args("player", args)
+    df_final_results = run_model(
+        search=args.search,
+        max_fits=args.max_fits,
+        compare_search=args.compare_search,
+        use_cache=not args.no_cache,
+        write_json=not args.no_json,
+        shap_background=args.shap_background or None,
+        shap_jobs=args.shap_jobs,
+        show_plot=args.show_plot,
+        instrumentation=instrumentation,
+    )
+    finish_from_args(instrumentation, args)
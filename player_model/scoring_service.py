@@ -0,0 +1,318 @@
+import asyncio
+import json
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from player_model.data_preprocessing import (
+    INPUT_COLUMNS,
+    preprocess_data,
+    add_interaction_features,
+)
+from player_model.model_cache import export_forest, latest_model_key, load_forest, load_model_artifact
+from player_model.tier_assignment import calculate_tier_thresholds, tiers_from_thresholds
+
+
+class PlayerScorer:
+    """
+    Holds the trained model and the tier thresholds of the scored player
+    population, so new players are tiered against the same percentiles as
+    predict_and_assign_tiers uses.
+    """
+
+    def __init__(self, model, features, thresholds, model_key=None):
+        self.model = model
+        self.features = features
+        self.thresholds = thresholds
+        self.model_key = model_key
+
+    @classmethod
+    def from_cache(cls, cache_dir, population_file):
+        """
+        Loads the most recently used model and derives the tier thresholds
+        from the players in population_file. The model's flat-array export
+        is memory-mapped instead of unpickling the artifact; a model without
+        one is exported on first load.
+        """
+        key = latest_model_key(cache_dir)
+        model = load_forest(cache_dir, key) if key is not None else None
+        if model is None:
+            artifact = load_model_artifact(cache_dir, key) if key is not None else None
+            if artifact is None:
+                raise FileNotFoundError(
+                    f"No trained model in {cache_dir}. Run player_model/run_model.py first."
+                )
+            model = export_forest(cache_dir, key, artifact["model"], artifact["features"])
+
+        df, _ = preprocess_data(population_file)
+        scores = model.predict(df[model.features]).round(2)
+        return cls(
+            model,
+            model.features,
+            calculate_tier_thresholds(scores),
+            model_key=key,
+        )
+
+    def score_rows(self, rows):
+        """
+        Scores a batch of raw stat rows.
+
+        Args:
+            rows (np.ndarray): Array of shape (n, len(INPUT_COLUMNS)).
+
+        Returns:
+            tuple: (predicted scores rounded to 2 decimals, tiers)
+        """
+        df = pd.DataFrame(rows, columns=INPUT_COLUMNS)
+        df = add_interaction_features(df)
+        scores = self.model.predict(df[self.features]).round(2)
+
+        if self.thresholds is None:
+            return scores, ["F"] * len(scores)
+        return scores, list(tiers_from_thresholds(scores, self.thresholds))
+
+
+def parse_players(payload):
+    """
+    Converts a single player object or a list of them into raw stat rows.
+    Missing stats are treated as 0, like preprocess_data does.
+
+    Returns:
+        tuple: (player names, np.ndarray of shape (n, len(INPUT_COLUMNS)))
+
+    Raises:
+        ValueError: If the payload is not a player object or a list of them,
+                    or a stat is not numeric.
+    """
+    players = payload if isinstance(payload, list) else [payload]
+    if not players or not all(isinstance(player, dict) for player in players):
+        raise ValueError("Expected a player object or a non-empty list of them")
+
+    rows = np.zeros((len(players), len(INPUT_COLUMNS)))
+    for i, player in enumerate(players):
+        for j, column in enumerate(INPUT_COLUMNS):
+            value = player.get(column)
+            if value is None:
+                continue
+            try:
+                rows[i, j] = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"'{column}' must be numeric, got {value!r}")
+
+    return [player.get("Player") for player in players], rows
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent scoring requests into one vectorized predict call.
+
+    A batch is flushed once it holds max_batch_size rows or max_wait_ms has
+    passed since its first request arrived, whichever comes first. Prediction
+    runs on a single worker thread so the event loop keeps accepting requests
+    while a batch is being scored.
+    """
+
+    def __init__(self, scorer, max_batch_size=256, max_wait_ms=5.0):
+        self.scorer = scorer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = None
+        self.task = None
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.batches_scored = 0
+        self.rows_scored = 0
+
+    async def start(self):
+        if self.task is None:
+            self.queue = asyncio.Queue()
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        self.executor.shutdown(wait=False)
+
+    async def submit(self, rows):
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((rows, future))
+        return await future
+
+    async def _collect_batch(self):
+        batch = [await self.queue.get()]
+        n_rows = len(batch[0][0])
+        deadline = time.perf_counter() + self.max_wait
+
+        while n_rows < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            n_rows += len(item[0])
+
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            rows = np.concatenate([item[0] for item in batch])
+
+            try:
+                scores, tiers = await loop.run_in_executor(
+                    self.executor, self.scorer.score_rows, rows
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches_scored += 1
+            self.rows_scored += len(rows)
+
+            offset = 0
+            for item_rows, future in batch:
+                end = offset + len(item_rows)
+                if not future.done():
+                    future.set_result((scores[offset:end], tiers[offset:end]))
+                offset = end
+
+
+async def read_body(receive):
+    body = b""
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get("body", b"")
+        more_body = message.get("more_body", False)
+    return body
+
+
+async def send_json(send, status, payload):
+    body = json.dumps(payload).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+def create_app(scorer, max_batch_size=256, max_wait_ms=5.0):
+    """
+    Builds the ASGI scoring application.
+
+    Routes:
+        POST /score   A player stat object or a list of them. Returns
+                      {"Player", "Predicted_Score", "Tier"} for each player,
+                      as an object or a list matching the request.
+        GET  /health  Model key and batching counters.
+    """
+    batcher = MicroBatcher(scorer, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+    async def handle_lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await batcher.start()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await batcher.stop()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            await handle_lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        path, method = scope["path"], scope["method"]
+
+        if path == "/health" and method == "GET":
+            await send_json(
+                send,
+                200,
+                {
+                    "status": "ok",
+                    "model": scorer.model_key,
+                    "batches_scored": batcher.batches_scored,
+                    "rows_scored": batcher.rows_scored,
+                },
+            )
+            return
+
+        if path != "/score":
+            await send_json(send, 404, {"error": f"Unknown path {path}"})
+            return
+        if method != "POST":
+            await send_json(send, 405, {"error": "Use POST"})
+            return
+
+        try:
+            payload = json.loads(await read_body(receive))
+            players, rows = parse_players(payload)
+        except ValueError as e:
+            await send_json(send, 400, {"error": str(e)})
+            return
+
+        scores, tiers = await batcher.submit(rows)
+        results = [
+            {"Player": player, "Predicted_Score": float(score), "Tier": tier}
+            for player, score, tier in zip(players, scores, tiers)
+        ]
+        await send_json(send, 200, results if isinstance(payload, list) else results[0])
+
+    app.batcher = batcher
+    return app
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve player scores over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--cache-dir", default="data/model_cache")
+    parser.add_argument(
+        "--population-file",
+        default="data/player_stats_recalculated.json",
+        help="Players whose predicted scores define the tier percentiles",
+    )
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("The scoring service needs uvicorn: pip install uvicorn")
+
+    scorer = PlayerScorer.from_cache(args.cache_dir, args.population_file)
+    print(f"Loaded model {scorer.model_key}")
+
+    app = create_app(
+        scorer, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -1,11 +1,88 @@
+import hashlib
+import numpy as np
 import pandas as pd
 import shap
+from joblib import Parallel, delayed, effective_n_jobs
 
 
-def explain_model_with_shap(model, X):
-    explainer = shap.Explainer(model, X)
-    shap_values = explainer(X)
-    return shap_values
+def explain_model_with_shap(model, X, background_size=100, n_jobs=-1, random_state=42):
+    """
+    Computes SHAP values of a tree ensemble with shap.TreeExplainer.
+
+    Interventional SHAP over a background subsample costs time proportional
+    to the background size, so a random subsample of background_size rows
+    stands in for the full dataset. background_size=None uses the
+    path-dependent algorithm, which needs no background at all. Rows are
+    explained in parallel chunks across n_jobs workers.
+
+    Args:
+        model: Fitted tree-based model (e.g. RandomForestRegressor).
+        X (pd.DataFrame): Rows to explain.
+        background_size (int | None): Background subsample size.
+        n_jobs (int): Parallel workers, -1 for all CPUs.
+        random_state (int): Seed of the background subsample.
+
+    Returns:
+        shap.Explanation: Values, base values and data for every row of X.
+    """
+    if background_size is None:
+        explainer = shap.TreeExplainer(model, feature_perturbation="tree_path_dependent")
+    else:
+        background = X.sample(
+            n=min(background_size, len(X)), random_state=random_state
+        )
+        explainer = shap.TreeExplainer(
+            model, data=background, feature_perturbation="interventional"
+        )
+
+    n_chunks = max(1, min(len(X), effective_n_jobs(n_jobs)))
+    chunks = np.array_split(np.arange(len(X)), n_chunks)
+    parts = Parallel(n_jobs=n_chunks)(
+        delayed(explainer.shap_values)(X.iloc[chunk], check_additivity=False)
+        for chunk in chunks
+    )
+    values = np.concatenate(parts) if parts else np.empty((0, X.shape[1]))
+
+    return shap.Explanation(
+        values=values,
+        base_values=np.full(len(X), float(np.ravel(explainer.expected_value)[0])),
+        data=X.to_numpy(),
+        feature_names=list(X.columns),
+    )
+
+
+def shap_data_key(X, background_size, random_state=42):
+    """Hash of the explained rows and explainer settings, to key persisted SHAP values"""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(X.to_numpy(dtype=float)).tobytes())
+    digest.update(repr((list(X.columns), background_size, random_state)).encode())
+    return digest.hexdigest()[:16]
+
+
+def save_shap_summary_plot(shap_values, X, plot_file, show=False):
+    """
+    Renders the SHAP summary plot to plot_file instead of blocking on a GUI
+    window; show=True also displays it interactively.
+    """
+    import matplotlib.pyplot as plt
+
+    shap.summary_plot(shap_values, X, show=False)
+    plt.savefig(plot_file, bbox_inches="tight", dpi=150)
+    if show:
+        plt.show()
+    plt.close()
+    print(f"SHAP summary plot saved to {plot_file}")
+
+
+def shap_attribution_frame(shap_values, players):
+    """
+    Per-player SHAP attributions, one column per feature plus the model's
+    base value, in the layout the frontend reads.
+    """
+    df = pd.DataFrame(shap_values.values, columns=shap_values.feature_names)
+    df.insert(0, "Base_Value", shap_values.base_values)
+    df.insert(0, "Player", list(players))
+    return df
 
 
 def format_decimal_columns(df):
@@ -18,5 +95,6 @@ def format_decimal_columns(df):
     ]
     for col in decimal_fields:
         if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce").round(2)
+            # Rounded in float64 so float32 columns export as e.g. 1.14, not 1.1399999857
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(float).round(2)
     return df
\ No newline at end of file
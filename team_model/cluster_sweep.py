@@ -0,0 +1,177 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.metrics import adjusted_rand_score, silhouette_score
+from threadpoolctl import threadpool_limits
+
+from team_model.clustering import perform_clustering
+
+SILHOUETTE_SAMPLE_SIZE = 10000
+
+# Set in each worker by _attach_shared_matrix
+_shared = {}
+
+
+def _attach_shared_matrix(name: str, shape: Tuple[int, ...], dtype: str):
+    """Pool initializer: map the parent's scaled matrix instead of receiving a copy"""
+    block = shared_memory.SharedMemory(name=name)
+    _shared["block"] = block
+    _shared["X"] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    # Each worker runs one KMeans at a time; one thread per process avoids
+    # oversubscribing cores when the pool already uses all of them
+    _shared["limits"] = threadpool_limits(limits=1)
+
+
+def fit_clustering_run(
+    X: np.ndarray, n_clusters: int, seed: int, sample_idx: np.ndarray
+) -> Dict[str, Any]:
+    """Fit one K-means run and score it on inertia and a silhouette sample"""
+    kmeans = KMeans(n_clusters=n_clusters, random_state=seed, n_init=1).fit(X)
+
+    sample_labels = kmeans.labels_[sample_idx]
+    if len(np.unique(sample_labels)) > 1:
+        silhouette = float(silhouette_score(X[sample_idx], sample_labels))
+    else:
+        silhouette = float("nan")
+
+    return {
+        "n_clusters": n_clusters,
+        "seed": seed,
+        "inertia": float(kmeans.inertia_),
+        "silhouette": silhouette,
+        "sample_labels": sample_labels,
+    }
+
+
+def _fit_shared_run(n_clusters: int, seed: int, sample_idx: np.ndarray) -> Dict[str, Any]:
+    return fit_clustering_run(_shared["X"], n_clusters, seed, sample_idx)
+
+
+def sweep_clusterings(
+    X_scaled: np.ndarray,
+    k_values: List[int],
+    seeds: List[int],
+    workers: Optional[int] = None,
+    sample_size: int = SILHOUETTE_SAMPLE_SIZE,
+) -> List[Dict[str, Any]]:
+    """
+    Fit K-means for every (K, seed) pair across a process pool.
+
+    The scaled matrix is placed in shared memory once and mapped by every
+    worker, so memory does not grow with the worker count and tasks only
+    carry their parameters. Silhouette is computed on the same fixed random
+    sample of rows for every run, keeping it O(sample^2) on large tables.
+
+    Each run also gets a stability score: the adjusted Rand index between its
+    sample labels and those of the lowest-inertia run with the same K (1.0
+    means seeds agree on the partition).
+
+    Returns:
+        List of runs ordered by (n_clusters, seed).
+    """
+    X_scaled = np.ascontiguousarray(X_scaled)
+    tasks = [(k, seed) for k in k_values for seed in seeds]
+    sample_idx = np.sort(
+        np.random.default_rng(0).choice(
+            len(X_scaled), size=min(sample_size, len(X_scaled)), replace=False
+        )
+    )
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        with threadpool_limits(limits=1):
+            runs = [fit_clustering_run(X_scaled, k, seed, sample_idx) for k, seed in tasks]
+    else:
+        block = shared_memory.SharedMemory(create=True, size=max(X_scaled.nbytes, 1))
+        try:
+            np.ndarray(X_scaled.shape, dtype=X_scaled.dtype, buffer=block.buf)[:] = X_scaled
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_attach_shared_matrix,
+                initargs=(block.name, X_scaled.shape, X_scaled.dtype.str),
+            ) as executor:
+                futures = [
+                    executor.submit(_fit_shared_run, k, seed, sample_idx) for k, seed in tasks
+                ]
+                runs = [future.result() for future in futures]
+        finally:
+            block.close()
+            block.unlink()
+
+    for k in k_values:
+        same_k = [run for run in runs if run["n_clusters"] == k]
+        reference = min(same_k, key=lambda run: (run["inertia"], run["seed"]))
+        for run in same_k:
+            run["stability"] = float(
+                adjusted_rand_score(reference["sample_labels"], run["sample_labels"])
+            )
+    return runs
+
+
+def select_best_run(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Pick the run to use, independent of the order runs finished in.
+
+    K is chosen by the highest mean silhouette across seeds (NaN counts as
+    worst); within that K the lowest-inertia run wins, and remaining ties go
+    to the smaller seed.
+    """
+    by_k = {}
+    for run in runs:
+        by_k.setdefault(run["n_clusters"], []).append(run)
+
+    def mean_silhouette(k):
+        scores = [run["silhouette"] for run in by_k[k] if not np.isnan(run["silhouette"])]
+        return np.mean(scores) if scores else -np.inf
+
+    best_k = max(sorted(by_k), key=mean_silhouette)
+    return min(by_k[best_k], key=lambda run: (run["inertia"], run["seed"]))
+
+
+def print_sweep_summary(runs: List[Dict[str, Any]], best: Dict[str, Any]):
+    print(f"{'K':>3} {'runs':>5} {'silhouette':>11} {'best inertia':>14} {'stability':>10}")
+    for k in sorted({run["n_clusters"] for run in runs}):
+        same_k = [run for run in runs if run["n_clusters"] == k]
+        print(
+            f"{k:>3} {len(same_k):>5} "
+            f"{np.nanmean([run['silhouette'] for run in same_k]):>11.3f} "
+            f"{min(run['inertia'] for run in same_k):>14.2f} "
+            f"{np.mean([run['stability'] for run in same_k]):>10.3f}"
+        )
+    print(
+        f"Selected K={best['n_clusters']} seed={best['seed']} "
+        f"(inertia {best['inertia']:.2f}, silhouette {best['silhouette']:.3f})"
+    )
+
+
+def perform_clustering_sweep(
+    X_scaled: np.ndarray,
+    k_values: List[int],
+    seeds: List[int],
+    workers: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+    """
+    Sweep K and seeds and return the selected run's labels and centers, in the
+    shape perform_clustering returns them, plus every run's scores.
+
+    Workers only send back scores and sample labels, so the selected run is
+    refit here with the same seed and thread count, which reproduces it
+    exactly.
+    """
+    runs = sweep_clusterings(X_scaled, k_values, seeds, workers)
+    best = select_best_run(runs)
+    print_sweep_summary(runs, best)
+
+    with threadpool_limits(limits=1):
+        labels, cluster_centers = perform_clustering(
+            X_scaled, n_clusters=best["n_clusters"], random_state=best["seed"]
+        )
+    scores = [
+        {key: run[key] for key in ("n_clusters", "seed", "inertia", "silhouette", "stability")}
+        for run in runs
+    ]
+    return labels, cluster_centers, scores
@@ -1,21 +1,46 @@
+import os
+import joblib
 import numpy as np
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional, Sequence
 from sklearn.preprocessing import StandardScaler
 from sklearn.cluster import KMeans
 
+FEATURE_COLUMNS = ["Elo_Rating", "Win_Rate", "Total_Matches"]
+CLUSTERING_STATE_FILE = "team_clustering_state.joblib"
 
-def prepare_data_for_clustering(
+
+def build_feature_matrix(
     team_features: List[Dict[str, Any]],
-) -> Tuple[np.ndarray, StandardScaler, List[str]]:
-    """Prepare data for clustering"""
-    feature_columns = ["Elo_Rating", "Win_Rate", "Total_Matches"]
+    extra_columns: Sequence[str] = (),
+) -> Tuple[np.ndarray, List[str]]:
+    """Stack team features (FEATURE_COLUMNS, then extra_columns) into a (teams, features) matrix"""
+    feature_columns = list(FEATURE_COLUMNS) + list(extra_columns)
+    X = np.empty((len(team_features), len(feature_columns)))
+    for j, feature in enumerate(feature_columns):
+        X[:, j] = np.fromiter(
+            (team[feature] for team in team_features), dtype=float, count=len(team_features)
+        )
+    return X, feature_columns
 
-    X = np.array(
-        [[team[feature] for feature in feature_columns] for team in team_features]
-    )
 
+def scale_features(X: np.ndarray) -> Tuple[np.ndarray, StandardScaler]:
+    """Standardize a feature matrix, returning it with the fitted scaler"""
     scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+    return scaler.fit_transform(X), scaler
+
+
+def prepare_data_for_clustering(
+    team_features: List[Dict[str, Any]],
+    extra_columns: Sequence[str] = (),
+) -> Tuple[np.ndarray, StandardScaler, List[str]]:
+    """Prepare data for clustering.
+
+    extra_columns clusters on optional features besides FEATURE_COLUMNS,
+    e.g. the rolling form columns team_form.add_form_features puts on each
+    team (team_form.FORM_FEATURE_COLUMNS).
+    """
+    X, feature_columns = build_feature_matrix(team_features, extra_columns)
+    X_scaled, scaler = scale_features(X)
     return X_scaled, scaler, feature_columns
 
 
@@ -31,6 +56,161 @@ def perform_clustering(
     )
 
 
+def new_clustering_state(
+    team_names: List[str],
+    X: np.ndarray,
+    feature_columns: List[str],
+    n_clusters: int = 7,
+    random_state: int = 42,
+) -> Tuple[Dict[str, Any], np.ndarray]:
+    """Fit the scaler and a full K-means, and record what the incremental mode needs.
+
+    counts holds the number of teams behind each center, so centers can later be
+    moved as running means; team_names, features and labels snapshot what each
+    team was clustered with.
+    """
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    labels, cluster_centers = perform_clustering(X_scaled, n_clusters, random_state)
+
+    state = {
+        "feature_columns": feature_columns,
+        "n_clusters": n_clusters,
+        "random_state": random_state,
+        "scaler": scaler,
+        "cluster_centers": cluster_centers,
+        "counts": np.bincount(labels, minlength=n_clusters).astype(float),
+        "team_names": np.array(team_names, dtype=str),
+        "features": np.asarray(X, dtype=float),
+        "labels": np.asarray(labels, dtype=int),
+    }
+    return state, labels
+
+
+def load_clustering_state(state_path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(state_path):
+        return None
+    return joblib.load(state_path)
+
+
+def save_clustering_state(state: Dict[str, Any], state_path: str):
+    joblib.dump(state, state_path)
+
+
+def update_clustering_state(
+    state: Dict[str, Any], team_names: List[str], X: np.ndarray
+) -> Tuple[np.ndarray, int]:
+    """Fold new, changed and removed teams into the persisted clustering.
+
+    Only teams whose features differ from the stored snapshot are touched: a
+    changed team's old point is removed from its cluster's running mean, and the
+    new point is assigned to the nearest (warm-started) center and added to it,
+    one mini-batch step per team. Unchanged teams keep their label, so the
+    clustering work is proportional to the new data and existing assignments
+    stay stable. The scaler is frozen at its fitted statistics so scaled
+    coordinates stay comparable between runs.
+
+    Returns the labels of all teams (in the order of team_names) and the number
+    of teams that were added, changed or removed.
+    """
+    scaler = state["scaler"]
+    centers = state["cluster_centers"]
+    counts = state["counts"]
+    X = np.asarray(X, dtype=float)
+
+    known_rows = {name: i for i, name in enumerate(state["team_names"].tolist())}
+    previous_row = np.array([known_rows.get(name, -1) for name in team_names], dtype=int)
+    is_known = previous_row >= 0
+
+    labels = np.full(len(team_names), -1, dtype=int)
+    labels[is_known] = state["labels"][previous_row[is_known]]
+
+    unchanged = is_known.copy()
+    unchanged[is_known] = (state["features"][previous_row[is_known]] == X[is_known]).all(
+        axis=1
+    )
+    changed = np.flatnonzero(~unchanged)
+
+    # Take stale points (departed teams and old values of changed ones) out of
+    # their clusters' running means
+    kept = np.zeros(len(state["team_names"]), dtype=bool)
+    kept[previous_row[unchanged]] = True
+    stale = np.flatnonzero(~kept)
+    n_departed = len(stale) - int(is_known.sum() - unchanged.sum())
+
+    if len(stale):
+        stale_X = scaler.transform(state["features"][stale])
+        for x, label in zip(stale_X, state["labels"][stale].tolist()):
+            if counts[label] > 1:
+                centers[label] -= (x - centers[label]) / (counts[label] - 1)
+            counts[label] -= 1
+
+    if len(changed):
+        for i, x in zip(changed.tolist(), scaler.transform(X[changed])):
+            label = int(np.argmin(np.linalg.norm(centers - x, axis=1)))
+            counts[label] += 1
+            centers[label] += (x - centers[label]) / counts[label]
+            labels[i] = label
+
+    state["team_names"] = np.array(team_names, dtype=str)
+    state["features"] = X
+    state["labels"] = labels
+    return labels, len(changed) + n_departed
+
+
+def incremental_clustering(
+    team_names: Sequence[str],
+    X: np.ndarray,
+    feature_columns: List[str],
+    state_path: str,
+    n_clusters: int = 7,
+    random_state: int = 42,
+    rebuild: bool = False,
+    max_changed_fraction: float = 0.5,
+) -> Tuple[np.ndarray, StandardScaler, np.ndarray, np.ndarray]:
+    """Cluster teams, warm-starting from the state persisted at state_path.
+
+    Falls back to a full fit when there is no usable state, when rebuild is
+    set, or when more than max_changed_fraction of the teams changed since the
+    state was built (the frozen scaler and centers would no longer describe
+    the data). X and feature_columns are the unscaled features
+    build_feature_matrix stacks for the teams in team_names; a state built on
+    other columns is refitted. Returns X_scaled, scaler, labels and the scaled
+    cluster centers, like scale_features followed by perform_clustering.
+    """
+    team_names = list(team_names)
+
+    state = None if rebuild else load_clustering_state(state_path)
+    if state is not None and (
+        state["feature_columns"] != feature_columns
+        or state["n_clusters"] != n_clusters
+    ):
+        state = None
+
+    if state is not None:
+        labels, n_changed = update_clustering_state(state, team_names, X)
+        if n_changed > max_changed_fraction * max(len(team_names), 1):
+            print(f"{n_changed} teams changed, refitting clusters from scratch")
+            state = None
+        else:
+            print(f"Updated clusters incrementally with {n_changed} changed teams")
+
+    if state is None:
+        state, labels = new_clustering_state(
+            team_names, X, feature_columns, n_clusters, random_state
+        )
+
+    save_clustering_state(state, state_path)
+
+    scaler = state["scaler"]
+    return (
+        scaler.transform(X),
+        scaler,
+        labels,
+        state["cluster_centers"],
+    )
+
+
 def calculate_feature_importance(
     cluster_centers: np.ndarray, feature_columns: List[str]
 ) -> Dict[str, float]:
@@ -52,9 +232,11 @@ def calculate_feature_importance(
     return feature_importance
 
 
-def calculate_distance_from_best_cluster(
-    team_features: np.ndarray, best_cluster_center: np.ndarray
-) -> float:
-    """Calculate how close a team is to the best performing cluster center"""
-    distance = np.linalg.norm(team_features - best_cluster_center)
-    return round(distance, 2)
+def calculate_distance_matrix(
+    X: np.ndarray, cluster_centers: np.ndarray
+) -> np.ndarray:
+    """Euclidean distance of every team to every cluster center, shape (teams, clusters)"""
+    distances = np.empty((len(X), len(cluster_centers)))
+    for j, center in enumerate(cluster_centers):
+        distances[:, j] = np.linalg.norm(X - center, axis=1)
+    return distances
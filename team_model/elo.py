@@ -0,0 +1,324 @@
+import json
+import os
+import sys
+from typing import List, Dict, Any, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from team_model.utils import load_team_data, save_team_data
+
+DEFAULT_RATING = 1000.0
+K_FACTOR = 32.0
+RESULT_SCORES = {"Win": 1.0, "Draw": 0.5, "Loss": 0.0}
+
+
+def default_state_path(team_data_path: str) -> str:
+    """Engine state lives next to the ratings file it maintains"""
+    return os.path.splitext(team_data_path)[0] + "_state.json"
+
+
+def new_elo_state(
+    k_factor: float = K_FACTOR, initial_rating: float = DEFAULT_RATING
+) -> Dict[str, Any]:
+    """Create an empty engine state"""
+    return {
+        "k_factor": k_factor,
+        "initial_rating": initial_rating,
+        "ratings": {},
+        "consumed": {},
+        "occurrences": {},
+        "games": {},
+        "last_game": None,
+        "last_date": None,
+        "matches_processed": 0,
+    }
+
+
+def load_elo_state(state_path: str) -> Dict[str, Any]:
+    """Load persisted engine state, or start fresh if none exists"""
+    if not os.path.exists(state_path):
+        return new_elo_state()
+    with open(state_path, "r") as file:
+        return json.load(file)
+
+
+def save_elo_state(state: Dict[str, Any], state_path: str):
+    with open(state_path, "w") as file:
+        json.dump(state, file)
+
+
+def _game_id(key: Tuple[str, str, str, int]) -> str:
+    return "\t".join(key[:3])
+
+
+def game_keys(
+    team: Dict[str, Any],
+    start: int = 0,
+    counts: Optional[Dict[str, int]] = None,
+) -> List[Tuple[str, str, str, int]]:
+    """Key of each game in a team's match list from position start: (date, pair sorted by name, occurrence).
+
+    The occurrence counts earlier games of the same pair on the same date in
+    this list, so both teams' listings of a game get the same key and a game
+    listed by only one of them still gets one. counts gives the number of
+    such games in the matches before start (state["occurrences"] of the
+    team), so the keys of appended matches are built without walking the
+    team's history.
+    """
+    name = team["Team Name"]
+    counts = counts or {}
+    seen: Dict[str, int] = {}
+    keys = []
+    for match in team.get("Matches", [])[start:]:
+        pair = tuple(sorted((name, match["Opponent"])))
+        game = (match["Date"], *pair)
+        game_id = _game_id(game)
+        occurrence = seen.get(game_id, counts.get(game_id, 0))
+        seen[game_id] = occurrence + 1
+        keys.append((*game, occurrence))
+    return keys
+
+
+def count_occurrences(
+    keys: List[Tuple[str, str, str, int]], counts: Dict[str, int]
+) -> Dict[str, int]:
+    """Fold game_keys keys into counts, the per-(date, pair) listing counts of a team"""
+    for key in keys:
+        counts[_game_id(key)] = key[3] + 1
+    return counts
+
+
+def collect_new_matches(
+    teams: List[Dict[str, Any]], state: Dict[str, Any]
+) -> List[Tuple[str, str, str, float]]:
+    """Collect matches appended since the last update, one record per game, in key order.
+
+    A game may be listed by both teams or by only one of them, so games are
+    deduplicated on their game_keys key: state["games"] counts the games of
+    each (date, pair) already applied. When both listings of a game are
+    new, the one from the team whose name sorts first is used. Keys are only
+    built for each team's matches after its consumed prefix, continuing
+    from its state["occurrences"] counts.
+    """
+    consumed = state["consumed"]
+    occurrences = state["occurrences"]
+    applied = state["games"]
+
+    new_games = {}
+    for team in teams:
+        name = team["Team Name"]
+        start = consumed.get(name, 0)
+        new_keys = game_keys(team, start, occurrences.get(name))
+        for key, match in zip(new_keys, team.get("Matches", [])[start:]):
+            score = RESULT_SCORES.get(match["Result"])
+            if score is None or key[3] < applied.get(_game_id(key), 0):
+                continue
+            if key not in new_games or name < new_games[key][1]:
+                new_games[key] = (match["Date"], name, match["Opponent"], score)
+
+    return [new_games[key] for key in sorted(new_games)]
+
+
+def recompute_elo_ratings(
+    teams: List[Dict[str, Any]],
+    k_factor: float = K_FACTOR,
+    initial_rating: float = DEFAULT_RATING,
+) -> Dict[str, float]:
+    """Ratings from a from-scratch pass over every game, independent of the engine state.
+
+    Used to check incremental updates: each team's listing of each game is
+    grouped by game key and the first-sorting team's listing is applied, in
+    key order.
+    """
+    listings: Dict[Tuple[str, str, str, int], Dict[str, str]] = {}
+    for team in teams:
+        for key, match in zip(game_keys(team), team.get("Matches", [])):
+            if match["Result"] in RESULT_SCORES:
+                listings.setdefault(key, {})[team["Team Name"]] = match["Result"]
+
+    ratings: Dict[str, float] = {}
+    for key in sorted(listings):
+        team = min(listings[key])
+        opponent = key[2] if team == key[1] else key[1]
+        team_rating = ratings.get(team, initial_rating)
+        opponent_rating = ratings.get(opponent, initial_rating)
+        expected = 1.0 / (1.0 + 10 ** ((opponent_rating - team_rating) / 400))
+        delta = k_factor * (RESULT_SCORES[listings[key][team]] - expected)
+        ratings[team] = team_rating + delta
+        ratings[opponent] = opponent_rating - delta
+    return ratings
+
+
+def next_game_key(
+    state: Dict[str, Any], match: Tuple[str, str, str, float]
+) -> Tuple[str, str, str, int]:
+    """Game key a match gets if applied next, given the games already applied"""
+    date, team, opponent, _ = match
+    pair = tuple(sorted((team, opponent)))
+    return (date, *pair, state["games"].get(_game_id((date, *pair)), 0))
+
+
+def apply_matches(
+    state: Dict[str, Any], matches: List[Tuple[str, str, str, float]]
+) -> None:
+    """Apply date-ordered matches to the running ratings"""
+    if not matches:
+        return
+
+    ratings = state["ratings"]
+    applied = state["games"]
+    k_factor = state["k_factor"]
+    initial_rating = state["initial_rating"]
+
+    for date, team, opponent, score in matches:
+        game = _game_id((date, *sorted((team, opponent))))
+        applied[game] = applied.get(game, 0) + 1
+        team_rating = ratings.get(team, initial_rating)
+        opponent_rating = ratings.get(opponent, initial_rating)
+        expected = 1.0 / (1.0 + 10 ** ((opponent_rating - team_rating) / 400))
+        delta = k_factor * (score - expected)
+        ratings[team] = team_rating + delta
+        ratings[opponent] = opponent_rating - delta
+
+    state["last_game"] = list(next_game_key(state, matches[-1]))
+    state["last_game"][3] -= 1
+    state["last_date"] = matches[-1][0]
+    state["matches_processed"] += len(matches)
+
+
+def update_elo_ratings(
+    teams: List[Dict[str, Any]], state: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Fold newly appended matches into the state and write ratings back onto the teams.
+
+    Games are applied in game key order. A new game that sorts before the last
+    applied one cannot be applied incrementally, so the state is rebuilt from
+    the full history in that case (and for states saved before games were
+    keyed). Each team's consumed count and per-(date, pair) occurrence
+    counts advance past its new matches, so the next update only keys the
+    matches appended after this one.
+    """
+    if "games" not in state:
+        print("Elo state predates game keys, replaying full match history...")
+        state = new_elo_state(state["k_factor"], state["initial_rating"])
+    elif "occurrences" not in state:
+        # One pass over the consumed history for states saved before the counts were kept
+        state["occurrences"] = {
+            team["Team Name"]: count_occurrences(
+                game_keys(team)[: state["consumed"].get(team["Team Name"], 0)], {}
+            )
+            for team in teams
+        }
+
+    new_matches = collect_new_matches(teams, state)
+
+    if (
+        new_matches
+        and state["last_game"]
+        and next_game_key(state, new_matches[0]) < tuple(state["last_game"])
+    ):
+        print(
+            f"Found matches dated before {state['last_date']}, replaying full match history..."
+        )
+        state = new_elo_state(state["k_factor"], state["initial_rating"])
+        new_matches = collect_new_matches(teams, state)
+
+    apply_matches(state, new_matches)
+
+    for team in teams:
+        name = team["Team Name"]
+        start = state["consumed"].get(name, 0)
+        n_matches = len(team.get("Matches", []))
+        if n_matches > start:
+            counts = state["occurrences"].setdefault(name, {})
+            count_occurrences(game_keys(team, start, counts), counts)
+        state["consumed"][name] = n_matches
+        team["Elo Rating"] = state["ratings"].get(name, state["initial_rating"])
+
+    print(f"Applied {len(new_matches)} new matches to Elo ratings")
+    return state
+
+
+def verify_elo_ratings(teams: List[Dict[str, Any]], state: Dict[str, Any]) -> float:
+    """Largest difference between the state's ratings and recompute_elo_ratings"""
+    expected = recompute_elo_ratings(teams, state["k_factor"], state["initial_rating"])
+    names = set(expected) | set(state["ratings"])
+    return max(
+        (
+            abs(state["ratings"].get(name, state["initial_rating"])
+                - expected.get(name, state["initial_rating"]))
+            for name in names
+        ),
+        default=0.0,
+    )
+
+
+def build_elo_ratings(
+    team_data_path: str,
+    state_path: Optional[str] = None,
+    rebuild: bool = False,
+    write_json: bool = True,
+    verify: bool = False,
+) -> List[Dict[str, Any]]:
+    """Update the Elo Rating of every team in team_data_path from its match log
+
+    With verify set, the updated ratings are checked against a full
+    recompute and a ValueError is raised if they differ.
+    """
+    state_path = state_path or default_state_path(team_data_path)
+
+    teams = load_team_data(team_data_path)
+
+    state = new_elo_state() if rebuild else load_elo_state(state_path)
+    state = update_elo_ratings(teams, state)
+    if verify:
+        difference = verify_elo_ratings(teams, state)
+        if difference > 1e-6:
+            raise ValueError(
+                f"Incremental Elo ratings differ from a full recompute by up to {difference:.6f}"
+            )
+        print("Elo ratings match a full recompute")
+
+    save_team_data(teams, team_data_path, write_json=write_json)
+    save_elo_state(state, state_path)
+
+    return teams
+
+
+if __name__ == "__main__":
+    import argparse
+
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Update team Elo ratings")
+    parser.add_argument(
+        "--team-data",
+        default=os.path.normpath(
+            os.path.join(current_dir, "..", "data", "elo_rating.json")
+        ),
+    )
+    parser.add_argument("--state", default=None)
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Ignore saved state and replay every match",
+    )
+    parser.add_argument(
+        "--no-json",
+        action="store_true",
+        help="Only write the columnar store, skip the JSON export",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Check the updated ratings against a full recompute of every game",
+    )
+    args = parser.parse_args()
+
+    teams = build_elo_ratings(
+        args.team_data,
+        args.state,
+        args.rebuild,
+        write_json=not args.no_json,
+        verify=args.verify,
+    )
+    print(f"Updated Elo ratings for {len(teams)} teams in {args.team_data}")
@@ -0,0 +1,238 @@
+from typing import Dict, Any, List, Optional
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from data.columnar import read_columns, write_columns
+
+HEAD_TO_HEAD_FILE = "team_head_to_head.cols"
+RECORD_COLUMNS = ["Wins", "Losses", "Games", "Last Met"]
+# Above this many teams the all-pairs expected-score matrix is not kept in
+# memory (4096^2 float32 = 64 MB) and pairs are scored on demand instead
+DENSE_EXPECTED_MAX_TEAMS = 4096
+
+
+def expected_score(rating, opponent_rating):
+    """Elo win expectancy of rating against opponent_rating; broadcasts over arrays"""
+    return 1.0 / (1.0 + 10 ** ((opponent_rating - rating) / 400))
+
+
+def expected_score_matrix(ratings) -> np.ndarray:
+    """All-pairs Elo expectancy: entry [i, j] is team i's expected score against team j"""
+    ratings = np.asarray(ratings, dtype=np.float32)
+    return expected_score(ratings[:, None], ratings[None, :])
+
+
+def rank_within_runs(*keys: np.ndarray) -> np.ndarray:
+    """0-based position of each row within its run of equal keys, for rows sorted by keys"""
+    n = len(keys[0])
+    if not n:
+        return np.zeros(0, dtype=np.int64)
+    changed = np.zeros(n, dtype=bool)
+    changed[0] = True
+    for key in keys:
+        changed[1:] |= key[1:] != key[:-1]
+    starts = np.flatnonzero(changed)
+    return np.arange(n) - np.repeat(starts, np.diff(np.append(starts, n)))
+
+
+def build_head_to_head(
+    team_names,
+    elo_ratings,
+    match_offsets,
+    opponents,
+    results,
+    dates,
+) -> Dict[str, np.ndarray]:
+    """
+    Per-pair head-to-head records from the match columns of a team store, in
+    one sorted pass over all matches.
+
+    A game may be listed by both teams or by only one of them, so listings
+    are deduplicated on the game key of team_model.elo.game_keys (date,
+    pair, occurrence of the pair on that date in the listing team's
+    matches); when both teams list a game, the listing of the team whose
+    name sorts first is used, as the Elo engine does. Every game then counts
+    for both teams, so a pair's record from one side mirrors the other's
+    with wins and losses swapped.
+
+    The records form a sparse team x team matrix in CSR layout keyed by
+    integer team ids (positions in team_names): row i's entries are
+    Pair Offsets[i]:Pair Offsets[i + 1] of Opponent Id and of the Wins,
+    Losses, Games and Last Met columns, seen from team i's side. Matches
+    against teams that are not in team_names are skipped.
+    """
+    team_names = np.asarray(team_names, dtype=str)
+    n_teams = len(team_names)
+
+    team_ids = np.repeat(np.arange(n_teams, dtype=np.int64), np.diff(match_offsets))
+    opponent_ids = pd.Index(team_names).get_indexer(np.asarray(opponents, dtype=str))
+    known = (opponent_ids >= 0) & (opponent_ids != team_ids)
+
+    team_ids = team_ids[known]
+    opponent_ids = opponent_ids[known].astype(np.int64)
+    results = np.asarray(results, dtype=str)[known]
+    days = np.asarray(dates, dtype="datetime64[D]")[known].astype(np.int64)
+
+    # Occurrence of each listing's (team, opponent, date) in the team's own
+    # match order; a stable sort keeps that order within each group
+    order = np.lexsort((days, opponent_ids, team_ids))
+    occurrence = np.empty(len(order), dtype=np.int64)
+    occurrence[order] = rank_within_runs(
+        team_ids[order], opponent_ids[order], days[order]
+    )
+
+    # Game key with the pair ordered by name, preferring the first team's listing
+    name_rank = np.argsort(np.argsort(team_names, kind="stable"), kind="stable")
+    own_first = name_rank[team_ids] < name_rank[opponent_ids]
+    first = np.where(own_first, team_ids, opponent_ids)
+    second = np.where(own_first, opponent_ids, team_ids)
+    first_results = np.where(
+        own_first,
+        results,
+        np.select([results == "Win", results == "Loss"], ["Loss", "Win"], default=results),
+    )
+
+    order = np.lexsort((~own_first, occurrence, second, first, days))
+    first, second, days = first[order], second[order], days[order]
+    first_results, occurrence = first_results[order], occurrence[order]
+    if len(order):
+        new_game = np.concatenate(
+            [
+                [True],
+                (days[1:] != days[:-1])
+                | (first[1:] != first[:-1])
+                | (second[1:] != second[:-1])
+                | (occurrence[1:] != occurrence[:-1]),
+            ]
+        )
+        first, second, days = first[new_game], second[new_game], days[new_game]
+        first_results = first_results[new_game]
+
+    # Each game seen from both sides
+    second_results = np.select(
+        [first_results == "Win", first_results == "Loss"], ["Loss", "Win"], default=first_results
+    )
+    pairs = np.concatenate([first * n_teams + second, second * n_teams + first])
+    results = np.concatenate([first_results, second_results])
+    days = np.concatenate([days, days])
+
+    order = np.argsort(pairs, kind="stable")
+    pairs, results, days = pairs[order], results[order], days[order]
+
+    if len(pairs):
+        starts = np.flatnonzero(np.concatenate([[True], pairs[1:] != pairs[:-1]]))
+        wins = np.add.reduceat((results == "Win").astype(np.int32), starts)
+        losses = np.add.reduceat((results == "Loss").astype(np.int32), starts)
+        games = np.diff(np.append(starts, len(pairs))).astype(np.int32)
+        last_met = np.maximum.reduceat(days, starts)
+        unique_pairs = pairs[starts]
+    else:
+        wins = losses = games = np.zeros(0, dtype=np.int32)
+        last_met = unique_pairs = np.zeros(0, dtype=np.int64)
+
+    return {
+        "Team Name": team_names,
+        "Elo Rating": np.asarray(elo_ratings, dtype=float),
+        "Pair Offsets": np.concatenate(
+            [[0], np.cumsum(np.bincount(unique_pairs // max(n_teams, 1), minlength=n_teams))]
+        ).astype(np.int64),
+        "Opponent Id": (unique_pairs % max(n_teams, 1)).astype(np.int32),
+        "Wins": wins,
+        "Losses": losses,
+        "Games": games,
+        "Last Met": last_met.astype("datetime64[D]"),
+    }
+
+
+def save_head_to_head(head_to_head: Dict[str, np.ndarray], path: str):
+    write_columns(path, head_to_head)
+
+
+class HeadToHeadIndex:
+    """
+    Head-to-head records and Elo expectancies of every team pair.
+
+    record() and expected() look a pair up by name without scanning matches:
+    a dict gives each team's id, the record is a binary search within the
+    team's row of the sparse matrix, and the expectancy is read from the
+    all-pairs matrix.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.names = columns["Team Name"]
+        self.ratings = np.asarray(columns["Elo Rating"], dtype=float)
+        self.offsets = columns["Pair Offsets"]
+        self.opponent_ids = columns["Opponent Id"]
+        self.columns = {name: columns[name] for name in RECORD_COLUMNS}
+        self.ids = {name: i for i, name in enumerate(self.names.tolist())}
+        self.expected_scores = (
+            expected_score_matrix(self.ratings)
+            if len(self.names) <= DENSE_EXPECTED_MAX_TEAMS
+            else None
+        )
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def _entry(self, i: int, j: int) -> Optional[int]:
+        start, end = self.offsets[i], self.offsets[i + 1]
+        k = start + int(np.searchsorted(self.opponent_ids[start:end], j))
+        if k < end and self.opponent_ids[k] == j:
+            return k
+        return None
+
+    def record(self, team: str, opponent: str) -> Dict[str, Any]:
+        """team's wins, losses, draws and games against opponent, and when they last met"""
+        k = self._entry(self.ids[team], self.ids[opponent])
+        if k is None:
+            return {"Wins": 0, "Losses": 0, "Draws": 0, "Games": 0, "Last Met": None}
+
+        wins, losses, games = (int(self.columns[name][k]) for name in ["Wins", "Losses", "Games"])
+        return {
+            "Wins": wins,
+            "Losses": losses,
+            "Draws": games - wins - losses,
+            "Games": games,
+            "Last Met": str(self.columns["Last Met"][k]),
+        }
+
+    def expected(self, team: str, opponent: str) -> float:
+        """team's Elo expected score (win probability) against opponent"""
+        i, j = self.ids[team], self.ids[opponent]
+        if self.expected_scores is not None:
+            return float(self.expected_scores[i, j])
+        return float(expected_score(self.ratings[i], self.ratings[j]))
+
+    def sparse(self, column: str) -> csr_matrix:
+        """One record column as a team x team scipy sparse matrix"""
+        values = self.columns[column]
+        if values.dtype.kind == "M":
+            values = values.astype(np.int64)
+        n_teams = len(self.names)
+        return csr_matrix(
+            (values, self.opponent_ids, self.offsets), shape=(n_teams, n_teams)
+        )
+
+    def cross_table(self, teams: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        Wins, losses, games and Elo expectancy of every ordered pair among
+        teams, as frames indexed and columned by team name (row team vs
+        column team).
+        """
+        ids = np.array([self.ids[team] for team in teams], dtype=np.int64)
+        tables = {}
+        for column in ["Wins", "Losses", "Games"]:
+            tables[column] = pd.DataFrame(
+                self.sparse(column)[ids][:, ids].toarray(), index=teams, columns=teams
+            )
+        if self.expected_scores is not None:
+            expected = self.expected_scores[np.ix_(ids, ids)]
+        else:
+            expected = expected_score_matrix(self.ratings[ids])
+        tables["Expected"] = pd.DataFrame(expected, index=teams, columns=teams)
+        return tables
+
+
+def load_head_to_head(path: str) -> HeadToHeadIndex:
+    columns, _ = read_columns(path)
+    return HeadToHeadIndex(columns)
@@ -1,67 +1,209 @@
 import os
-from typing import List, Dict, Any, Optional
-from utils import load_team_data, extract_team_features
-from clustering import prepare_data_for_clustering, perform_clustering
-from tier_assignment import assign_tiers_and_rank_teams
-from tier_analyzer import (
+import sys
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from team_model.utils import load_team_data, load_team_arrays, extract_team_features
+from team_model.clustering import (
+    CLUSTERING_STATE_FILE,
+    build_feature_matrix,
+    scale_features,
+    perform_clustering,
+    incremental_clustering,
+)
+from team_model.cluster_sweep import perform_clustering_sweep
+from team_model.head_to_head import HEAD_TO_HEAD_FILE, build_head_to_head, save_head_to_head
+from team_model.team_form import FORM_FEATURE_COLUMNS, MatchHistory, add_form_features
+from team_model.tier_assignment import assign_tiers_and_rank_teams
+from team_model.tier_analyzer import (
     analyze_tier_placement,
     find_potential_outliers,
 )
-from save_tier_results import save_tier_results, print_tier_summary
+from team_model.save_tier_results import save_tier_results, print_tier_summary
+from data.neighbors import NeighborIndex, neighbors_path, save_neighbor_index
+from pipeline.instrumentation import (
+    Instrumentation,
+    add_instrumentation_arguments,
+    instrumentation_from_args,
+    finish_from_args,
+)
 
 
 def create_tier_classification_pipeline(
-    team_data_path: str, output_dir: str
-) -> Optional[List[Dict[str, Any]]]:
-    """Main pipeline for tier classification"""
+    team_data_path: str,
+    output_dir: str,
+    write_json: bool = True,
+    incremental: bool = False,
+    rebuild: bool = False,
+    instrumentation: Optional[Instrumentation] = None,
+    sweep_k: Optional[List[int]] = None,
+    sweep_seeds: int = 0,
+    workers: Optional[int] = None,
+    form_features: bool = False,
+) -> Optional[Tuple[pd.DataFrame, Dict[str, Dict[str, float]], Dict[str, Any]]]:
+    """Main pipeline for tier classification.
+
+    With incremental=True the scaler and cluster centers persisted in
+    output_dir are warm-started and only updated with new or changed teams;
+    rebuild forces a full refit of that state. With sweep_seeds > 0 or
+    sweep_k given, K-means is run for every K in sweep_k (default 7) and each
+    of sweep_seeds seeds (default 1) across workers processes, and the
+    best-scoring run is used. With
+    form_features, rolling form (win rate and matches over the last 30 and
+    90 days, win rate over the last 10 matches) is clustered on as well.
+    Stages are recorded on instrumentation when one is given. Returns the
+    (teams, tier_profiles, model) tables save_tier_results writes, or None
+    when the pipeline fails.
+
+    Raises:
+        ValueError: If incremental is combined with a sweep; the persisted
+                    clustering has a fixed K and is only warm-started.
+    """
+    if incremental and (sweep_seeds or sweep_k):
+        raise ValueError("incremental clustering cannot be combined with a K/seed sweep")
+    if sweep_k and not sweep_seeds:
+        sweep_seeds = 1
+
+    instrumentation = instrumentation or Instrumentation("team")
     try:
         os.makedirs(output_dir, exist_ok=True)
 
         print("Loading team data...")
-        teams_data = load_team_data(team_data_path)
+        with instrumentation.span("load_team_data") as span:
+            teams_data = load_team_data(team_data_path)
+            span.rows = len(teams_data)
         print(f"Loaded {len(teams_data)} teams")
 
-        team_features = [extract_team_features(team) for team in teams_data]
+        with instrumentation.span("extract_team_features", rows=len(teams_data)):
+            team_features = [extract_team_features(team) for team in teams_data]
         print(f"Extracted features for {len(team_features)} teams")
 
-        print("Preparing data for clustering...")
-        X_scaled, scaler, feature_columns = prepare_data_for_clustering(team_features)
-        print(f"Prepared data with shape: {X_scaled.shape}")
+        team_arrays = None
+        extra_columns = []
+        if form_features:
+            with instrumentation.span("add_form_features", rows=len(team_features)):
+                team_arrays = load_team_arrays(team_data_path)
+                add_form_features(
+                    team_features,
+                    MatchHistory(
+                        team_arrays["Team Name"],
+                        team_arrays["Match Offsets"],
+                        team_arrays["Result"],
+                        team_arrays["Date"],
+                    ),
+                )
+            extra_columns = FORM_FEATURE_COLUMNS
+            print(f"Added rolling form features: {', '.join(extra_columns)}")
+
+        with instrumentation.span("build_feature_matrix", rows=len(team_features)):
+            team_names = np.array([team["Team_Name"] for team in team_features], dtype=object)
+            X, feature_columns = build_feature_matrix(team_features, extra_columns)
+
+        if incremental:
+            print("Updating persisted clustering...")
+            with instrumentation.span("incremental_clustering", rows=len(X)):
+                (
+                    X_scaled,
+                    scaler,
+                    labels,
+                    cluster_centers_scaled,
+                ) = incremental_clustering(
+                    team_names,
+                    X,
+                    feature_columns,
+                    os.path.join(output_dir, CLUSTERING_STATE_FILE),
+                    n_clusters=7,
+                    rebuild=rebuild,
+                )
+        else:
+            print("Preparing data for clustering...")
+            with instrumentation.span("scale_features", rows=len(X)):
+                X_scaled, scaler = scale_features(X)
+            print(f"Prepared data with shape: {X_scaled.shape}")
 
-        print("Performing clustering...")
-        labels, cluster_centers_scaled = perform_clustering(X_scaled, n_clusters=7)
+            if sweep_seeds:
+                print("Sweeping cluster counts and seeds...")
+                with instrumentation.span("perform_clustering_sweep", rows=len(X_scaled)):
+                    labels, cluster_centers_scaled, _ = perform_clustering_sweep(
+                        X_scaled,
+                        sweep_k or [7],
+                        list(range(sweep_seeds)),
+                        workers=workers,
+                    )
+            else:
+                print("Performing clustering...")
+                with instrumentation.span("perform_clustering", rows=len(X_scaled)):
+                    labels, cluster_centers_scaled = perform_clustering(
+                        X_scaled, n_clusters=7
+                    )
         print(f"Clustering complete with {len(set(labels))} clusters")
 
         print("Assigning tiers and ranking teams...")
-        tiered_teams = assign_tiers_and_rank_teams(
-            team_features,
-            X_scaled,
-            labels,
-            cluster_centers_scaled,
-            scaler,
-            feature_columns,
-        )
-
-        if tiered_teams is None:
-            print("Error: tiered_teams is None!")
-            return None
+        with instrumentation.span("assign_tiers_and_rank_teams", rows=len(X)):
+            tiered_teams, tier_profiles, model = assign_tiers_and_rank_teams(
+                team_names,
+                X,
+                labels,
+                cluster_centers_scaled,
+                scaler,
+                feature_columns,
+            )
 
         print(f"Tier assignment complete for {len(tiered_teams)} teams")
 
         print("Analyzing tier placements...")
-        tiered_teams = analyze_tier_placement(tiered_teams)
+        with instrumentation.span("analyze_tier_placement", rows=len(tiered_teams)):
+            tiered_teams = analyze_tier_placement(tiered_teams)
 
         print("Identifying potential outliers...")
-        outliers = find_potential_outliers(tiered_teams)
-        if outliers:
-            print(f"Top potential outliers in tier assignments: {', '.join(outliers)}")
+        with instrumentation.span("find_potential_outliers", rows=len(tiered_teams)):
+            outliers = find_potential_outliers(tiered_teams)
+        if len(outliers):
+            top = ", ".join(
+                f"{name} ({score:.2f})"
+                for name, score in zip(
+                    outliers["Team_Name"].head(10), outliers["Outlier_Score"].head(10)
+                )
+            )
+            print(f"{len(outliers)} potential outliers in tier assignments; top: {top}")
         else:
             print("No significant outliers found.")
         print("Saving results...")
         output_file = os.path.join(output_dir, "team_tiers.json")
-        save_tier_results(tiered_teams, output_file)
+        with instrumentation.span("save_tier_results", rows=len(tiered_teams)):
+            save_tier_results(
+                tiered_teams, tier_profiles, model, output_file, write_json=write_json
+            )
+
+        with instrumentation.span("build_neighbor_index", rows=len(X_scaled)):
+            save_neighbor_index(
+                NeighborIndex(team_names, X_scaled),
+                neighbors_path(output_file),
+            )
 
-        return tiered_teams
+        print("Indexing head-to-head records...")
+        with instrumentation.span("build_head_to_head") as span:
+            if team_arrays is None:
+                team_arrays = load_team_arrays(team_data_path)
+            span.rows = len(team_arrays["Opponent"])
+            save_head_to_head(
+                build_head_to_head(
+                    team_arrays["Team Name"],
+                    team_arrays["Elo Rating"],
+                    team_arrays["Match Offsets"],
+                    team_arrays["Opponent"],
+                    team_arrays["Result"],
+                    team_arrays["Date"],
+                ),
+                os.path.join(output_dir, HEAD_TO_HEAD_FILE),
+            )
+
+        return tiered_teams, tier_profiles, model
 
     except Exception as e:
         print(f"Error in pipeline: {str(e)}")
@@ -71,24 +213,105 @@ def create_tier_classification_pipeline(
         return None
 
 
-def run_model():
-    """Main entry point"""
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    team_data_file = os.path.normpath(
-        os.path.join(current_dir, "..", "data", "elo_rating.json")
-    )
+def run_model(
+    write_json: bool = True,
+    incremental: bool = False,
+    rebuild: bool = False,
+    instrumentation: Optional[Instrumentation] = None,
+    sweep_k: Optional[List[int]] = None,
+    sweep_seeds: int = 0,
+    workers: Optional[int] = None,
+    form_features: bool = False,
+    team_data_file: Optional[str] = None,
+    output_dir: Optional[str] = None,
+):
+    """Main entry point; paths default to the repository's data directory"""
+    data_dir = os.path.join(ROOT_DIR, "data")
+    team_data_file = team_data_file or os.path.join(data_dir, "elo_rating.json")
+    output_dir = output_dir or data_dir
 
     results = create_tier_classification_pipeline(
-        team_data_path=team_data_file, output_dir="data"
+        team_data_path=team_data_file,
+        output_dir=output_dir,
+        write_json=write_json,
+        incremental=incremental,
+        rebuild=rebuild,
+        instrumentation=instrumentation,
+        sweep_k=sweep_k,
+        sweep_seeds=sweep_seeds,
+        workers=workers,
+        form_features=form_features,
     )
 
-    if results:
-        print_tier_summary(results)
+    if results is not None:
+        print_tier_summary(*results)
 
-        print("Clustering results saved to 'data/team_tiers.json")
+        print(f"Clustering results saved to {os.path.join(output_dir, 'team_tiers.json')}")
     else:
         print("Clustering pipeline failed to generate results")
+    return results
 
 
 if __name__ == "__main__":
-    run_model()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Cluster teams into tiers")
+    parser.add_argument(
+        "--no-json",
+        action="store_true",
+        help="Only write the columnar store, skip the JSON export",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Warm-start from the persisted scaler and centers and only cluster new or changed teams",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="With --incremental, refit the persisted clustering from scratch",
+    )
+    parser.add_argument(
+        "--sweep-seeds",
+        type=int,
+        default=0,
+        help="Run K-means with this many seeds per K and keep the best run (default 1 with --sweep-k)",
+    )
+    parser.add_argument(
+        "--sweep-k",
+        type=int,
+        nargs="+",
+        default=None,
+        help="Cluster counts to sweep, with one seed each unless --sweep-seeds is given (default 7; tiers beyond the 7th merge into Beginner)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes for the sweep (default: all CPUs)",
+    )
+    parser.add_argument(
+        "--form-features",
+        action="store_true",
+        help="Also cluster on rolling form: win rate and matches over the last 30/90 days, win rate over the last 10 matches",
+    )
+    add_instrumentation_arguments(parser)
+    args = parser.parse_args()
+    if args.incremental and (args.sweep_seeds or args.sweep_k):
+        parser.error(
+            "--incremental warm-starts the persisted 7-cluster model and cannot be "
+            "combined with --sweep-seeds/--sweep-k"
+        )
+
+    instrumentation = instrumentation_from_args("team", args)
+    run_model(
+        write_json=not args.no_json,
+        incremental=args.incremental,
+        rebuild=args.rebuild,
+        instrumentation=instrumentation,
+        sweep_k=args.sweep_k,
+        sweep_seeds=args.sweep_seeds,
+        workers=args.workers,
+        form_features=args.form_features,
+    )
+    finish_from_args(instrumentation, args)
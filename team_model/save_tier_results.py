@@ -1,59 +1,220 @@
 import json
-from typing import List, Dict, Any
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Any, Tuple
+from data.columnar import (
+    columnar_path,
+    has_fresh_columns,
+    read_columns,
+    write_columns,
+)
 
+# Version 1 files are a flat list of team records, each carrying a copy of its
+# Tier_Profile and of the global Feature_Importance
+TIER_RESULTS_SCHEMA = 2
+TIER_PROFILE_PREFIX = "Tier_Profile."
+FEATURE_IMPORTANCE_PREFIX = "Feature_Importance."
 
-def save_tier_results(results: List[Dict[str, Any]], output_file: str):
-    if results is None:
-        print("Error: Cannot save results - results is None")
-        return
+# Team fields of the JSON records; the nested ones are flattened into
+# prefixed columns, named as pd.json_normalize names them
+FEATURES_PREFIX = "Features."
+CONTRIBUTIONS_PREFIX = "Placement_Contributions."
+NESTED_TEAM_FIELDS = {
+    "Features": FEATURES_PREFIX,
+    "Placement_Contributions": CONTRIBUTIONS_PREFIX,
+}
+TEAM_FIELDS = [
+    "Team_Name",
+    "Tier",
+    "Distance_From_Best",
+    "Features",
+    "Rank_Within_Tier",
+    "Placement_Analysis",
+    "Placement_Contributions",
+    "Cluster_Distance",
+]
+
+
+def team_field_columns(teams: pd.DataFrame, field: str) -> List[str]:
+    """Columns of teams holding a field: the field itself, or its flattened sub-fields"""
+    prefix = NESTED_TEAM_FIELDS.get(field)
+    if prefix is None:
+        return [field]
+    return [name for name in teams.columns if name.startswith(prefix)]
+
+
+def build_team_records(teams: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Team records of the JSON export: the TEAM_FIELDS of every row, with the
+    flattened Features.* and Placement_Contributions.* columns nested again.
+    """
+    fields = []
+    for field in TEAM_FIELDS:
+        columns = team_field_columns(teams, field)
+        if field in NESTED_TEAM_FIELDS:
+            keys = [name[len(NESTED_TEAM_FIELDS[field]):] for name in columns]
+            values = zip(*(teams[name].tolist() for name in columns))
+            fields.append([dict(zip(keys, row)) for row in values])
+        else:
+            fields.append(teams[field].tolist())
+    return [dict(zip(TEAM_FIELDS, row)) for row in zip(*fields)]
 
-    if not results:
-        print("Warning: Results list is empty")
+
+def save_tier_results(
+    teams: pd.DataFrame,
+    tier_profiles: Dict[str, Dict[str, float]],
+    model: Dict[str, Any],
+    output_file: str,
+    write_json: bool = True,
+):
+    """
+    Save tiered teams as a team table, a tier-profile table and a model
+    block, so the output grows with the number of teams only.
+
+    teams, tier_profiles and model are the tables
+    tier_assignment.assign_tiers_and_rank_teams returns, with the
+    Placement_Analysis column tier_analyzer.analyze_tier_placement adds.
+    Records are only built for the JSON export; the columnar store holds the
+    team columns next to the Tier_Profile.* columns (one row per tier) and
+    keeps the model block in its manifest.
+    """
+    if teams.empty:
+        print("Warning: No tiered teams to save")
         return
 
-    clean_results = []
-    for team in results:
-        clean_team = {
-            "Team_Name": team["Team_Name"],
-            "Tier": team["Tier"],
-            "Distance_From_Best": team["Distance_From_Best"],
-            "Features": team["Features"],
-            "Rank_Within_Tier": team["Rank_Within_Tier"],
-            "Placement_Analysis": team.get("Placement_Analysis", "No analysis available"),
-            "Placement_Explanation": team.get("Placement_Explanation", "No explanation available"),
-            "Tier_Profile": team.get("Tier_Profile", {}),
-            "Feature_Importance": team.get("Feature_Importance", {}),
+    if write_json:
+        with open(output_file, "w") as f:
+            json.dump(
+                {
+                    "schema": TIER_RESULTS_SCHEMA,
+                    "model": model,
+                    "tier_profiles": tier_profiles,
+                    "teams": build_team_records(teams),
+                },
+                f,
+                indent=2,
+            )
+
+    # Plain fields first, then the nested ones, as pd.json_normalize orders the records
+    ordered_fields = [f for f in TEAM_FIELDS if f not in NESTED_TEAM_FIELDS] + list(
+        NESTED_TEAM_FIELDS
+    )
+    profile_frame = pd.DataFrame.from_dict(tier_profiles, orient="index")
+    columns = {
+        name: teams[name].to_numpy()
+        for field in ordered_fields
+        for name in team_field_columns(teams, field)
+    }
+    columns[TIER_PROFILE_PREFIX + "Tier"] = profile_frame.index.to_numpy()
+    for name in profile_frame.columns:
+        columns[TIER_PROFILE_PREFIX + name] = profile_frame[name].to_numpy()
+    write_columns(
+        columnar_path(output_file),
+        columns,
+        meta={"schema": TIER_RESULTS_SCHEMA, "model": model},
+    )
+
+    print(f"Successfully saved {len(teams)} teams to {output_file}")
+
+
+def _split_wide_frame(
+    wide: pd.DataFrame,
+) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, Any]]:
+    """Recover the three tables from a version 1 file, where every team row repeats them"""
+    profile_columns = [c for c in wide.columns if c.startswith(TIER_PROFILE_PREFIX)]
+    importance_columns = [c for c in wide.columns if c.startswith(FEATURE_IMPORTANCE_PREFIX)]
+
+    tier_profiles = (
+        wide[["Tier"] + profile_columns]
+        .drop_duplicates("Tier")
+        .set_index("Tier")
+        .rename(columns=lambda c: c[len(TIER_PROFILE_PREFIX):])
+    )
+    feature_importance = {}
+    if len(wide):
+        feature_importance = {
+            c[len(FEATURE_IMPORTANCE_PREFIX):]: float(wide[c].iloc[0])
+            for c in importance_columns
         }
-        clean_results.append(clean_team)
+    teams = wide.drop(columns=profile_columns + importance_columns)
+    return teams, tier_profiles, {"Feature_Importance": feature_importance}
+
+
+def read_tier_tables(
+    output_file: str,
+) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, Any]]:
+    """
+    Load saved tier results as (teams, tier_profiles, model).
+
+    teams has one flattened row per team (Features.Elo_Rating, ...),
+    tier_profiles is indexed by tier and model holds Feature_Importance.
+    The columnar store is preferred when it is fresh; files written before
+    the tables were split are read as well.
+    """
+    if has_fresh_columns(output_file):
+        columns, meta = read_columns(columnar_path(output_file))
+        if meta.get("schema") != TIER_RESULTS_SCHEMA:
+            return _split_wide_frame(pd.DataFrame(columns, copy=False))
 
-    with open(output_file, "w") as f:
-        json.dump(clean_results, f, indent=2)
+        teams = pd.DataFrame(
+            {n: v for n, v in columns.items() if not n.startswith(TIER_PROFILE_PREFIX)},
+            copy=False,
+        )
+        tier_profiles = pd.DataFrame(
+            {
+                n[len(TIER_PROFILE_PREFIX):]: v
+                for n, v in columns.items()
+                if n.startswith(TIER_PROFILE_PREFIX)
+            }
+        ).set_index("Tier")
+        return teams, tier_profiles, meta["model"]
 
-    print(f"Successfully saved {len(clean_results)} teams to {output_file}")
+    with open(output_file, "r") as f:
+        payload = json.load(f)
+    if isinstance(payload, list):
+        return _split_wide_frame(pd.json_normalize(payload))
 
+    tier_profiles = pd.DataFrame.from_dict(payload["tier_profiles"], orient="index")
+    tier_profiles.index.name = "Tier"
+    return pd.json_normalize(payload["teams"]), tier_profiles, payload["model"]
 
-def print_tier_summary(results: List[Dict[str, Any]]):
+
+def load_tier_results(output_file: str) -> pd.DataFrame:
+    """
+    Saved tier results in the per-team view of version 1 files: the team
+    columns plus Tier_Profile.* and Feature_Importance.* on every row.
+    """
+    teams, tier_profiles, model = read_tier_tables(output_file)
+    wide = teams.copy()
+    for name in tier_profiles.columns:
+        wide[TIER_PROFILE_PREFIX + name] = (
+            tier_profiles[name].reindex(teams["Tier"]).to_numpy()
+        )
+    for feature, importance in model["Feature_Importance"].items():
+        wide[FEATURE_IMPORTANCE_PREFIX + feature] = np.full(len(wide), importance)
+    return wide
+
+
+def print_tier_summary(
+    teams: pd.DataFrame,
+    tier_profiles: Dict[str, Dict[str, float]],
+    model: Dict[str, Any],
+):
     """Print a formatted tier summary"""
-    if not results:
+    if teams.empty:
         print("No results to display")
         return
         
     print("\n=== TEAM TIER RANKINGS ===")
     
-    if results and "Feature_Importance" in results[0]:
+    if model.get("Feature_Importance"):
         print("\n=== FEATURE IMPORTANCE ===")
-        feature_importance = results[0]["Feature_Importance"]
+        feature_importance = model["Feature_Importance"]
         for feature, importance in sorted(feature_importance.items(), key=lambda x: x[1], reverse=True):
             feature_name = feature.replace("_", " ").title()
             print(f"{feature_name}: {importance*100:.1f}%")
     
     print("\n=== TIER PROFILES (Average Values) ===")
-    tier_profiles = {}
-    for team in results:
-        tier = team["Tier"]
-        if tier not in tier_profiles and "Tier_Profile" in team:
-            tier_profiles[tier] = team["Tier_Profile"]
-    
     tier_order = ["Legendary", "Exceptional", "Advanced", "Skilled", "Intermediate", "Below Average", "Beginner"]
     for tier in tier_order:
         if tier in tier_profiles:
@@ -61,10 +222,3 @@ def print_tier_summary(results: List[Dict[str, Any]]):
             print(f"{tier}-Tier: Elo={profile.get('Elo_Rating', 0):.1f}, "
                   f"Win Rate={profile.get('Win_Rate', 0)*100:.1f}%, "
                   f"Matches={profile.get('Total_Matches', 0):.1f}")
-
-    tiers = {}
-    for team in results:
-        tier = team["Tier"]
-        if tier not in tiers:
-            tiers[tier] = []
-        tiers[tier].append(team)
\ No newline at end of file
@@ -0,0 +1,166 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Default rolling form windows: calendar days before the reference date, and
+# most recent matches
+FORM_WINDOW_DAYS = (30, 90)
+FORM_LAST_MATCHES = (10,)
+
+# Days are offset into the low 32 bits of a (team id, day) search key
+_DAY_BIAS = 1 << 31
+_KEY_STRIDE = 1 << 32
+
+
+def form_feature_columns(
+    window_days: Sequence[int] = FORM_WINDOW_DAYS,
+    last_matches: Sequence[int] = FORM_LAST_MATCHES,
+) -> List[str]:
+    """Names of the columns form_features returns for these windows"""
+    columns = []
+    for days in window_days:
+        columns += [f"Win_Rate_{days}d", f"Matches_{days}d"]
+    for n in last_matches:
+        columns.append(f"Win_Rate_Last_{n}")
+    return columns
+
+
+FORM_FEATURE_COLUMNS = form_feature_columns()
+
+
+def win_rate(wins, matches) -> np.ndarray:
+    """Win rate in percent (0-100), 0 where there are no matches, as calculate_win_rate"""
+    wins = np.asarray(wins, dtype=float)
+    matches = np.asarray(matches, dtype=float)
+    return np.divide(wins * 100, matches, out=np.zeros_like(wins), where=matches > 0)
+
+
+def _to_day(date) -> int:
+    return int(np.datetime64(date, "D").astype(np.int64))
+
+
+class MatchHistory:
+    """
+    Every team's matches sorted by date, with prefix sums of wins.
+
+    Team i's matches are positions offsets[i]:offsets[i + 1] of days, and
+    win_prefix[k] counts the wins among the first k matches overall, so the
+    wins between two positions are a subtraction. A date window is two
+    binary searches for its bounds, which makes any window query (last 30
+    days, a season's date range, the last N matches) O(log n) with no
+    scan over the matches. The *_all methods answer one window for every
+    team with a single vectorized searchsorted.
+    """
+
+    def __init__(self, team_names, match_offsets, results, dates):
+        self.names = np.asarray(team_names, dtype=str)
+        self.offsets = np.asarray(match_offsets, dtype=np.int64)
+        self.ids = {name: i for i, name in enumerate(self.names.tolist())}
+
+        team_ids = np.repeat(np.arange(len(self.names), dtype=np.int64), np.diff(self.offsets))
+        days = np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+        # Sorts by team, then date; matches on the same day keep their stored order
+        order = np.lexsort((days, team_ids))
+
+        self.days = days[order]
+        wins = np.asarray(results, dtype=str)[order] == "Win"
+        self.win_prefix = np.concatenate([[0], np.cumsum(wins, dtype=np.int64)])
+        self.keys = team_ids * _KEY_STRIDE + (self.days + _DAY_BIAS)
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    @property
+    def last_day(self) -> Optional[np.datetime64]:
+        """Date of the most recent match of any team"""
+        if not len(self.days):
+            return None
+        return np.datetime64(int(self.days.max()), "D")
+
+    def _position(self, team_ids, date, side: str) -> np.ndarray:
+        """Position of date within each team's sorted matches (searchsorted side semantics)"""
+        keys = np.asarray(team_ids, dtype=np.int64) * _KEY_STRIDE + (_to_day(date) + _DAY_BIAS)
+        return np.searchsorted(self.keys, keys, side=side)
+
+    def _counts(self, start: np.ndarray, end: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return self.win_prefix[end] - self.win_prefix[start], end - start
+
+    def window_all(self, start=None, end=None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Wins and matches of every team dated from start to end (inclusive;
+        None leaves that side open), in team order.
+        """
+        team_ids = np.arange(len(self.names))
+        lo = self.offsets[:-1] if start is None else self._position(team_ids, start, "left")
+        hi = self.offsets[1:] if end is None else self._position(team_ids, end, "right")
+        return self._counts(lo, np.maximum(lo, hi))
+
+    def last_matches_all(self, n: int, as_of=None) -> Tuple[np.ndarray, np.ndarray]:
+        """Wins and matches among every team's last n matches up to as_of (inclusive)"""
+        team_ids = np.arange(len(self.names))
+        hi = self.offsets[1:] if as_of is None else self._position(team_ids, as_of, "right")
+        lo = np.maximum(self.offsets[:-1], hi - n)
+        return self._counts(lo, hi)
+
+    def window(self, team: str, start=None, end=None) -> Tuple[int, int]:
+        """team's wins and matches dated from start to end (inclusive; None leaves that side open)"""
+        i = self.ids[team]
+        lo = self.offsets[i] if start is None else int(self._position(i, start, "left"))
+        hi = self.offsets[i + 1] if end is None else int(self._position(i, end, "right"))
+        wins, matches = self._counts(lo, max(lo, hi))
+        return int(wins), int(matches)
+
+    def last_matches(self, team: str, n: int, as_of=None) -> Tuple[int, int]:
+        """team's wins and matches among its last n matches up to as_of (inclusive)"""
+        i = self.ids[team]
+        hi = self.offsets[i + 1] if as_of is None else int(self._position(i, as_of, "right"))
+        lo = max(self.offsets[i], hi - n)
+        wins, matches = self._counts(lo, hi)
+        return int(wins), int(matches)
+
+
+def form_features(
+    history: MatchHistory,
+    as_of=None,
+    window_days: Sequence[int] = FORM_WINDOW_DAYS,
+    last_matches: Sequence[int] = FORM_LAST_MATCHES,
+) -> Dict[str, np.ndarray]:
+    """
+    Rolling form of every team as of a reference date (default: the most
+    recent match in the data): win rate and match count over the last
+    window_days calendar days, and win rate over the last_matches most
+    recent matches. Columns are named by form_feature_columns and aligned
+    with history.names.
+    """
+    if as_of is None:
+        as_of = history.last_day
+    if as_of is None:
+        return {
+            column: np.zeros(len(history.names))
+            for column in form_feature_columns(window_days, last_matches)
+        }
+
+    as_of = np.datetime64(as_of, "D")
+    features = {}
+    for days in window_days:
+        wins, matches = history.window_all(as_of - np.timedelta64(days - 1, "D"), as_of)
+        features[f"Win_Rate_{days}d"] = win_rate(wins, matches)
+        features[f"Matches_{days}d"] = matches.astype(float)
+    for n in last_matches:
+        features[f"Win_Rate_Last_{n}"] = win_rate(*history.last_matches_all(n, as_of))
+    return features
+
+
+def add_form_features(
+    team_features: List[Dict[str, object]],
+    history: MatchHistory,
+    as_of=None,
+):
+    """Add the FORM_FEATURE_COLUMNS of each team (matched by Team_Name) to its feature dict"""
+    form = form_features(history, as_of)
+    # Teams without match history point at a trailing 0
+    rows = np.array([history.ids.get(team["Team_Name"], -1) for team in team_features], dtype=np.int64)
+    for column, values in form.items():
+        column_values = np.append(np.round(values, 2), 0.0)[rows].tolist()
+        for team, value in zip(team_features, column_values):
+            team[column] = value
+    return team_features
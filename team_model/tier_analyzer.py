@@ -1,108 +1,113 @@
 import numpy as np
-from typing import List, Dict, Any
-
-
-def analyze_tier_placement(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Analyze team placements and add explanations for potentially misplaced teams"""
-
-    if not results:
-        return results
-
-    tier_stats = {}
-    for team in results:
-        tier = team["Tier"]
-        if tier not in tier_stats:
-            tier_stats[tier] = {"distances": [], "teams": []}
-        tier_stats[tier]["distances"].append(team["Distance_From_Best"])
-        tier_stats[tier]["teams"].append(team)
-
-    tier_thresholds = {}
-    for tier, stats in tier_stats.items():
-        distances = stats["distances"]
-        if len(distances) > 1:
-            avg_distance = np.mean(distances)
-            std_distance = np.std(distances)
-            tier_thresholds[tier] = {
-                "avg": avg_distance,
-                "upper_bound": avg_distance
-                + (1.5 * std_distance),
-                "lower_bound": avg_distance
-                - (1.5 * std_distance),
-            }
-        else:
-            tier_thresholds[tier] = {
-                "avg": distances[0],
-                "upper_bound": distances[0],
-                "lower_bound": distances[0],
-            }
-
-    tier_order = ["S", "A", "B", "C", "D", "E", "F"]
-
-    for team in results:
-        tier = team["Tier"]
-        distance = team["Distance_From_Best"]
-        explanation = ""
-
-        try:
-            current_tier_idx = tier_order.index(tier)
-        except ValueError:
-            explanation = f"Standard {tier}-tier performance."
-            team["Placement_Analysis"] = explanation
-            continue
-
-        if distance < tier_thresholds[tier]["lower_bound"]:
-            if current_tier_idx > 0:
-                better_tier = tier_order[current_tier_idx - 1]
-                explanation = f"Performs significantly better than typical {tier}-tier teams. Could potentially be {better_tier}-tier."
-            else:
-                explanation = f"Elite performer within {tier}-tier."
-
-        elif distance > tier_thresholds[tier]["upper_bound"]:
-            if current_tier_idx < len(tier_order) - 1:
-                worse_tier = tier_order[current_tier_idx + 1]
-                explanation = f"Performs significantly worse than typical {tier}-tier teams. Might be closer to {worse_tier}-tier level."
-            else:
-                explanation = f"Below average for {tier}-tier."
-
-        else:
-            if distance <= tier_thresholds[tier]["avg"]:
-                explanation = f"Solid {tier}-tier performance, above tier average."
-            else:
-                explanation = f"Typical {tier}-tier performance, below tier average."
-
-        team["Placement_Analysis"] = explanation
-
-    return results
-
-
-def find_potential_outliers(results: List[Dict[str, Any]]) -> List[str]:
-    """Find teams that might be outliers in their tier"""
-    outliers = []
-
-    # Group by tier
-    tiers = {}
-    for team in results:
-        tier = team["Tier"]
-        if tier not in tiers:
-            tiers[tier] = []
-        tiers[tier].append(team)
-
-    # Find outliers in each tier
-    for tier, teams in tiers.items():
-        if len(teams) < 3:  # Skip tiers with too few teams
-            continue
-
-        elos = [t["Features"]["Elo_Rating"] for t in teams]
-        win_rates = [t["Features"]["Win_Rate"] for t in teams]
-
-        elo_mean, elo_std = np.mean(elos), np.std(elos)
-        wr_mean, wr_std = np.mean(win_rates), np.std(win_rates)
-
-        for team in teams:
-            elo_z = abs(team["Features"]["Elo_Rating"] - elo_mean) / (elo_std + 1e-6)
-            wr_z = abs(team["Features"]["Win_Rate"] - wr_mean) / (wr_std + 1e-6)
-
-            if elo_z > 1.5 or wr_z > 1.5:
-                outliers.append(team["Team_Name"])
-
-    return outliers[:10]
\ No newline at end of file
+import pandas as pd
+from typing import Tuple
+
+from team_model.save_tier_results import FEATURES_PREFIX
+from team_model.tier_assignment import TIER_LABELS
+
+# Placement_Analysis codes; the frontend renders them as text
+PLACEMENT_STANDARD = "standard"
+PLACEMENT_ABOVE_RANGE = "above_range"
+PLACEMENT_BELOW_RANGE = "below_range"
+PLACEMENT_ABOVE_AVERAGE = "above_average"
+PLACEMENT_BELOW_AVERAGE = "below_average"
+
+PLACEMENT_BOUND_STDS = 1.5
+OUTLIER_Z_THRESHOLD = 1.5
+OUTLIER_MIN_TIER_SIZE = 3
+
+
+def group_tiers(tiers: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Tier names, the group index of every team and the size of each group"""
+    names, group = np.unique(tiers, return_inverse=True)
+    return names, group, np.bincount(group, minlength=len(names))
+
+
+def group_mean_std(
+    values: np.ndarray, group: np.ndarray, counts: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-group mean and population standard deviation, as np.mean / np.std give"""
+    means = np.bincount(group, weights=values, minlength=len(counts)) / counts
+    squares = np.bincount(group, weights=(values - means[group]) ** 2, minlength=len(counts))
+    return means, np.sqrt(squares / counts)
+
+
+def placement_codes(tiers: np.ndarray, distances: np.ndarray) -> np.ndarray:
+    """
+    Placement_Analysis code of every team: whether its distance from the best
+    cluster falls outside its tier's mean +/- 1.5 std, or on which side of
+    the tier mean it lies. Teams in tiers that are not tier labels get
+    PLACEMENT_STANDARD.
+    """
+    names, group, counts = group_tiers(tiers)
+    means, stds = group_mean_std(distances, group, counts)
+    avg = means[group]
+    spread = PLACEMENT_BOUND_STDS * stds[group]
+
+    codes = np.select(
+        [distances < avg - spread, distances > avg + spread, distances <= avg],
+        [PLACEMENT_ABOVE_RANGE, PLACEMENT_BELOW_RANGE, PLACEMENT_ABOVE_AVERAGE],
+        default=PLACEMENT_BELOW_AVERAGE,
+    ).astype(object)
+    codes[~np.isin(names, TIER_LABELS)[group]] = PLACEMENT_STANDARD
+    return codes
+
+
+def analyze_tier_placement(teams: pd.DataFrame) -> pd.DataFrame:
+    """Analyze team placements and flag potentially misplaced teams with a Placement_Analysis code"""
+
+    if teams.empty:
+        return teams
+
+    teams["Placement_Analysis"] = placement_codes(
+        teams["Tier"].to_numpy(), teams["Distance_From_Best"].to_numpy(dtype=float)
+    )
+    return teams
+
+
+def rank_outliers(
+    team_names: np.ndarray,
+    tiers: np.ndarray,
+    elo_ratings: np.ndarray,
+    win_rates: np.ndarray,
+) -> pd.DataFrame:
+    """
+    Teams whose Elo rating or win rate lies more than 1.5 standard deviations
+    from their tier's mean, ranked by the larger of the two z-scores.
+
+    Tiers with fewer than three teams are skipped. Returns columns
+    Team_Name, Tier, Elo_Z, Win_Rate_Z and Outlier_Score, most extreme first.
+    """
+    names, group, counts = group_tiers(tiers)
+    elo_mean, elo_std = group_mean_std(elo_ratings, group, counts)
+    wr_mean, wr_std = group_mean_std(win_rates, group, counts)
+
+    elo_z = np.abs(elo_ratings - elo_mean[group]) / (elo_std[group] + 1e-6)
+    wr_z = np.abs(win_rates - wr_mean[group]) / (wr_std[group] + 1e-6)
+    score = np.maximum(elo_z, wr_z)
+
+    flagged = np.flatnonzero(
+        (counts[group] >= OUTLIER_MIN_TIER_SIZE) & (score > OUTLIER_Z_THRESHOLD)
+    )
+    # Stable sort keeps input order among equal scores
+    flagged = flagged[np.argsort(-score[flagged], kind="stable")]
+
+    return pd.DataFrame(
+        {
+            "Team_Name": team_names[flagged],
+            "Tier": tiers[flagged],
+            "Elo_Z": elo_z[flagged],
+            "Win_Rate_Z": wr_z[flagged],
+            "Outlier_Score": score[flagged],
+        }
+    )
+
+
+def find_potential_outliers(teams: pd.DataFrame) -> pd.DataFrame:
+    """Find teams that might be outliers in their tier, ranked by outlier score"""
+    return rank_outliers(
+        teams["Team_Name"].to_numpy(),
+        teams["Tier"].to_numpy(),
+        teams[FEATURES_PREFIX + "Elo_Rating"].to_numpy(dtype=float),
+        teams[FEATURES_PREFIX + "Win_Rate"].to_numpy(dtype=float),
+    )
@@ -1,110 +1,74 @@
 import numpy as np
-from typing import List, Dict, Any
+import pandas as pd
+from typing import List, Dict, Any, Tuple
 from sklearn.preprocessing import StandardScaler
-from clustering import (
+from team_model.clustering import (
+    FEATURE_COLUMNS,
     calculate_feature_importance,
-    calculate_distance_from_best_cluster,
+    calculate_distance_matrix,
 )
-
-
-def generate_placement_explanation(
-    team: Dict[str, Any],
-    tier_profile: Dict[str, float],
-    feature_importance: Dict[str, float],
-    team_vector: np.ndarray,
-    cluster_center: np.ndarray,
-    assigned_tier: str,
-) -> str:
-    """Generate detailed explanation for why a team is in a specific tier"""
-
-    explanations = []
-    tier = assigned_tier
-
-    feature_map = {
-        "Elo_Rating": ("Elo Rating", team["Elo_Rating"]),
-        "Win_Rate": ("Win Rate", team["Win_Rate"]),
-        "Total_Matches": ("Total Matches", team["Total_Matches"]),
-    }
-
-    feature_contributions = []
-
-    for i, (feature_key, (feature_name, team_value)) in enumerate(feature_map.items()):
-        tier_average = tier_profile.get(feature_key, 0)
-        importance = feature_importance.get(feature_key, 0)
-
-        if feature_key == "Win_Rate":
-            tier_average_pct = tier_average
-            difference = team_value - tier_average_pct
-            comparison = f"vs tier avg {tier_average_pct:.1f}%"
-        else:
-            difference = team_value - tier_average
-            comparison = f"vs tier avg {tier_average:.1f}"
-
-        if abs(difference) > 0.1:
-            direction = "above" if difference > 0 else "below"
-            strength = (
-                "significantly"
-                if abs(difference) > (tier_average * 0.2)
-                else "slightly"
-            )
-
-            feature_contributions.append(
-                {
-                    "feature": feature_name,
-                    "value": team_value,
-                    "tier_avg": tier_average,
-                    "difference": difference,
-                    "direction": direction,
-                    "strength": strength,
-                    "importance": importance,
-                    "comparison": comparison,
-                }
-            )
-
-    feature_contributions.sort(key=lambda x: x["importance"], reverse=True)
-
-    explanations.append(f"Placed in {tier} tier based on:")
-
-    for contrib in feature_contributions:
-        importance_pct = contrib["importance"] * 100
-        explanations.append(
-            f"• {contrib['feature']}: {contrib['value']:.1f} ({contrib['comparison']}) - "
-            f"{contrib['strength']} {contrib['direction']} tier average "
-            f"[{importance_pct:.1f}% importance]"
-        )
-
-    total_distance = np.linalg.norm(team_vector - cluster_center)
-    if total_distance < 0.5:
-        explanations.append(
-            f"• Strong fit for {tier} tier (distance: {total_distance:.2f})"
-        )
-    elif total_distance > 1.5:
-        explanations.append(
-            f"• Borderline case for {tier} tier (distance: {total_distance:.2f})"
-        )
-    else:
-        explanations.append(
-            f"• Good fit for {tier} tier (distance: {total_distance:.2f})"
-        )
-
-    return " ".join(explanations)
-
-
-def compute_weighted_score(team, feature_importance):
-    return sum(
-        team["Features"][feature] * importance
-        for feature, importance in feature_importance.items()
-    )
+from team_model.save_tier_results import CONTRIBUTIONS_PREFIX, FEATURES_PREFIX
+
+TIER_LABELS = [
+    "Legendary",
+    "Exceptional",
+    "Advanced",
+    "Skilled",
+    "Intermediate",
+    "Below Average",
+    "Beginner",
+]
+
+
+def compute_placement_contributions(
+    X: np.ndarray,
+    tier_idx: np.ndarray,
+    profile_matrix: np.ndarray,
+) -> np.ndarray:
+    """Difference between each team's features and its tier's average profile.
+
+    These are the only per-team numbers placement explanations need beyond the
+    team's Features, Tier_Profile, Feature_Importance and Cluster_Distance, so
+    the text itself is rendered on demand by the frontend.
+    """
+    return X - profile_matrix[tier_idx]
+
+
+def compute_weighted_scores(
+    X: np.ndarray, feature_columns: List[str], feature_importance: Dict[str, float]
+) -> np.ndarray:
+    """Importance-weighted sum of each row's features"""
+    weighted_scores = np.zeros(len(X))
+    for j, feature in enumerate(feature_columns):
+        weighted_scores = weighted_scores + X[:, j] * feature_importance[feature]
+    return weighted_scores
+
+
+def rank_within_groups(sorted_groups: np.ndarray) -> np.ndarray:
+    """1-based position of each row within its run of equal values in a sorted array"""
+    n = len(sorted_groups)
+    group_starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    group_sizes = np.diff(np.r_[group_starts, n])
+    return np.arange(n) - np.repeat(group_starts, group_sizes) + 1
 
 
 def assign_tiers_and_rank_teams(
-    team_features: List[Dict[str, Any]],
+    team_names: np.ndarray,
+    X: np.ndarray,
     labels: np.ndarray,
     cluster_centers_scaled: np.ndarray,
     scaler: StandardScaler,
     feature_columns: List[str],
-) -> List[Dict[str, Any]]:
-    """Assign tiers (Legendary, Exceptional, Advanced, Skilled, Intermediate, Below Average, Beginner) and rank teams based on learned cluster patterns"""
+) -> Tuple[pd.DataFrame, Dict[str, Dict[str, float]], Dict[str, Any]]:
+    """Assign tiers (Legendary, Exceptional, Advanced, Skilled, Intermediate, Below Average, Beginner) and rank teams based on learned cluster patterns.
+
+    X holds the unscaled features of the teams in team_names, in the order
+    of feature_columns (clustering.build_feature_matrix). Returns the tables
+    save_tier_results writes, as read_tier_tables loads them: teams, one row
+    per team sorted by tier and rank, with flattened Features.* and
+    Placement_Contributions.* columns; the profile of each tier; and the
+    model block holding Feature_Importance.
+    """
 
     # Convert cluster centers back to original scale
     cluster_centers_original = scaler.inverse_transform(cluster_centers_scaled)
@@ -113,131 +77,68 @@ def assign_tiers_and_rank_teams(
         cluster_centers_original, feature_columns
     )
 
-    cluster_strengths = []
-    cluster_profiles = {}
-
-    for i, center in enumerate(cluster_centers_original):
-        weighted_strength = 0
-        profile = {}
-
-        for j, feature in enumerate(feature_columns):
-            feature_value = center[j]
-            importance = feature_importance[feature]
-            weighted_strength += feature_value * importance
-            profile[feature] = round(feature_value, 3)
-
-        cluster_strengths.append(weighted_strength)
-        cluster_profiles[i] = profile
+    cluster_strengths = compute_weighted_scores(
+        cluster_centers_original, feature_columns, feature_importance
+    )
+    cluster_profiles = [
+        {feature: round(center[j], 3) for j, feature in enumerate(feature_columns)}
+        for center in cluster_centers_original.tolist()
+    ]
 
     sorted_cluster_ids = np.argsort(cluster_strengths)[::-1]
 
-    tier_labels = [
-        "Legendary",
-        "Exceptional",
-        "Advanced",
-        "Skilled",
-        "Intermediate",
-        "Below Average",
-        "Beginner",
-    ]
-    cluster_id_to_tier = {}
-    tier_profiles = {}
-
-    for idx, cluster_id in enumerate(sorted_cluster_ids):
-        if idx < len(tier_labels):
-            tier = tier_labels[idx]
-            cluster_id_to_tier[cluster_id] = tier
-            tier_profiles[tier] = cluster_profiles[cluster_id]
-        else:
-            cluster_id_to_tier[cluster_id] = "Beginner"
+    # Clusters beyond the number of tier labels fall into the last tier
+    cluster_tier_idx = np.full(len(cluster_centers_original), len(TIER_LABELS) - 1)
+    n_labelled = min(len(TIER_LABELS), len(sorted_cluster_ids))
+    cluster_tier_idx[sorted_cluster_ids[:n_labelled]] = np.arange(n_labelled)
+    tier_profiles = {
+        TIER_LABELS[idx]: cluster_profiles[cluster_id]
+        for idx, cluster_id in enumerate(sorted_cluster_ids[:n_labelled])
+    }
 
     best_cluster_id = sorted_cluster_ids[0]
-    best_cluster_center = cluster_centers_original[best_cluster_id]
-
-    results = []
-    for i, team in enumerate(team_features):
-        cluster_id = labels[i]
-        tier = cluster_id_to_tier[cluster_id]
-
-        team_vector = np.array(
-            [team["Elo_Rating"], team["Win_Rate"], team["Total_Matches"]]
-        )
-
-        distance_from_best = calculate_distance_from_best_cluster(
-            team_vector, best_cluster_center
-        )
-
-        placement_explanation = generate_placement_explanation(
-            team,
-            tier_profiles[tier],
-            feature_importance,
-            team_vector,
-            cluster_centers_original[cluster_id],
-            tier,
-        )
-
-        results.append(
-            {
-                "Team_Name": team["Team_Name"],
-                "Tier": tier,
-                "Distance_From_Best": distance_from_best,
-                "Cluster_ID": int(cluster_id),
-                "Features": {
-                    "Elo_Rating": team["Elo_Rating"],
-                    "Win_Rate": round(team["Win_Rate"], 2),
-                    "Total_Matches": team["Total_Matches"],
-                },
-                "Tier_Profile": tier_profiles[tier],
-                "Feature_Importance": feature_importance,
-                "Placement_Explanation": placement_explanation,
-            }
-        )
-    # Calculate distance from own cluster center for within-tier ranking
-    for cluster_id in np.unique(labels):
-        cluster_teams = [team for team in results if team["Cluster_ID"] == cluster_id]
-        cluster_center = cluster_centers_original[cluster_id]
-
-        for team in cluster_teams:
-            features = np.array(
-                [
-                    team["Features"]["Elo_Rating"],
-                    team["Features"]["Win_Rate"],
-                    team["Features"]["Total_Matches"],
-                ]
-            )
-
-            distance = np.linalg.norm(features - cluster_center)
-            team["Cluster_Distance"] = round(distance, 2)
-
-    tier_order = {
-        tier: i
-        for i, tier in enumerate(
-            [
-                "Legendary",
-                "Exceptional",
-                "Advanced",
-                "Skilled",
-                "Intermediate",
-                "Below Average",
-                "Beginner",
-            ]
-        )
-    }
-    for team in results:
-        team["Weighted_Score"] = compute_weighted_score(team, feature_importance)
 
-    results.sort(key=lambda x: (tier_order[x["Tier"]], -x["Weighted_Score"]))
+    labels = np.asarray(labels)
+    X = np.asarray(X, dtype=float).reshape(len(labels), len(feature_columns))
 
-    current_tier = None
-    rank_within_tier = 0
+    distances = calculate_distance_matrix(X, cluster_centers_original)
+    cluster_distance = distances[np.arange(len(X)), labels]
+    distance_from_best = distances[:, best_cluster_id].round(2)
 
-    for team in results:
-        if team["Tier"] != current_tier:
-            current_tier = team["Tier"]
-            rank_within_tier = 1
-        else:
-            rank_within_tier += 1
+    weighted_scores = compute_weighted_scores(X, feature_columns, feature_importance)
+    tier_idx = cluster_tier_idx[labels]
 
-        team["Rank_Within_Tier"] = rank_within_tier
+    # Sort by tier, then by descending weighted score; lexsort is stable so ties keep input order
+    order = np.lexsort((-weighted_scores, tier_idx))
+
+    profile_matrix = np.array(
+        [
+            [tier_profiles.get(tier, {}).get(feature, 0) for feature in feature_columns]
+            for tier in TIER_LABELS
+        ],
+        dtype=float,
+    )
+    X = X[order]
+    tier_idx = tier_idx[order]
+    contributions = compute_placement_contributions(X, tier_idx, profile_matrix)
+
+    elo_ratings, win_rates, total_matches = (
+        X[:, feature_columns.index(feature)] for feature in FEATURE_COLUMNS
+    )
+    columns = {
+        "Team_Name": np.asarray(team_names, dtype=object)[order],
+        "Tier": np.asarray(TIER_LABELS, dtype=object)[tier_idx],
+        "Distance_From_Best": distance_from_best[order],
+        "Cluster_ID": labels[order].astype(np.int64),
+        FEATURES_PREFIX + "Elo_Rating": elo_ratings,
+        FEATURES_PREFIX + "Win_Rate": win_rates.round(2),
+        FEATURES_PREFIX + "Total_Matches": total_matches.astype(np.int64),
+        "Cluster_Distance": cluster_distance[order],
+        "Weighted_Score": weighted_scores[order],
+        "Rank_Within_Tier": rank_within_groups(tier_idx),
+    }
+    for j, feature in enumerate(feature_columns):
+        columns[CONTRIBUTIONS_PREFIX + feature] = contributions[:, j]
 
-    return results
+    teams = pd.DataFrame(columns, copy=False)
+    return teams, tier_profiles, {"Feature_Importance": feature_importance}
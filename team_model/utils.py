@@ -1,14 +1,119 @@
 import json
+import numpy as np
 from typing import List, Dict, Any
+from data.columnar import columnar_path, has_fresh_columns, read_columns, write_columns
 
 
 def load_team_data(file_path: str) -> List[Dict[str, Any]]:
-    """Load team data from JSON file"""
+    """Load team data, preferring the columnar store over the JSON file"""
+    if has_fresh_columns(file_path):
+        return read_team_columns(columnar_path(file_path))
+
     with open(file_path, "r") as file:
         data = json.load(file)
     return data["teams"]
 
 
+def save_team_data(
+    teams: List[Dict[str, Any]], file_path: str, write_json: bool = True
+):
+    """Save team data as a columnar store, optionally also exporting JSON"""
+    if write_json:
+        with open(file_path, "w") as file:
+            json.dump({"teams": teams}, file, indent=4)
+    write_team_columns(teams, columnar_path(file_path))
+
+
+def write_team_columns(teams: List[Dict[str, Any]], path: str):
+    """Store teams and their flattened match lists; Match Offsets delimits each team's matches"""
+    match_counts = [len(team.get("Matches", [])) for team in teams]
+    matches = [match for team in teams for match in team.get("Matches", [])]
+
+    write_team_arrays(
+        path,
+        [team["Team Name"] for team in teams],
+        [team["Elo Rating"] for team in teams],
+        np.concatenate([[0], np.cumsum(match_counts)]),
+        [match["Opponent"] for match in matches],
+        [match["Result"] for match in matches],
+        [match["Date"] for match in matches],
+    )
+
+
+def write_team_arrays(
+    path: str,
+    team_names,
+    elo_ratings,
+    match_offsets,
+    opponents,
+    results,
+    dates,
+):
+    """Write a team store from column arrays; team i's matches are match_offsets[i]:match_offsets[i + 1]"""
+    write_columns(
+        path,
+        {
+            "Team Name": team_names,
+            "Elo Rating": np.asarray(elo_ratings, dtype=float),
+            "Match Offsets": np.asarray(match_offsets, dtype=np.int64),
+            "Opponent": opponents,
+            "Result": results,
+            "Date": np.asarray(dates, dtype="datetime64[D]"),
+        },
+    )
+
+
+def load_team_arrays(file_path: str) -> Dict[str, np.ndarray]:
+    """
+    Team data as the column arrays of the columnar store (Team Name, Elo
+    Rating, Match Offsets, Opponent, Result, Date), without building
+    per-match records when the store is fresh.
+    """
+    if has_fresh_columns(file_path):
+        columns, _ = read_columns(columnar_path(file_path))
+        return columns
+
+    teams = load_team_data(file_path)
+    matches = [match for team in teams for match in team.get("Matches", [])]
+    match_counts = [len(team.get("Matches", [])) for team in teams]
+    return {
+        "Team Name": np.array([team["Team Name"] for team in teams], dtype=str),
+        "Elo Rating": np.array([team["Elo Rating"] for team in teams], dtype=float),
+        "Match Offsets": np.concatenate([[0], np.cumsum(match_counts)]).astype(np.int64),
+        "Opponent": np.array([match["Opponent"] for match in matches], dtype=str),
+        "Result": np.array([match["Result"] for match in matches], dtype=str),
+        "Date": np.array([match["Date"] for match in matches], dtype="datetime64[D]"),
+    }
+
+
+def read_team_columns(path: str) -> List[Dict[str, Any]]:
+    """Rebuild the team records of load_team_data from a columnar store"""
+    columns, _ = read_columns(path)
+    offsets = columns["Match Offsets"]
+    opponents = columns["Opponent"].tolist()
+    results = columns["Result"].tolist()
+    dates = np.datetime_as_string(columns["Date"], unit="D").tolist()
+
+    teams = []
+    for i, (name, elo_rating) in enumerate(
+        zip(columns["Team Name"].tolist(), columns["Elo Rating"].tolist())
+    ):
+        start, end = offsets[i], offsets[i + 1]
+        teams.append(
+            {
+                "Team Name": name,
+                "Elo Rating": elo_rating,
+                "Matches": [
+                    {"Opponent": opponent, "Result": result, "Date": date}
+                    for opponent, result, date in zip(
+                        opponents[start:end], results[start:end], dates[start:end]
+                    )
+                ],
+            }
+        )
+    return teams
+
+
 def calculate_win_rate(matches: List[Dict[str, Any]]) -> float:
     """Calculate win rate from matches"""
     if not matches:
@@ -31,4 +136,4 @@ def extract_team_features(team_data: Dict[str, Any]) -> Dict[str, Any]:
         "Elo_Rating": elo_rating,
         "Win_Rate": round(win_rate * 100, 2),  # Convert to percentage (0-100) for training
         "Total_Matches": len(matches),
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,46 @@
+from team_model.elo import new_elo_state, update_elo_ratings, verify_elo_ratings
+
+HISTORY = {
+    "A": [
+        ("B", "Win", "2024-10-28"),
+        ("B", "Loss", "2024-10-28"),
+        ("C", "Win", "2024-10-29"),
+        ("B", "Win", "2024-10-30"),
+    ],
+    "B": [("A", "Loss", "2024-10-28"), ("A", "Win", "2024-10-28"), ("C", "Draw", "2024-10-30")],
+    "C": [("A", "Loss", "2024-10-29"), ("B", "Draw", "2024-10-30"), ("A", "Win", "2024-10-31")],
+}
+
+
+def teams_up_to(counts):
+    return [
+        {
+            "Team Name": name,
+            "Matches": [
+                {"Opponent": opponent, "Result": result, "Date": date}
+                for opponent, result, date in matches[: counts[name]]
+            ],
+        }
+        for name, matches in HISTORY.items()
+    ]
+
+
+def test_incremental_updates_match_a_full_recompute():
+    state = new_elo_state()
+    # Appended in steps that split same-day games of a pair across updates
+    for counts in [
+        {"A": 1, "B": 0, "C": 0},
+        {"A": 2, "B": 1, "C": 1},
+        {"A": 3, "B": 2, "C": 1},
+        {"A": 4, "B": 3, "C": 3},
+    ]:
+        teams = teams_up_to(counts)
+        state = update_elo_ratings(teams, state)
+        assert verify_elo_ratings(teams, state) < 1e-9
+
+    assert state["matches_processed"] == 6
+    assert state["occurrences"]["A"] == {
+        "2024-10-28\tA\tB": 2,
+        "2024-10-29\tA\tC": 1,
+        "2024-10-30\tA\tB": 1,
+    }
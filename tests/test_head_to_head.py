@@ -0,0 +1,63 @@
+import numpy as np
+
+from team_model.head_to_head import HeadToHeadIndex, build_head_to_head
+
+
+def build_index(teams):
+    """HeadToHeadIndex over {team: [(opponent, result, date), ...]}"""
+    names = list(teams)
+    matches = [match for name in names for match in teams[name]]
+    return HeadToHeadIndex(
+        build_head_to_head(
+            names,
+            np.full(len(names), 1000.0),
+            np.concatenate([[0], np.cumsum([len(teams[name]) for name in names])]),
+            [opponent for opponent, _, _ in matches],
+            [result for _, result, _ in matches],
+            np.array([date for _, _, date in matches], dtype="datetime64[D]"),
+        )
+    )
+
+
+def test_record_is_mirrored_when_the_teams_list_different_games():
+    index = build_index(
+        {
+            # A lists three games against B; B only lists the first, and one
+            # game against C that C does not list
+            "A": [
+                ("B", "Win", "2024-10-28"),
+                ("B", "Loss", "2024-10-28"),
+                ("B", "Loss", "2024-11-02"),
+                ("C", "Draw", "2024-11-03"),
+            ],
+            "B": [("A", "Loss", "2024-10-28"), ("C", "Win", "2024-11-04")],
+            "C": [("A", "Draw", "2024-11-03")],
+        }
+    )
+
+    assert index.record("A", "B") == {
+        "Wins": 1, "Losses": 2, "Draws": 0, "Games": 3, "Last Met": "2024-11-02"
+    }
+    for team in ["A", "B", "C"]:
+        for opponent in ["A", "B", "C"]:
+            if team == opponent:
+                continue
+            record = index.record(team, opponent)
+            mirror = index.record(opponent, team)
+            assert mirror["Wins"] == record["Losses"]
+            assert mirror["Losses"] == record["Wins"]
+            assert mirror["Draws"] == record["Draws"]
+            assert mirror["Games"] == record["Games"]
+            assert mirror["Last Met"] == record["Last Met"]
+
+
+def test_both_listings_of_a_game_count_once():
+    index = build_index(
+        {
+            "A": [("B", "Win", "2024-10-28"), ("B", "Win", "2024-10-28")],
+            "B": [("A", "Loss", "2024-10-28"), ("A", "Loss", "2024-10-28")],
+        }
+    )
+
+    assert index.record("A", "B")["Games"] == 2
+    assert index.record("B", "A")["Losses"] == 2
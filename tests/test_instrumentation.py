@@ -0,0 +1,47 @@
+from pipeline.dag import Stage, run_pipeline
+from pipeline.instrumentation import Instrumentation
+
+
+def record_stage(output_file, instrumentation):
+    """A stage recording spans under the same names as every other stage"""
+    with instrumentation.span("build_neighbor_index", rows=3):
+        pass
+    with open(output_file, "w") as f:
+        f.write("done")
+
+
+def test_textfile_series_are_unique_after_a_dag_merge(tmp_path):
+    stages = [
+        Stage(
+            name,
+            "test_instrumentation:record_stage",
+            outputs=[str(tmp_path / f"{name}.txt")],
+            params={"output_file": str(tmp_path / f"{name}.txt")},
+            instrumented=True,
+        )
+        for name in ["player_model", "team_model"]
+    ]
+    instrumentation = Instrumentation("pipeline", enabled=True)
+    status = run_pipeline(
+        stages,
+        state_file=str(tmp_path / "state.json"),
+        log_dir=str(tmp_path / "logs"),
+        root_dir=str(tmp_path),
+        instrumentation=instrumentation,
+    )
+    assert status == {"player_model": "ran", "team_model": "ran"}
+
+    textfile = tmp_path / "metrics.prom"
+    instrumentation.write_prometheus_textfile(str(textfile))
+    series = [
+        line.rsplit(" ", 1)[0]
+        for line in textfile.read_text().splitlines()
+        if not line.startswith("#")
+    ]
+
+    assert len(series) == len(set(series))
+    for pipeline in ["player_model", "team_model"]:
+        assert (
+            f'pipeline_stage_rows{{pipeline="{pipeline}",stage="build_neighbor_index"}}'
+            in series
+        )
@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from player_model.model_training import PARAM_GRID, build_search, halving_schedule_for_budget
+
+
+@pytest.mark.parametrize("max_fits", [5, 12, 20, 40])
+def test_small_halving_budget_is_a_cap(max_fits):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(60, 3)), columns=["a", "b", "c"])
+    y = X["a"] * 2 + rng.normal(scale=0.1, size=60)
+
+    search = build_search("halving", max_fits=max_fits)
+    search.fit(X, y)
+
+    assert sum(search.n_candidates_) * search.n_splits_ <= max_fits
+    assert search.n_resources_[-1] == max(PARAM_GRID["n_estimators"])
+
+
+def test_budget_below_one_candidate_raises():
+    with pytest.raises(ValueError):
+        halving_schedule_for_budget(4, cv=5)